@@ -0,0 +1,250 @@
+"""
+Ortak stok kontrol hattının ölçümü
+==================================
+
+Sentetik bir katalog üzerinde hattın sıcak adımlarını ayrı ayrı ölçer:
+sayfa ayrıştırma + sınıflandırma (sütunsal yığınlar), yığınları birleştirme,
+satırlara çevirme, anlık görüntüyle karşılaştırma, anlık görüntü yazma,
+uçtan uca ``StockPipeline.run`` (süreç havuzuyla ve havuzsuz) ve hiçbir
+ürünün değişmediği sakin tur (ürün özetleri eşleşir, karşılaştırma atlanır). Sayfalar
+bellekten sunulur; ``--latency`` ile sayfa başına ağ gecikmesi eklenerek
+ayrıştırmanın indirmeyle ne kadar örtüştüğü görülebilir.
+
+Kullanım:
+    python benchmarks/core_pipeline.py
+    python benchmarks/core_pipeline.py --products 20000 --workers 4 --latency 50
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from porima_core.batch import RowBatch, parse_page  # noqa: E402
+from porima_core.classify import filter_filaments, product_rows  # noqa: E402
+from porima_core.diff import diff_rows  # noqa: E402
+from porima_core.fetcher import ProductFetcher  # noqa: E402
+from porima_core.pipeline import BASE_URL, StockPipeline  # noqa: E402
+from porima_core.snapshot import SnapshotStore  # noqa: E402
+
+
+MATERIALS = ['PLA', 'PETG', 'ABS', 'TPU', 'ASA', 'Silk PLA', 'Nylon']
+COLORS = ['Kırmızı', 'Mavi', 'Siyah', 'Beyaz', 'Yeşil', 'Gri', 'Turuncu', 'Mor']
+
+
+def make_catalog(product_count, variant_count, seed=1):
+    """Filament ve filament olmayan ürünlerden oluşan sentetik katalog"""
+    rng = random.Random(seed)
+    products = []
+    for i in range(product_count):
+        filament = i % 5 != 0  # Her beş üründen biri aksesuar
+        material = rng.choice(MATERIALS)
+        products.append({
+            'id': 1000000 + i,
+            'title': f"Porima {material} Filament {i}" if filament else f"Nozzle Seti {i}",
+            'handle': f"urun-{i}",
+            'product_type': 'Filament' if filament else 'Aksesuar',
+            'tags': [material, '1.75mm'] if filament else ['aksesuar'],
+            'variants': [
+                {
+                    'id': 50000000 + i * 100 + j,
+                    'title': f"{rng.choice(COLORS)} / 1kg",
+                    'available': rng.random() < 0.7,
+                    'price': f"{rng.uniform(300, 900):.2f}",
+                    'sku': f"P{i}-{j}",
+                }
+                for j in range(variant_count)
+            ],
+        })
+    return products
+
+
+def mutate(products, ratio, seed=2):
+    """Varyantların bir kısmının stok/fiyat durumunu değiştir"""
+    rng = random.Random(seed)
+    for product in products:
+        for variant in product['variants']:
+            if rng.random() < ratio:
+                variant['available'] = not variant['available']
+            if rng.random() < ratio:
+                variant['price'] = f"{float(variant['price']) * rng.choice((0.9, 1.1)):.2f}"
+
+
+class MemorySession:
+    """Katalog sayfalarını bellekten sunan HTTP oturumu yerine geçen nesne"""
+
+    class Response:
+        status_code = 200
+        ok = True
+        headers = {}
+
+        def __init__(self, content):
+            self.content = content
+
+        def raise_for_status(self):
+            pass
+
+    def __init__(self, products, page_size, latency=0):
+        self.latency = latency
+        self.pages = [
+            json.dumps({'products': products[i:i + page_size]}).encode('utf-8')
+            for i in range(0, len(products), page_size)
+        ]
+
+    def get(self, url, headers=None, timeout=None):
+        page = int(url.rsplit('page=', 1)[1])
+        if self.latency:
+            time.sleep(self.latency)
+        body = self.pages[page - 1] if page <= len(self.pages) else b'{"products": []}'
+        return self.Response(body)
+
+
+def best_of(repeat, func, setup=None):
+    """En iyi süre (saniye) ve son sonucu döndür"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ortak stok kontrol hattı ölçümü')
+    parser.add_argument('--products', type=int, default=2000, help='Katalogdaki ürün sayısı')
+    parser.add_argument('--variants', type=int, default=8, help='Ürün başına varyant sayısı')
+    parser.add_argument('--change-ratio', type=float, default=0.05, help='Değişen varyant oranı')
+    parser.add_argument('--repeat', type=int, default=5, help='Tekrar sayısı (en iyisi alınır)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Uçtan uca ölçümde süreç havuzu boyutu')
+    parser.add_argument('--latency', type=float, default=0, help='Sayfa başına ağ gecikmesi (ms)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='porima-bench-')
+    try:
+        data_file = os.path.join(workdir, 'stock_data.json')
+        catalog = make_catalog(args.products, args.variants)
+
+        # Önceki tur: temel anlık görüntü
+        store = SnapshotStore(data_file)
+        store.save(product_rows(filter_filaments(catalog), BASE_URL))
+
+        mutate(catalog, args.change_ratio)
+        session = MemorySession(catalog, 250)
+        bodies = session.pages
+
+        results = []
+
+        elapsed, batches = best_of(args.repeat, lambda: [parse_page(body, BASE_URL) for body in bodies])
+        results.append(('ayrıştır + sınıflandır', elapsed, args.products))
+
+        def merge():
+            batch = RowBatch()
+            seen = set()
+            for page_batch in batches:
+                batch.extend(page_batch, seen)
+            return batch
+
+        elapsed, batch = best_of(args.repeat, merge)
+        results.append(('yığınları birleştir', elapsed, len(batch)))
+
+        elapsed, rows = best_of(args.repeat, lambda: list(batch.rows()))
+        results.append(('satırlara çevir', elapsed, len(rows)))
+
+        elapsed, changes = best_of(args.repeat, lambda: diff_rows(store, rows))
+        results.append(('karşılaştır', elapsed, len(rows)))
+
+        # Kayıt temel anlık görüntüyü değiştirir; uçtan uca ölçüm her seferinde ondan başlar
+        baseline = store.snapshot.path + '.base'
+        shutil.copyfile(store.snapshot.path, baseline)
+
+        elapsed, _ = best_of(args.repeat, lambda: store.save(rows))
+        results.append(('anlık görüntü yaz', elapsed, len(rows)))
+
+        expected = sum(len(items) for items in changes)
+        mismatches = []
+
+        def make_pipeline(workers):
+            pipeline = StockPipeline(data_file, delay=0, workers=workers)
+            pipeline.fetcher = ProductFetcher(BASE_URL, delay=0, session=session)
+            return pipeline
+
+        def restore(pipeline):
+            pipeline.store.snapshot.close()
+            shutil.copyfile(baseline, pipeline.store.snapshot.path)
+            pipeline.store = SnapshotStore(data_file)
+
+        session.latency = args.latency / 1000
+        for workers in sorted({0, args.workers}):
+            pipeline = make_pipeline(workers)
+
+            # Havuz süreçlerinin açılışı ölçüme girmesin
+            if workers > 1:
+                restore(pipeline)
+                pipeline.run()
+
+            elapsed, result = best_of(args.repeat, pipeline.run, setup=lambda: restore(pipeline))
+            pipeline.close()
+            results.append((f'uçtan uca ({workers} süreç)', elapsed, len(result.rows)))
+            if result.change_count != expected:
+                mismatches.append((workers, result.change_count))
+
+        # Sakin tur: katalog son turdan beri değişmedi, ürünler yeniden kullanılır
+        pipeline = make_pipeline(0)
+        restore(pipeline)
+        pipeline.run()
+        elapsed, result = best_of(args.repeat, pipeline.run)
+        results.append(('sakin tur (0 süreç)', elapsed, len(result.rows)))
+        quiet_changes = result.change_count
+
+        # Akış: ilk sayfanın değişiklikleri ne zaman hazır, tepe bellek ne kadar
+        pipeline = make_pipeline(0)
+        restore(pipeline)
+        tracemalloc.start()
+        start = time.perf_counter()
+        first_page = None
+        for _ in pipeline.stream():
+            if first_page is None:
+                first_page = time.perf_counter() - start
+        full_crawl = time.perf_counter() - start
+        stream_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        restore(pipeline)
+        tracemalloc.start()
+        pipeline.run()
+        collect_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(f"📦 {args.products} ürün x {args.variants} varyant, "
+              f"{expected} değişiklik (en iyi {args.repeat} ölçüm)")
+        for name, elapsed, count in results:
+            per_item = elapsed / count * 1e6 if count else 0
+            print(f"   {name:<22} {elapsed * 1000:8.1f} ms  {per_item:6.2f} µs/öğe")
+        print(f"   ilk sayfanın sonucu {first_page * 1000:.1f} ms, tüm tarama {full_crawl * 1000:.1f} ms "
+              f"(tracemalloc açık)")
+        print(f"   tepe bellek: akış {stream_peak / 1e6:.1f} MB, tüm satırlar toplanınca {collect_peak / 1e6:.1f} MB")
+
+        for workers, count in mismatches:
+            print(f"⚠️  Uçtan uca ({workers} süreç) {count} değişiklik buldu, adım adım {expected}")
+        if quiet_changes:
+            print(f"⚠️  Sakin tur {quiet_changes} değişiklik buldu, beklenen 0")
+        if mismatches or quiet_changes:
+            sys.exit(1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Giriş noktalarının içe aktarma süresi ölçümü
+============================================
+
+``python -X importtime`` çıktısından her giriş noktasının kendi
+(cumulative) yükleme süresini okur ve bütçeyle karşılaştırır. Bütçe
+aşılırsa en pahalı modülleri listeler ve 1 ile çıkar. Kullanıldıkları yerde
+yüklenmesi gereken modüller açılışta yüklenirse de başarısız sayılır;
+bütçe yalnızca bu modüller ertelendiği için tutar.
+
+Kullanım:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget-ms 80 --repeat 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Giriş noktası -> varsayılan bütçe (ms)
+ENTRY_POINTS = {
+    'porima_stock_monitor': 60,
+    'porima_core': 10,
+}
+
+# Giriş noktası -> açılışta yüklenmemesi gereken (ertelenen) modüller
+DEFERRED = {
+    'porima_stock_monitor': ('requests', 'plyer', 'porima_core.cadence',
+                             'porima_core.timeline', 'porima_core.webhook'),
+}
+
+
+def parse_importtime(stderr, module):
+    """
+    -X importtime çıktısından modülün kendi alt ağacını ayrıştır
+
+    Yorumlayıcı açılışında (site vb.) yüklenenler sayılmaz; importtime
+    alt modülleri üst modülden önce ve daha girintili yazar.
+
+    Returns:
+        tuple: (modülün cumulative süresi ms, [(cumulative ms, alt modül), ...])
+    """
+    block = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        cumulative_ms = int(cumulative_us) / 1000
+        indent = len(name) - len(name.lstrip()) - 1
+
+        if indent > 0:
+            block.append((cumulative_ms, name.strip()))
+            continue
+
+        if name.strip() == module:
+            block.sort(reverse=True)
+            return cumulative_ms, block
+        block = []
+
+    raise RuntimeError(f"{module} importtime çıktısında bulunamadı")
+
+
+def measure(module, repeat=3):
+    """Modülü temiz yorumlayıcılarda içe aktar, en iyi ölçümü döndür"""
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+        measurement = parse_importtime(result.stderr, module)
+        if best is None or measurement[0] < best[0]:
+            best = measurement
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Giriş noktası içe aktarma süresi bütçesi')
+    parser.add_argument('modules', nargs='*', help='Ölçülecek modüller (varsayılan: tüm giriş noktaları)')
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help='Tüm modüller için bütçe (ms), varsayılan: modül bazında')
+    parser.add_argument('--repeat', type=int, default=3, help='Tekrar sayısı (en iyisi alınır)')
+    parser.add_argument('--top', type=int, default=8, help='Bütçe aşılınca listelenecek modül sayısı')
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules or ENTRY_POINTS:
+        budget = args.budget_ms if args.budget_ms is not None else ENTRY_POINTS.get(module, 100)
+        try:
+            total, rows = measure(module, args.repeat)
+        except RuntimeError as e:
+            print(f"⚠️  {module}: içe aktarılamadı ({e})")
+            failed = True
+            continue
+
+        loaded = sorted({name for _, name in rows} & set(DEFERRED.get(module, ())))
+        status = '✅' if total <= budget and not loaded else '❌'
+        print(f"{status} {module}: {total:.1f} ms (bütçe {budget:.0f} ms)")
+        if loaded:
+            failed = True
+            print(f"     açılışta yüklenmemeli: {', '.join(loaded)}")
+
+        if total > budget:
+            failed = True
+            for cumulative_ms, name in rows[:args.top]:
+                print(f"     {cumulative_ms:8.1f} ms  {name}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Porima3D Stok Takip - Ortak Çekirdek
+====================================
+CLI, GUI ve web arayüzünün paylaştığı yardımcı modüller.
+
+Alt modüller ilk erişimde yüklenir; ``from porima_core import X`` sadece
+X'in bulunduğu modülü içe aktarır, böylece tek seferlik çalıştırmalar
+kullanmadıkları bağımlılıkların yükleme maliyetini ödemez. Giriş noktaları
+alt modülleri doğrudan içe aktarır; isteğe bağlı özelliklerin modülleri
+yalnızca kullanıldıkları yerde yüklenir.
+"""
+
+import importlib
+
+
+_EXPORTS = {
+    'AlertEngine': 'alerts',
+    'AlertRule': 'alerts',
+    'format_alert': 'alerts',
+    'Attributes': 'attributes',
+    'parse_attributes': 'attributes',
+    'BatchParser': 'batch',
+    'RowBatch': 'batch',
+    'parse_page': 'batch',
+    'AdaptiveInterval': 'cadence',
+    'Broadcaster': 'broadcast',
+    'encode_frame': 'broadcast',
+    'ChangeStream': 'changelog',
+    'FILAMENT_COLLECTIONS': 'classify',
+    'FILAMENT_KEYWORDS': 'classify',
+    'filter_filaments': 'classify',
+    'is_filament': 'classify',
+    'product_rows': 'classify',
+    'Changes': 'diff',
+    'diff_rows': 'diff',
+    'FacetIndex': 'facets',
+    'ProductFetcher': 'fetcher',
+    'ConsoleSink': 'notify',
+    'DesktopSink': 'notify',
+    'EmailSink': 'notify',
+    'NotificationDispatcher': 'notify',
+    'NotificationSink': 'notify',
+    'WebhookSink': 'notify',
+    'OutboundHub': 'outbound',
+    'coalesce': 'outbound',
+    'CheckResult': 'pipeline',
+    'PageResult': 'pipeline',
+    'StockPipeline': 'pipeline',
+    'PriceHistory': 'prices',
+    'RestockStats': 'restock',
+    'RunLock': 'runstate',
+    'RunState': 'runstate',
+    'MonitorScheduler': 'scheduler',
+    'MappedSnapshot': 'snapshot',
+    'SNAPSHOT_COLUMNS': 'snapshot',
+    'SnapshotStore': 'snapshot',
+    'SnapshotWriter': 'snapshot',
+    'load_snapshot': 'snapshot',
+    'replace_snapshot': 'snapshot',
+    'snapshot_path': 'snapshot',
+    'write_snapshot': 'snapshot',
+    'StockCounters': 'stats',
+    'Subscription': 'subscriptions',
+    'SubscriptionRouter': 'subscriptions',
+    'SyncIndex': 'sync',
+    'SnapshotLog': 'timeline',
+    'WebhookPublisher': 'webhook',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,267 @@
+"""
+Abonelik uyarı kuralları
+========================
+
+Kullanıcı kuralları ("siyah 1.75mm PETG 700 TL altında stoğa girerse",
+"Silk PLA'da %10'dan büyük indirim") olay tipine ve en seçici alanlarına
+göre dizinlenir:
+
+    (olay, 'variant', variant_id)   belirli bir varyant
+    (olay, malzeme, renk)           malzeme ve/veya renk (None: herhangi)
+
+Bir değişiklik yalnızca kendi anahtarlarındaki (en fazla beş) kovadaki
+kurallarla karşılaştırılır; eşleştirme maliyeti toplam kural sayısıyla
+değil, değişiklik sayısı x aday kural sayısıyla büyür. Çap, fiyat ve
+yüzde koşulları aday kurallarda ayrıca denetlenir.
+"""
+
+import json
+import os
+import threading
+from collections import namedtuple
+
+from .attributes import normalize_color, normalize_diameter, normalize_material, row_attributes
+
+
+# Olay tipleri, Changes alanlarıyla aynı sırada
+EVENTS = ('in', 'out', 'price_up', 'price_down')
+
+EVENT_TITLES = {
+    'in': '🎉 Stokta!',
+    'out': '⚠️ Stoktan çıktı',
+    'price_up': '📈 Zam',
+    'price_down': '📉 İndirim',
+}
+
+Match = namedtuple('Match', 'rule event item')
+
+
+def _text(field, value):
+    """Metin alanını doğrula (boş değer: koşul yok)"""
+    if value in (None, ''):
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"{field} metin olmalı: {value!r}")
+    return value
+
+
+def _scalar(field, value):
+    """Sayı veya metin alanını doğrula (boş değer: koşul yok)"""
+    if value in (None, ''):
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{field} sayı veya metin olmalı: {value!r}")
+    return value
+
+
+class AlertRule:
+    """
+    Tek bir uyarı kuralı
+
+    Args:
+        event: 'in', 'out', 'price_up' veya 'price_down'
+        variant_id: Yalnızca bu varyant
+        material / color / diameter: Başlıklardan çıkarılan özellikler
+        max_price: Güncel fiyat en fazla (TL)
+        min_change_percent: Fiyat değişimi en az (%)
+        name: Bildirimde görünen ad
+    """
+
+    __slots__ = ('id', 'event', 'variant_id', 'material', 'color', 'diameter',
+                 'max_price', 'min_change_percent', 'name')
+
+    def __init__(self, event='in', variant_id=None, material=None, color=None, diameter=None,
+                 max_price=None, min_change_percent=None, name=None, id=None):
+        if not isinstance(event, str) or event not in EVENTS:
+            raise ValueError(f"Bilinmeyen olay: {event!r} (geçerli: {', '.join(EVENTS)})")
+        variant_id = _scalar('variant_id', variant_id)
+        material = _text('material', material)
+        color = _text('color', color)
+        max_price = _scalar('max_price', max_price)
+        min_change_percent = _scalar('min_change_percent', min_change_percent)
+        self.id = id
+        self.event = event
+        self.variant_id = str(variant_id) if variant_id else None
+        self.material = normalize_material(material) if material else None
+        self.color = normalize_color(color) if color else None
+        self.diameter = normalize_diameter(_scalar('diameter', diameter))
+        self.max_price = float(max_price) if max_price is not None else None
+        self.min_change_percent = float(min_change_percent) if min_change_percent is not None else None
+        self.name = _text('name', name) or self.describe()
+
+    @property
+    def key(self):
+        """Dizin anahtarı"""
+        if self.variant_id:
+            return (self.event, 'variant', self.variant_id)
+        return (self.event, self.material, self.color)
+
+    def accepts(self, item, attributes):
+        """Anahtarın kapsamadığı koşullar (çap, fiyat, yüzde; varyant kuralında malzeme/renk)"""
+        if self.variant_id and (
+            (self.material and attributes.material != self.material)
+            or (self.color and attributes.color != self.color)
+        ):
+            return False
+        if self.diameter and attributes.diameter != self.diameter:
+            return False
+        if self.max_price is not None and item.get('price', 0) > self.max_price:
+            return False
+        if self.min_change_percent is not None and item.get('price_change_percent', 0) < self.min_change_percent:
+            return False
+        return True
+
+    def describe(self):
+        parts = [p for p in (self.material, self.color, self.diameter and f"{self.diameter}mm") if p]
+        if self.variant_id:
+            parts.append(f"varyant {self.variant_id}")
+        if self.max_price is not None:
+            parts.append(f"≤ {self.max_price:.0f} TL")
+        if self.min_change_percent is not None:
+            parts.append(f"≥ %{self.min_change_percent:g}")
+        return f"{' '.join(parts) or 'tüm ürünler'}: {self.event}"
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data.get(name) for name in cls.__slots__ if name in data})
+
+    @classmethod
+    def parse(cls, spec):
+        """
+        'event=in, material=petg, color=siyah, diameter=1.75, max_price=700'
+        biçimindeki metinden kural oluştur
+        """
+        fields = {}
+        for part in spec.split(','):
+            if not part.strip():
+                continue
+            key, sep, value = part.partition('=')
+            if not sep or key.strip() not in cls.__slots__ or key.strip() == 'id':
+                raise ValueError(f"Geçersiz kural alanı: {part.strip()!r}")
+            fields[key.strip()] = value.strip()
+        return cls(**fields)
+
+
+class AlertEngine:
+    """
+    Dizinlenmiş kural kümesi
+
+    Args:
+        path: Kuralların saklandığı JSON dosyası (None: yalnızca bellekte)
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.rules = {}  # id -> AlertRule
+        self.index = {}  # anahtar -> {id: AlertRule}
+        self.next_id = 1
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self):
+        return len(self.rules)
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for item in data.get('rules', []):
+                self._insert(AlertRule.from_dict(item))
+            self.next_id = max(data.get('next_id', 1), max(self.rules, default=0) + 1)
+        except Exception as e:
+            print(f"⚠️  Uyarı kuralları okunamadı: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            with self._lock:
+                data = {
+                    'next_id': self.next_id,
+                    'rules': [rule.to_dict() for rule in self.rules.values()],
+                }
+            with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(self.path + '.tmp', self.path)
+        except Exception as e:
+            print(f"⚠️  Uyarı kuralları kaydedilemedi: {e}")
+
+    def _insert(self, rule):
+        self.rules[rule.id] = rule
+        self.index.setdefault(rule.key, {})[rule.id] = rule
+
+    def add(self, rule):
+        """Kuralı ekle ve kaydet; kuralın id'sini döndür"""
+        with self._lock:
+            rule.id = self.next_id
+            self.next_id += 1
+            self._insert(rule)
+        self.save()
+        return rule.id
+
+    def remove(self, rule_id):
+        """Kuralı sil; yoksa False"""
+        with self._lock:
+            rule = self.rules.pop(rule_id, None)
+            if rule is None:
+                return False
+            bucket = self.index[rule.key]
+            del bucket[rule_id]
+            if not bucket:
+                del self.index[rule.key]
+        self.save()
+        return True
+
+    def candidates(self, event, item, attributes):
+        """Değişikliğin anahtarlarındaki kurallar"""
+        material, color = attributes.material, attributes.color
+        keys = [(event, 'variant', str(item.get('variant_id'))), (event, None, None)]
+        if material:
+            keys.append((event, material, None))
+            if color:
+                keys.append((event, material, color))
+        if color:
+            keys.append((event, None, color))
+
+        index = self.index
+        for key in keys:
+            bucket = index.get(key)
+            if bucket:
+                yield from bucket.values()
+
+    def match(self, changes):
+        """
+        Değişiklikleri kurallarla eşleştir
+
+        Args:
+            changes: diff_rows'un döndürdüğü Changes
+
+        Returns:
+            list: Match(rule, event, item)
+        """
+        matches = []
+        if not self.rules:
+            return matches
+
+        with self._lock:
+            for event, items in zip(EVENTS, changes):
+                for item in items:
+                    attributes = row_attributes(item)
+                    for rule in self.candidates(event, item, attributes):
+                        if rule.accepts(item, attributes):
+                            matches.append(Match(rule, event, item))
+        return matches
+
+
+def format_alert(match):
+    """Eşleşmenin bildirim başlığı ve metni"""
+    item = match.item
+    message = f"{item['product']} - {item['variant']} {item.get('price', 0):.2f} TL"
+    if match.event in ('price_up', 'price_down'):
+        message += f" ({item.get('old_price', 0):.2f} TL, %{item.get('price_change_percent', 0):.1f})"
+    return f"{EVENT_TITLES[match.event]} [{match.rule.name}]", message
@@ -0,0 +1,152 @@
+"""
+Filament özellikleri
+====================
+
+Ürün ve varyant başlıklarından malzeme, renk, çap ve ağırlık çıkarılır
+(``Beyaz / 1.75mm / 1kg``). Değerler karşılaştırılabilir olsun diye
+normalleştirilir: Türkçe karakterler sadeleştirilir, eş anlamlılar tek ada
+indirgenir (``Siyah`` / ``black`` -> ``black``), çaplar ``1.75``,
+ağırlıklar ``1kg`` / ``500g`` biçimine çevrilir.
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+
+Attributes = namedtuple('Attributes', 'material color diameter weight')
+
+# Normal ad -> başlıklarda geçen yazımlar (sadeleştirilmiş, küçük harf)
+MATERIALS = {
+    'silk pla': ('silk pla', 'pla silk', 'ipek pla'),
+    'pla+': ('pla+', 'pla plus', 'pla pro'),
+    'pla': ('pla',),
+    'petg': ('petg',),
+    'abs': ('abs',),
+    'asa': ('asa',),
+    'tpu': ('tpu', 'flex'),
+    'nylon': ('nylon', 'naylon', 'pa', 'pa6', 'pa12'),
+    'pc': ('pc', 'polikarbonat', 'polycarbonate'),
+    'pva': ('pva',),
+    'hips': ('hips',),
+}
+
+COLORS = {
+    'black': ('siyah', 'black'),
+    'white': ('beyaz', 'white'),
+    'red': ('kirmizi', 'red'),
+    'blue': ('mavi', 'lacivert', 'blue'),
+    'green': ('yesil', 'green'),
+    'yellow': ('sari', 'yellow'),
+    'orange': ('turuncu', 'orange'),
+    'purple': ('mor', 'purple'),
+    'pink': ('pembe', 'pink'),
+    'gray': ('gri', 'grey', 'gray'),
+    'brown': ('kahverengi', 'brown'),
+    'gold': ('altin', 'gold'),
+    'silver': ('gumus', 'silver'),
+    'transparent': ('seffaf', 'transparent', 'natural', 'naturel'),
+}
+
+_FOLD = str.maketrans('ıİşŞğĞüÜöÖçÇ', 'iissgguuoocc')
+
+
+def fold(text):
+    """Türkçe karakterleri sadeleştir ve küçük harfe çevir"""
+    return (text or '').translate(_FOLD).lower()
+
+
+_MATERIAL_ALIASES = {alias: name for name, names in MATERIALS.items() for alias in names}
+_COLOR_ALIASES = {alias: name for name, names in COLORS.items() for alias in names}
+
+
+@lru_cache(maxsize=None)
+def _patterns():
+    """Düzenli ifadeler ilk ayrıştırmada derlenir (açılışı yavaşlatmasın)"""
+    def alternation(aliases):
+        # Uzun yazımlar önce denenir: 'silk pla', 'pla'dan önce eşleşmeli
+        ordered = sorted(aliases, key=len, reverse=True)
+        return re.compile(r'(?<![a-z0-9])(' + '|'.join(re.escape(a) for a in ordered) + r')(?![a-z0-9+])')
+
+    return (
+        alternation(_MATERIAL_ALIASES),
+        alternation(_COLOR_ALIASES),
+        re.compile(r'(?<![0-9.,])(1[.,]75|2[.,]85|3(?:[.,]0+)?)\s*mm'),
+        re.compile(r'(?<![0-9.,])(\d+(?:[.,]\d+)?)\s*(kg|gr|g)(?![a-z])'),
+    )
+
+
+def _find(pattern, aliases, *texts):
+    for text in texts:
+        match = pattern.search(text)
+        if match:
+            return aliases[match.group(1)]
+    return None
+
+
+def normalize_material(value):
+    """Kullanıcının yazdığı malzemeyi normal ada çevir (tanınmıyorsa sadeleştirilmiş hali)"""
+    value = fold(value).strip()
+    return _MATERIAL_ALIASES.get(value, value) or None
+
+
+def normalize_color(value):
+    """Kullanıcının yazdığı rengi normal ada çevir (tanınmıyorsa sadeleştirilmiş hali)"""
+    value = fold(value).strip()
+    return _COLOR_ALIASES.get(value, value) or None
+
+
+def normalize_diameter(value):
+    """'1,75mm', '1.75' veya 1.75 -> '1.75'"""
+    if value in (None, ''):
+        return None
+    text = str(value).lower().replace('mm', '').replace(',', '.').strip()
+    return f"{float(text):.2f}"
+
+
+def normalize_weight(value, unit=None):
+    """
+    ('1', 'kg'), ('0,5', 'kg'), ('500', 'gr'), '1000g' veya '1 kg' -> '1kg', '500g', '500g', '1kg', '1kg'
+
+    Birim verilmezse değerin sonundan okunur (yoksa gram); sayı olarak
+    okunamayan metin sadeleştirilmiş haliyle döner.
+    """
+    if value in (None, ''):
+        return None
+    if unit is None:
+        match = re.fullmatch(r'(\d+(?:[.,]\d+)?)\s*(kg|gr|g)?', fold(str(value)).strip())
+        if match is None:
+            return fold(str(value)).replace(' ', '') or None
+        value, unit = match.groups()
+    grams = float(str(value).replace(',', '.')) * (1000 if unit == 'kg' else 1)
+    if grams >= 1000:
+        return f"{grams / 1000:g}kg"
+    return f"{grams:g}g"
+
+
+@lru_cache(maxsize=8192)
+def parse_attributes(product, variant=''):
+    """
+    Başlıklardan malzeme, renk, çap ve ağırlığı çıkar
+
+    Malzeme önce ürün, renk ve ağırlık önce varyant başlığında aranır.
+
+    Returns:
+        Attributes: Bulunamayan alanlar None
+    """
+    material_re, color_re, diameter_re, weight_re = _patterns()
+    product = fold(product)
+    variant = fold(variant)
+    diameter = diameter_re.search(product) or diameter_re.search(variant)
+    weight = weight_re.search(variant) or weight_re.search(product)
+    return Attributes(
+        _find(material_re, _MATERIAL_ALIASES, product, variant),
+        _find(color_re, _COLOR_ALIASES, variant, product),
+        normalize_diameter(diameter.group(1)) if diameter else None,
+        normalize_weight(*weight.groups()) if weight else None,
+    )
+
+
+def row_attributes(row):
+    """Varyant satırının özellikleri"""
+    return parse_attributes(row.get('product', ''), row.get('variant', ''))
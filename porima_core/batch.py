@@ -0,0 +1,255 @@
+"""
+Sayfa bazlı sütunsal satır yığınları
+====================================
+
+Her ``/products.json`` sayfası tek adımda ayrıştırılır, sınıflandırılır ve
+satırlara çevrilir. Sonuç sözlük listesi değil, sütunlardan oluşan bir
+``RowBatch``'tir (``array`` + metin listeleri); süreçler arasında küçük ve
+hızlı taşınır.
+
+Her ürün için karşılaştırmaya giren alanlarının (başlık, adres, varyant
+adları, stok ve fiyatlar) CRC32 özeti de tutulur; özet önceki turla aynıysa
+hat ürünün önceki satırlarını yeniden kullanır ve karşılaştırmayı atlar.
+
+``BatchParser`` sayfaları bir süreç havuzunda işler: sayfa indiği anda
+havuza verilir, ayrıştırma sonraki sayfaların indirilmesiyle paralel
+yürür. ``workers`` 0 veya 1 ise aynı iş süreç içinde yapılır. Havuz gevent
+ile yamalanmış süreçlerde (web arayüzü) kullanılmamalıdır; fork edilen
+çocuklarda yamalı kilitler ve borular çalışmaz.
+"""
+
+import json
+import zlib
+from array import array
+
+from .classify import FILAMENT_KEYWORDS, is_filament
+
+
+class RowBatch:
+    """
+    Sütunsal varyant satırları
+
+    Ürün alanları ürün başına bir kez, varyant alanları varyant başına
+    tutulur; ``variant_product`` varyantın ürün indeksidir.
+    """
+
+    __slots__ = (
+        'product_count', 'filament_count',
+        'product_ids', 'product_titles', 'urls', 'product_hashes',
+        'variant_ids', 'variant_product', 'variant_titles', 'available', 'prices',
+    )
+
+    def __init__(self):
+        self.product_count = 0  # Sayfadaki tüm ürünler (sınıflandırmadan önce)
+        self.filament_count = 0
+        self.product_ids = array('Q')
+        self.product_titles = []
+        self.urls = []
+        self.product_hashes = array('I')
+        self.variant_ids = array('Q')
+        self.variant_product = array('I')
+        self.variant_titles = []
+        self.available = bytearray()
+        self.prices = array('d')
+
+    def __len__(self):
+        return len(self.variant_ids)
+
+    def add_product(self, product, base_url):
+        """Ürünü ve varyantlarını sütunlara ekle"""
+        try:
+            product_id = int(product.get('id'))
+        except (TypeError, ValueError):
+            return
+
+        index = len(self.product_ids)
+        title = product.get('title', '')
+        url = f"{base_url}/products/{product.get('handle', '')}"
+        self.product_ids.append(product_id)
+        self.product_titles.append(title)
+        self.urls.append(url)
+
+        fields = [title, url]  # Özeti alınan alanlar
+        for variant in product.get('variants', []):
+            try:
+                variant_id = int(variant.get('id'))
+            except (TypeError, ValueError):
+                continue
+            price = variant.get('price', '0')
+            variant_title = variant.get('title', 'Varsayılan')
+            available = 1 if variant.get('available', False) else 0
+            self.variant_ids.append(variant_id)
+            self.variant_product.append(index)
+            self.variant_titles.append(variant_title)
+            self.available.append(available)
+            self.prices.append(float(price) if price else 0)
+            fields += (str(variant_id), variant_title, str(available), str(price))
+
+        self.product_hashes.append(zlib.crc32('\x1f'.join(fields).encode('utf-8')))
+
+    def row(self, i):
+        """i. varyantı satır sözlüğü olarak çöz"""
+        p = self.variant_product[i]
+        return {
+            'product_id': str(self.product_ids[p]),
+            'variant_id': str(self.variant_ids[i]),
+            'product': self.product_titles[p],
+            'variant': self.variant_titles[i],
+            'available': bool(self.available[i]),
+            'price': self.prices[i],
+            'url': self.urls[p],
+        }
+
+    def rows(self, start=0, end=None):
+        for i in range(start, len(self.variant_ids) if end is None else end):
+            yield self.row(i)
+
+    def products(self):
+        """
+        Ürünler ve varyant aralıkları (varyantlar ürün sırasıyla ardışıktır)
+
+        Yields:
+            tuple: (ürün indeksi, başlangıç, bitiş)
+        """
+        variant_product = self.variant_product
+        end = 0
+        for p in range(len(self.product_ids)):
+            start = end
+            while end < len(variant_product) and variant_product[end] == p:
+                end += 1
+            yield p, start, end
+
+    def extend(self, other, seen=None):
+        """
+        Başka bir yığını sona ekle
+
+        Args:
+            seen: Daha önce eklenmiş variant_id kümesi; verilirse tekrar
+                eden varyantlar (tarama sırasında kayan sayfalar) atlanır
+        """
+        self.product_count += other.product_count
+        self.filament_count += other.filament_count
+        offset = len(self.product_ids)
+        self.product_ids.extend(other.product_ids)
+        self.product_titles.extend(other.product_titles)
+        self.urls.extend(other.urls)
+        self.product_hashes.extend(other.product_hashes)
+
+        if seen is None or seen.isdisjoint(other.variant_ids):
+            # Sık durum: tekrar yok, sütunlar toplu kopyalanır
+            self.variant_ids.extend(other.variant_ids)
+            self.variant_product.extend(p + offset for p in other.variant_product)
+            self.variant_titles.extend(other.variant_titles)
+            self.available.extend(other.available)
+            self.prices.extend(other.prices)
+            if seen is not None:
+                seen.update(other.variant_ids)
+            return
+
+        for i, variant_id in enumerate(other.variant_ids):
+            if variant_id in seen:
+                continue
+            seen.add(variant_id)
+            self.variant_ids.append(variant_id)
+            self.variant_product.append(other.variant_product[i] + offset)
+            self.variant_titles.append(other.variant_titles[i])
+            self.available.append(other.available[i])
+            self.prices.append(other.prices[i])
+
+    def drop_seen(self, seen):
+        """
+        Daha önce görülmüş ürünleri ve varyantlarını çıkar
+
+        Koleksiyonlar kesiştiğinde aynı ürün birden fazla sayfada gelir;
+        ilk gelen geçerlidir. Yeni ürünler ``seen`` kümesine eklenir.
+
+        Returns:
+            RowBatch: Tekrar yoksa kendisi, varsa yeni yığın
+        """
+        if seen.isdisjoint(self.product_ids):
+            seen.update(self.product_ids)
+            return self
+
+        batch = RowBatch()
+        remap = {}
+        for p, product_id in enumerate(self.product_ids):
+            if product_id in seen:
+                continue
+            seen.add(product_id)
+            remap[p] = len(batch.product_ids)
+            batch.product_ids.append(product_id)
+            batch.product_titles.append(self.product_titles[p])
+            batch.urls.append(self.urls[p])
+            batch.product_hashes.append(self.product_hashes[p])
+
+        dropped = len(self.product_ids) - len(batch.product_ids)
+        batch.product_count = self.product_count - dropped
+        batch.filament_count = self.filament_count - dropped
+
+        for i, p in enumerate(self.variant_product):
+            if p not in remap:
+                continue
+            batch.variant_ids.append(self.variant_ids[i])
+            batch.variant_product.append(remap[p])
+            batch.variant_titles.append(self.variant_titles[i])
+            batch.available.append(self.available[i])
+            batch.prices.append(self.prices[i])
+        return batch
+
+
+def parse_page(body, base_url, keywords=FILAMENT_KEYWORDS):
+    """
+    Sayfa gövdesini ayrıştır, filamentleri seç ve sütunlara çevir
+
+    Havuz süreçlerinde çalışır; modül seviyesinde olmalıdır.
+
+    Args:
+        keywords: Filament anahtar kelimeleri (boş/None: süzmeden hepsini al,
+            koleksiyon taramasında ürünler zaten filamenttir)
+    """
+    batch = RowBatch()
+    products = json.loads(body).get('products', [])
+    batch.product_count = len(products)
+    for product in products:
+        if not keywords or is_filament(product, keywords):
+            batch.filament_count += 1
+            batch.add_product(product, base_url)
+    return batch
+
+
+class BatchParser:
+    """
+    Args:
+        base_url: Ürün adresleri için mağaza adresi
+        keywords: Filament anahtar kelimeleri (None: süzme)
+        workers: Süreç havuzu boyutu (0/1: süreç içinde ayrıştır)
+    """
+
+    def __init__(self, base_url, keywords=FILAMENT_KEYWORDS, workers=0):
+        self.base_url = base_url
+        self.keywords = keywords
+        self.workers = workers
+        self._pool = None
+
+    def submit(self, body):
+        """Sayfayı ayrıştırmaya ver; RowBatch üreten Future döndür"""
+        # concurrent.futures (ve logging) açılışta değil ilk sayfada yüklenir
+        from concurrent.futures import Future, ProcessPoolExecutor
+
+        if self.workers and self.workers > 1:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool.submit(parse_page, body, self.base_url, self.keywords)
+
+        future = Future()
+        try:
+            future.set_result(parse_page(body, self.base_url, self.keywords))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def close(self):
+        """Havuz süreçlerini kapat"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,92 @@
+"""
+Server-Sent Events yayıncısı
+============================
+
+Her olay bir kez SSE çerçevesine (bytes) kodlanır ve aynı çerçeve tüm
+abonelerin kuyruğuna bırakılır; istemci başına serileştirme yapılmaz.
+Kuyruğu dolan (yavaş) abone düşürülür, EventSource ``Last-Event-ID`` ile
+yeniden bağlanıp kaldığı yerden devam eder.
+"""
+
+import json
+import queue
+import threading
+
+
+KEEPALIVE = b': keepalive\n\n'
+
+
+def encode_frame(event, data, event_id=None):
+    """Olayı SSE çerçevesine kodla"""
+    payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str)
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    for line in payload.splitlines() or ['']:
+        lines.append(f"data: {line}")
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+class Broadcaster:
+    """
+    Tek kaynaktan çok aboneye SSE dağıtımı
+
+    Args:
+        max_pending: Abone başına bekleyebilecek en fazla çerçeve
+    """
+
+    def __init__(self, max_pending=256):
+        self.max_pending = max_pending
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """Yeni abone kuyruğu oluştur"""
+        subscriber = queue.Queue(maxsize=self.max_pending)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def publish(self, event, data, event_id=None):
+        """Olayı bir kez kodla ve tüm abonelere dağıt"""
+        frame = encode_frame(event, data, event_id)
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(frame)
+            except queue.Full:
+                # Yavaş abone: bağlantıyı kapat, Last-Event-ID ile geri gelir
+                self.unsubscribe(subscriber)
+                try:
+                    subscriber.get_nowait()
+                    subscriber.put_nowait(None)
+                except (queue.Empty, queue.Full):
+                    pass
+
+        return frame
+
+    def stream(self, subscriber, keepalive=15):
+        """Abone kuyruğundaki çerçeveleri üret (Flask Response gövdesi için)"""
+        try:
+            while True:
+                try:
+                    frame = subscriber.get(timeout=keepalive)
+                except queue.Empty:
+                    yield KEEPALIVE
+                    continue
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            self.unsubscribe(subscriber)
@@ -0,0 +1,65 @@
+"""
+Değişiklik yoğunluğuna göre uyarlanan kontrol aralığı
+=====================================================
+
+Değişiklik görülen kontrolden sonra aralık daraltılır, hiçbir şey
+değişmeyen her kontrolden sonra üssel olarak açılır. Geçmişte yoğun
+yeniden stoklanma görülen saatlerde ve stoklanması beklenen varyant
+varken aralık ayrıca kısaltılır. Sonuç her zaman kullanıcının verdiği
+alt/üst sınırlar içinde kalır.
+"""
+
+import time
+
+
+class AdaptiveInterval:
+    """
+    Args:
+        base: Başlangıç aralığı (saniye)
+        min_interval / max_interval: Kullanıcı sınırları (saniye)
+        backoff: Değişiklik olmayan kontrolden sonra çarpan
+        tighten: Değişiklik olan kontrolden sonra çarpan
+        restock_stats: Yoğun saat / beklenen stoklanma bilgisi için RestockStats (opsiyonel)
+    """
+
+    def __init__(self, base=300, min_interval=60, max_interval=1800, backoff=1.5,
+                 tighten=0.5, restock_stats=None):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.tighten = tighten
+        self.restock_stats = restock_stats
+        self.current = self._clamp(base)
+
+    def _clamp(self, value):
+        return max(self.min_interval, min(self.max_interval, value))
+
+    def update(self, change_count, now=None):
+        """
+        Son kontroldeki değişiklik sayısına göre bir sonraki aralığı hesapla
+
+        Returns:
+            int: Bir sonraki kontrole kadar beklenecek süre (saniye)
+        """
+        now = now or time.time()
+
+        if change_count:
+            # Çok sayıda değişiklik daha sert daraltır (en fazla üç adım)
+            steps = min(3, change_count)
+            self.current = self._clamp(self.current * (self.tighten ** steps))
+        else:
+            self.current = self._clamp(self.current * self.backoff)
+
+        interval = self.current
+        if self.restock_stats is not None:
+            # Geçmişte yoğun olan saatlerde orantılı kısalt
+            factor = self.restock_stats.busy_factor(now)
+            if factor > 1:
+                interval /= min(factor, 4)
+
+            # Bu aralık içinde stoklanması beklenen varyant varsa en kısa aralık;
+            # tahmini aralığı geçmişte kalan (gecikmiş) varyantlar sayılmaz
+            if self.restock_stats.likely_restocks(now, horizon=interval):
+                interval = self.min_interval
+
+        return int(self._clamp(interval))
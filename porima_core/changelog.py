@@ -0,0 +1,190 @@
+"""
+Yalnızca eklemeli değişiklik akışı
+==================================
+
+Her değişiklik kaydı artan bir ``offset`` alır. Son kayıtlar bellekte bir
+halka tamponda, tamamı diskte segment dosyalarında (JSON satırları) tutulur.
+Segment dosyasının adı içerdiği ilk offset'tir; böylece yeniden başlatmada
+offset'ler kaldığı yerden devam eder ve geç bağlanan istemciler herhangi bir
+offset'ten itibaren geçmişi tekrar oynatabilir.
+"""
+
+import bisect
+import json
+import os
+import threading
+from collections import deque
+
+
+class ChangeStream:
+    """
+    Args:
+        directory: Segment dosyalarının klasörü
+        ring_size: Bellekte tutulacak son kayıt sayısı
+        segment_size: Bir segment dosyasındaki en fazla kayıt
+        max_segments: Diskte tutulacak en fazla segment (eskiler silinir)
+    """
+
+    def __init__(self, directory='change_log', ring_size=1000, segment_size=5000, max_segments=50):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.ring = deque(maxlen=ring_size)
+        self.next_offset = 0
+        self._segments = []  # Segment başlangıç offset'leri (sıralı)
+        self._segment_count = 0  # Açık segmentteki kayıt sayısı
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+
+    def _segment_path(self, base):
+        return os.path.join(self.directory, f"{base:020d}.jsonl")
+
+    def _recover(self):
+        """Diskteki segmentlerden offset'i ve halka tamponu geri yükle"""
+        for name in os.listdir(self.directory):
+            if name.endswith('.jsonl'):
+                try:
+                    self._segments.append(int(name[:-6]))
+                except ValueError:
+                    continue
+        self._segments.sort()
+
+        if not self._segments:
+            return
+
+        last = self._segments[-1]
+        entries = self._repair(last)
+        self._segment_count = len(entries)
+        self.next_offset = last + len(entries)
+
+        # Halka tamponu son segment(ler)den doldur
+        tail = entries
+        for base in reversed(self._segments[:-1]):
+            if len(tail) >= self.ring.maxlen:
+                break
+            tail = list(self._read_segment(base)) + tail
+        self.ring.extend(tail[-self.ring.maxlen:])
+
+    def _repair(self, base):
+        """
+        Açık segmenti oku; çökme sırasında yarım kalmış son satırı kes
+
+        Returns:
+            list: Segmentteki sağlam kayıtlar
+        """
+        path = self._segment_path(base)
+        entries = []
+        try:
+            with open(path, 'r+b') as f:
+                good = 0
+                for line in f:
+                    try:
+                        if line.strip():
+                            entries.append(json.loads(line))
+                    except ValueError:
+                        break
+                    good += len(line)
+                if good < f.seek(0, os.SEEK_END):
+                    print(f"⚠️  Değişiklik kaydının bozuk sonu kesildi: {path}")
+                    f.truncate(good)
+                elif good and not line.endswith(b'\n'):
+                    # Satır sonu yazılamamış: sonraki kayıt bu satıra eklenmesin
+                    f.write(b'\n')
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _read_segment(self, base):
+        try:
+            with open(self._segment_path(base), 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            return
+
+    def append(self, entry):
+        """Kaydı akışa ekle ve offset'ini döndür"""
+        with self._lock:
+            if not self._segments or self._segment_count >= self.segment_size:
+                self._roll()
+
+            entry['offset'] = self.next_offset
+            self.next_offset += 1
+
+            try:
+                with open(self._segment_path(self._segments[-1]), 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                self._segment_count += 1
+            except Exception as e:
+                print(f"⚠️  Değişiklik kaydı yazılamadı: {e}")
+
+            self.ring.append(entry)
+            return entry['offset']
+
+    def _roll(self):
+        """Yeni segment aç, limit aşıldıysa en eskileri sil"""
+        base = self.next_offset
+        open(self._segment_path(base), 'a').close()
+        self._segments.append(base)
+        self._segment_count = 0
+
+        while len(self._segments) > self.max_segments:
+            oldest = self._segments.pop(0)
+            try:
+                os.remove(self._segment_path(oldest))
+            except OSError:
+                pass
+
+    def read(self, from_offset, limit=1000):
+        """from_offset ve sonrasındaki kayıtlar (eskiden yeniye)"""
+        with self._lock:
+            from_offset = max(0, from_offset)
+            if from_offset >= self.next_offset:
+                return []
+
+            # Halka tampondan doğrudan dilimle (offset'ler ardışık)
+            if self.ring and from_offset >= self.ring[0]['offset']:
+                start = from_offset - self.ring[0]['offset']
+                return [self.ring[i] for i in range(start, min(len(self.ring), start + limit))]
+
+            segments = list(self._segments)
+
+        # Tampondan eski kayıtlar diskten okunur
+        result = []
+        first = max(0, bisect.bisect_right(segments, from_offset) - 1)
+        for base in segments[first:]:
+            for entry in self._read_segment(base):
+                if entry['offset'] >= from_offset:
+                    result.append(entry)
+                    if len(result) >= limit:
+                        return result
+        return result
+
+    def latest(self, count=50):
+        """En yeni kayıtlar (yeniden eskiye)"""
+        with self._lock:
+            return [self.ring[-i] for i in range(1, min(count, len(self.ring)) + 1)]
+
+    def clear(self):
+        """
+        Görünen geçmişi temizle
+
+        Offset'ler sıfırlanmaz; yeni kayıtlar boş bir segmentten devam eder.
+        """
+        with self._lock:
+            for base in self._segments:
+                try:
+                    os.remove(self._segment_path(base))
+                except OSError:
+                    pass
+            self._segments = []
+            self.ring.clear()
+            self._roll()
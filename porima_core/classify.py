@@ -0,0 +1,66 @@
+"""
+Filament sınıflandırma ve satırlara dönüştürme
+==============================================
+
+Ürün başlığı, ürün tipi ve etiketlerinde anahtar kelime aranır. Eşleşen
+ürünlerin varyantları, web/GUI/anlık görüntünün ortak kullandığı düz
+satır biçimine çevrilir.
+
+Koleksiyon bazlı taramada ürünler zaten filament koleksiyonlarından
+gelir; anahtar kelime süzgeci orada isteğe bağlı ikinci bir geçiştir.
+"""
+
+
+# Mağazada yalnızca filament ürünlerini içeren koleksiyonlar (handle)
+FILAMENT_COLLECTIONS = (
+    '3d-yazici-filament-cesitleri',
+)
+
+
+FILAMENT_KEYWORDS = (
+    'filament', 'pla', 'abs', 'petg', 'tpu', 'asa',
+    'flex', 'nylon', 'pa', 'silk', 'rainbow',
+)
+
+
+def is_filament(product, keywords=FILAMENT_KEYWORDS):
+    """Ürün başlığı, tipi veya etiketleri anahtar kelime içeriyor mu"""
+    tags = product.get('tags') or ''
+    if not isinstance(tags, str):
+        tags = ' '.join(tags)
+
+    # Üç alan tek metinde aranır; ayraç kelimelerin alanlar arasında birleşmesini önler
+    text = '\n'.join((product.get('title') or '', product.get('product_type') or '', tags)).lower()
+    return any(kw in text for kw in keywords)
+
+
+def filter_filaments(products, keywords=FILAMENT_KEYWORDS):
+    """Sadece filament ürünlerini döndür"""
+    return [product for product in products if is_filament(product, keywords)]
+
+
+def product_rows(products, base_url):
+    """
+    Ürünlerin varyantlarını düz satırlara çevir
+
+    Returns:
+        list: [{product_id, variant_id, product, variant, available, price, url}, ...]
+    """
+    rows = []
+    for product in products:
+        product_id = str(product.get('id'))
+        title = product.get('title', '')
+        url = f"{base_url}/products/{product.get('handle', '')}"
+
+        for variant in product.get('variants', []):
+            price = variant.get('price', '0')
+            rows.append({
+                'product_id': product_id,
+                'variant_id': str(variant.get('id')),
+                'product': title,
+                'variant': variant.get('title', 'Varsayılan'),
+                'available': variant.get('available', False),
+                'price': float(price) if price else 0,
+                'url': url,
+            })
+    return rows
@@ -0,0 +1,64 @@
+"""
+Stok karşılaştırma
+==================
+
+Güncel satırlar önceki anlık görüntüyle varyant bazında karşılaştırılır.
+Anlık görüntüden yalnızca ``(available, price)`` okunur; metin alanları
+çözülmez. İlk kez görülen varyantlar değişiklik sayılmaz.
+"""
+
+from collections import namedtuple
+
+
+Changes = namedtuple('Changes', 'newly_available newly_out price_increased price_decreased')
+
+# Fiyat değişikliği kayıtlarına eklenen alanlar (satırların kendisinde bulunmaz)
+ANNOTATIONS = ('old_price', 'price_change', 'price_change_percent')
+
+# Bu farkın altındaki fiyat oynamaları yok sayılır (TL)
+PRICE_EPSILON = 0.01
+
+
+def diff_rows(previous, rows, price_epsilon=PRICE_EPSILON):
+    """
+    Args:
+        previous: ``state(variant_id)`` sağlayan anlık görüntü
+        rows: Güncel satırlar
+
+    Returns:
+        Changes: Fiyat değişikliği listelerinde satırların ``old_price``,
+        ``price_change`` ve ``price_change_percent`` eklenmiş kopyaları
+        bulunur; satırlar değiştirilmez (sonraki turda yeniden kullanılırlar)
+    """
+    changes = Changes([], [], [], [])
+
+    for current in rows:
+        prev = previous.state(current['variant_id'])
+        if prev is None:
+            continue
+        prev_available, prev_price = prev
+
+        # Stok değişiklikleri
+        if current['available'] and not prev_available:
+            changes.newly_available.append(current)
+        elif not current['available'] and prev_available:
+            changes.newly_out.append(current)
+
+        # Fiyat değişiklikleri
+        curr_price = current.get('price', 0)
+        if curr_price > prev_price + price_epsilon:  # Zam
+            target = changes.price_increased
+        elif curr_price < prev_price - price_epsilon:  # İndirim
+            target = changes.price_decreased
+        else:
+            continue
+
+        price_change = abs(curr_price - prev_price)
+        target.append(dict(
+            current,
+            old_price=prev_price,
+            price_change=price_change,
+            price_change_percent=(price_change / prev_price * 100) if prev_price > 0 else 0,
+        ))
+
+    return changes
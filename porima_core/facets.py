@@ -0,0 +1,222 @@
+"""
+Sütunsal özellik dizinleri ve filtre sayıları
+=============================================
+
+Her varyantın malzeme, renk, çap ve ağırlığı ilk görüldüğünde bir kez
+ayrıştırılır ve sütunlara (``array('H')``) değer kodu olarak yazılır; kod
+0 "bilinmiyor"dur. Her sütun değeri için (stokta, toplam) sayıları tutulur
+ve karşılaştırma sonucuyla artımlı güncellenir:
+
+    yeni varyant          -> ayrıştırılır, toplamlara eklenir
+    newly_available / out -> yalnızca o varyantın sayıları kayar
+    başlığı değişmiş      -> yeniden ayrıştırılır, sayılar yeni değerlere kayar
+    taramada yok          -> (commit'te) sayılardan düşülür
+
+Böylece filtre seçenekleri ve sayıları katalogu yeniden taramadan, değer
+sayısıyla orantılı sürede okunur.
+"""
+
+import threading
+from array import array
+
+from .attributes import normalize_color, normalize_diameter, normalize_material, normalize_weight, row_attributes
+
+
+FACETS = ('material', 'color', 'diameter', 'weight')
+
+_NORMALIZE = {
+    'material': normalize_material,
+    'color': normalize_color,
+    'diameter': normalize_diameter,
+    'weight': normalize_weight,
+}
+
+
+def _title_hash(row):
+    """Özelliklerin ayrıştırıldığı başlıkların özeti"""
+    return hash((row.get('product') or '', row.get('variant') or ''))
+
+
+class FacetIndex:
+    """
+    Varyant özellik sütunları ve değer başına stok sayıları
+
+    Varyantın konumu eklendiği sırayla verilir ve değişmez; kaldırılan
+    varyantlar işaretlenir, ölü konumlar yarıyı geçince sütunlar sıkıştırılır.
+    """
+
+    def __init__(self):
+        self.positions = {}  # variant_id -> konum
+        self.columns = {name: array('H') for name in FACETS}
+        self.values = {name: [None] for name in FACETS}  # kod -> değer
+        self.codes = {name: {None: 0} for name in FACETS}  # değer -> kod
+        self.counts = {name: [[0, 0]] for name in FACETS}  # kod -> [stokta, toplam]
+        self.variant_ids = array('Q')
+        self.titles = array('q')  # Konum -> başlık özeti
+        self.available = bytearray()
+        self.alive = bytearray()
+        self.dead = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.positions)
+
+    @classmethod
+    def from_rows(cls, rows):
+        index = cls()
+        for row in rows:
+            index._add(row)
+        return index
+
+    # --- Güncelleme ---
+
+    def _code(self, name, value):
+        code = self.codes[name].get(value)
+        if code is None:
+            code = self.codes[name][value] = len(self.values[name])
+            self.values[name].append(value)
+            self.counts[name].append([0, 0])
+        return code
+
+    def _count(self, pos, available, total):
+        for name in FACETS:
+            counts = self.counts[name][self.columns[name][pos]]
+            counts[0] += available
+            counts[1] += total
+
+    def _add(self, row):
+        try:
+            variant_id = int(row['variant_id'])
+        except (KeyError, TypeError, ValueError):
+            return
+        available = 1 if row.get('available') else 0
+        pos = self.positions.get(variant_id)
+        if pos is not None:
+            if self.available[pos] != available:
+                self.available[pos] = available
+                self._count(pos, 1 if available else -1, 0)
+            return
+
+        attributes = row_attributes(row)
+        pos = self.positions[variant_id] = len(self.variant_ids)
+        for name in FACETS:
+            self.columns[name].append(self._code(name, getattr(attributes, name)))
+        self.variant_ids.append(variant_id)
+        self.titles.append(_title_hash(row))
+        self.available.append(available)
+        self.alive.append(1)
+        self._count(pos, available, 1)
+
+    def _reparse(self, pos, row, title):
+        """Başlığı değişen varyantın özelliklerini yeniden ayrıştır"""
+        available = self.available[pos]
+        self._count(pos, -available, -1)
+        attributes = row_attributes(row)
+        for name in FACETS:
+            self.columns[name][pos] = self._code(name, getattr(attributes, name))
+        self.titles[pos] = title
+        self._count(pos, available, 1)
+
+    def _set_available(self, variant_id, available):
+        pos = self.positions.get(int(variant_id))
+        if pos is None or self.available[pos] == available:
+            return
+        self.available[pos] = available
+        self._count(pos, 1 if available else -1, 0)
+
+    def apply(self, rows, changes):
+        """
+        Bir sayfanın karşılaştırma sonucunu uygula
+
+        Bilinen varyantlarda stok değişiklikleri işlenir ve başlığı
+        değişenler yeniden ayrıştırılır; dizinde olmayan satırlar
+        ayrıştırılıp eklenir.
+        """
+        with self._lock:
+            for item in changes.newly_available:
+                self._set_available(item['variant_id'], 1)
+            for item in changes.newly_out:
+                self._set_available(item['variant_id'], 0)
+            positions = self.positions
+            titles = self.titles
+            for row in rows:
+                try:
+                    pos = positions.get(int(row['variant_id']))
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if pos is None:
+                    self._add(row)
+                    continue
+                title = _title_hash(row)
+                if titles[pos] != title:
+                    self._reparse(pos, row, title)
+
+    def retain(self, variant_ids):
+        """Kümede olmayan varyantları sayılardan düş (tarama bitince)"""
+        with self._lock:
+            removed = [v for v in self.positions if v not in variant_ids]
+            for variant_id in removed:
+                pos = self.positions.pop(variant_id)
+                self._count(pos, -self.available[pos], -1)
+                self.alive[pos] = 0
+            self.dead += len(removed)
+            if self.dead > len(self.positions):
+                self._compact()
+
+    def _compact(self):
+        keep = [pos for pos in range(len(self.alive)) if self.alive[pos]]
+        for name in FACETS:
+            column = self.columns[name]
+            self.columns[name] = array('H', (column[pos] for pos in keep))
+        self.variant_ids = array('Q', (self.variant_ids[pos] for pos in keep))
+        self.titles = array('q', (self.titles[pos] for pos in keep))
+        self.available = bytearray(self.available[pos] for pos in keep)
+        self.alive = bytearray(b'\x01') * len(keep)
+        self.positions = {variant_id: pos for pos, variant_id in enumerate(self.variant_ids)}
+        self.dead = 0
+
+    # --- Sorgular ---
+
+    def attributes(self, variant_id):
+        """Varyantın özellikleri {facet: değer} (dizinde yoksa None)"""
+        try:
+            variant_id = int(variant_id)
+        except (TypeError, ValueError):
+            return None
+        # Sıkıştırma konumları değiştirirken başka thread'den okunabilir (GUI)
+        with self._lock:
+            pos = self.positions.get(variant_id)
+            if pos is None:
+                return None
+            return {name: self.values[name][self.columns[name][pos]] for name in FACETS}
+
+    def summary(self, in_stock_only=False):
+        """
+        Filtre seçenekleri ve sayıları
+
+        Returns:
+            dict: {facet: [{'value', 'in_stock', 'total'}, ...]} toplama göre
+            azalan; hiç varyantı kalmamış değerler ve "bilinmiyor" hariç
+        """
+        with self._lock:
+            result = {}
+            for name in FACETS:
+                values = self.values[name]
+                options = [
+                    {'value': values[code], 'in_stock': in_stock, 'total': total}
+                    for code, (in_stock, total) in enumerate(self.counts[name])
+                    if code and total and (in_stock or not in_stock_only)
+                ]
+                options.sort(key=lambda o: (-o['total'], o['value']))
+                result[name] = options
+            return result
+
+    def matches(self, variant_id, **selected):
+        """Varyant seçili değerlerin hepsine uyuyor mu (None/boş: herhangi)"""
+        attributes = self.attributes(variant_id)
+        if attributes is None:
+            return not any(selected.values())
+        for name, value in selected.items():
+            if value and attributes.get(name) != _NORMALIZE[name](value):
+                return False
+        return True
@@ -0,0 +1,183 @@
+"""
+Shopify ürün kataloğu çekici
+============================
+
+``/products.json`` sayfaları boş sayfa gelene kadar sırayla çekilir.
+Koleksiyonlar verilirse tüm mağaza yerine yalnızca
+``/collections/<handle>/products.json`` sayfaları çekilir; birden fazla
+koleksiyon aynı anda (koleksiyon başına bir iş parçacığı) taranır.
+``RunState`` verilirse sayfalar önceki taramanın ETag/Last-Modified
+değerleriyle koşullu istenir; 304 dönen (veya gövdesi aynı kalan) sayfalar
+önbellekten okunur. Sayfalar indikçe üretilir, ayrıştırma çağırana kalır.
+"""
+
+import json
+import time
+
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/json',
+    'Accept-Language': 'tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7',
+}
+
+
+class ProductFetcher:
+    """
+    Args:
+        base_url: Mağaza adresi
+        delay: Sayfalar arası bekleme (saniye, rate limiting)
+        run_state: Koşullu istekler için RunState (opsiyonel)
+        page_size: Sayfa başına ürün
+        timeout: İstek zaman aşımı (saniye)
+        session: Hazır HTTP oturumu (varsayılan: ilk istekte oluşturulur)
+        collections: Taranacak koleksiyonlar (handle veya ``/collections/<handle>``;
+            None: tüm mağaza)
+
+    Son taramanın sonucu ``failed``, ``unchanged`` ve ``page_count``
+    niteliklerinde tutulur.
+    """
+
+    def __init__(self, base_url, delay=0.3, run_state=None, page_size=250, timeout=30, session=None,
+                 collections=None):
+        self.base_url = base_url
+        self.collections = [c.rstrip('/').rsplit('/', 1)[-1] for c in collections or ()]
+        self.delay = delay
+        self.run_state = run_state
+        self.page_size = page_size
+        self.timeout = timeout
+        self.failed = False
+        self.unchanged = False
+        self.page_count = 0
+        self._session = session
+
+    @property
+    def session(self):
+        """HTTP oturumu (requests ilk istekte yüklenir)"""
+        if self._session is None:
+            import requests
+
+            self._session = requests.Session()
+            self._session.headers.update(DEFAULT_HEADERS)
+        return self._session
+
+    def page_url(self, page, collection=None):
+        prefix = f"{self.base_url}/collections/{collection}" if collection else self.base_url
+        return f"{prefix}/products.json?limit={self.page_size}&page={page}"
+
+    def pages(self):
+        """
+        Sayfaları çek; her dolu sayfa indiği anda üretilir
+
+        Gövdeler burada ayrıştırılmaz (bkz. ``BatchParser``); boş son sayfa
+        yalnızca küçük gövdeler açılarak tanınır. Birden fazla koleksiyonun
+        sayfaları geldikleri sırayla karışık üretilir; koleksiyonlarda
+        ortak olan ürünleri ayıklamak çağırana kalır.
+
+        Yields:
+            tuple: (url, gövde) - gövde None ise sayfa değişmemiştir ve
+            ``cached_body(url)`` ile önbellekten okunur
+        """
+        self.failed = False
+        self.unchanged = self.run_state is not None
+        self.page_count = 0
+
+        if len(self.collections) > 1:
+            crawl = self._crawl_concurrently(self.collections)
+        else:
+            crawl = self._crawl(self.collections[0] if self.collections else None)
+
+        for url, body in crawl:
+            self.page_count += 1
+            yield url, body
+
+    def _crawl_concurrently(self, collections):
+        """Her koleksiyonu ayrı iş parçacığında tara, sayfaları tek kuyruktan üret"""
+        import queue
+        import threading
+
+        results = queue.Queue()
+        stop = threading.Event()
+
+        def crawl(collection):
+            try:
+                for item in self._crawl(collection):
+                    results.put(item)
+                    if stop.is_set():
+                        return
+            except Exception as e:
+                print(f"❌ Koleksiyon taranamadı ({collection}): {e}")
+                self.failed = True
+            finally:
+                results.put(None)
+
+        self.session  # Oturum iş parçacıkları başlamadan bir kez oluşturulur
+        for collection in collections:
+            threading.Thread(target=crawl, args=(collection,), daemon=True).start()
+
+        remaining = len(collections)
+        try:
+            while remaining:
+                item = results.get()
+                if item is None:
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            # Çağıran taramayı yarıda bırakırsa iş parçacıkları sonraki sayfada durur
+            stop.set()
+
+    def _crawl(self, collection=None):
+        """Tek bir kaynağın (mağaza veya koleksiyon) sayfalarını sırayla çek"""
+        import requests
+
+        state = self.run_state
+        page = 1
+
+        while True:
+            url = self.page_url(page, collection)
+            try:
+                headers = state.request_headers(url) if state is not None else None
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+
+                if state is not None and (response.status_code == 304 or (
+                    response.ok and state.is_unchanged(url, response.content)
+                )):
+                    body = None
+                    empty = state.page_count(url) == 0
+                else:
+                    response.raise_for_status()
+                    body = response.content
+                    empty = _is_empty_page(body)
+                    if state is not None:
+                        state.remember(url, response.headers, body, 0 if empty else None)
+                    self.unchanged = False
+
+            except requests.exceptions.RequestException as e:
+                print(f"❌ Ürünler alınamadı ({collection or 'mağaza'}, sayfa {page}): {e}")
+                self.failed = True
+                return
+            except json.JSONDecodeError as e:
+                print(f"❌ JSON parse hatası: {e}")
+                self.failed = True
+                return
+
+            if empty:
+                return
+
+            yield url, body
+            page += 1
+
+            # Rate limiting için bekle
+            time.sleep(self.delay)
+
+    def cached_body(self, url):
+        """Değişmemiş sayfanın önbellekteki gövdesi"""
+        return self.run_state.cached_body(url)
+
+
+def _is_empty_page(body):
+    """Ürün içermeyen sayfa mı (dolu sayfalar ayrıştırılmadan elenir)"""
+    if len(body) > 256:
+        return False
+    return not json.loads(body).get('products')
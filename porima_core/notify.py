@@ -0,0 +1,270 @@
+"""
+Arka plan bildirim dağıtıcısı
+=============================
+
+Takip döngüsü bildirimleri sadece kuyruğa bırakır; gönderim ayrı bir
+worker thread'inde yapılır. Kısa sürede gelen bildirimler toplanır,
+her hedef (sink) kendi hız sınırına göre gönderir ve birikenler tek bir
+özet bildirimde birleştirilir.
+"""
+
+import importlib.util
+import queue
+import threading
+import time
+
+
+_STOP = object()
+
+
+class NotificationSink:
+    """
+    Bildirim hedefi temel sınıfı
+
+    Args:
+        min_interval: İki gönderim arasındaki en kısa süre (saniye)
+        summary_threshold: Bu sayıdan fazla bekleyen bildirim özetlenir
+    """
+
+    name = 'sink'
+
+    def __init__(self, min_interval=0, summary_threshold=3):
+        self.min_interval = min_interval
+        self.summary_threshold = summary_threshold
+        self.pending = []
+        self.next_allowed = 0
+
+    def enabled(self):
+        return True
+
+    def send(self, title, message, items):
+        raise NotImplementedError
+
+    def flush(self, now, force=False):
+        """Hız sınırı izin veriyorsa bekleyen bildirimleri gönder"""
+        if not self.pending or (not force and now < self.next_allowed):
+            return
+
+        batch, self.pending = self.pending, []
+        self.next_allowed = now + self.min_interval
+
+        if not self.enabled():
+            return
+
+        if len(batch) > self.summary_threshold:
+            notifications = [summarize(batch)]
+        else:
+            notifications = batch
+
+        for notification in notifications:
+            try:
+                self.send(notification['title'], notification['message'], notification['items'])
+            except Exception as e:
+                print(f"⚠️  Bildirim gönderilemedi ({self.name}): {e}")
+
+
+def summarize(batch):
+    """Bildirim grubunu tek bir özet bildirime dönüştür"""
+    items = [item for notification in batch for item in notification['items']]
+    names = [notification['message'] for notification in batch[:3]]
+    message = '\n'.join(names)
+    if len(batch) > 3:
+        message += f"\n... ve {len(batch) - 3} bildirim daha"
+    return {
+        'title': f"🎉 {len(batch)} yeni bildirim",
+        'message': message,
+        'items': items,
+    }
+
+
+class ConsoleSink(NotificationSink):
+    """Konsola yazdır"""
+
+    name = 'console'
+
+    def __init__(self, min_interval=0, summary_threshold=20):
+        super().__init__(min_interval, summary_threshold)
+
+    def send(self, title, message, items):
+        print(f"\n🔔 {title}")
+        for line in message.splitlines():
+            print(f"   {line}")
+
+
+class DesktopSink(NotificationSink):
+    """
+    plyer masaüstü bildirimi ve Windows uyarı sesi
+
+    Args:
+        toast_enabled / sound_enabled: Gönderim anında çağrılan ayar fonksiyonları
+    """
+
+    name = 'desktop'
+
+    def __init__(self, min_interval=5, summary_threshold=3, toast_enabled=None, sound_enabled=None):
+        super().__init__(min_interval, summary_threshold)
+        self.toast_enabled = toast_enabled or (lambda: True)
+        self.sound_enabled = sound_enabled or (lambda: True)
+
+        # Modüller sadece aranır; yükleme ilk bildirimde yapılır
+        self.toast_supported = importlib.util.find_spec('plyer') is not None
+        self.sound_supported = importlib.util.find_spec('winsound') is not None
+
+    def send(self, title, message, items):
+        if self.toast_supported and self.toast_enabled():
+            from plyer import notification
+
+            notification.notify(
+                title=title,
+                message=message[:256],  # Maksimum karakter sınırı
+                app_name="Porima Stok Takip",
+                timeout=10,
+            )
+
+        if self.sound_supported and self.sound_enabled():
+            import winsound
+
+            winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
+
+
+class WebhookSink(NotificationSink):
+    """Bildirimi JSON olarak bir URL'ye POST et"""
+
+    name = 'webhook'
+
+    def __init__(self, url, min_interval=1, summary_threshold=10, timeout=10):
+        super().__init__(min_interval, summary_threshold)
+        self.url = url
+        self.timeout = timeout
+        self._session = None
+
+    def send(self, title, message, items):
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+
+        response = self._session.post(self.url, json={
+            'title': title,
+            'message': message,
+            'items': items,
+        }, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class EmailSink(NotificationSink):
+    """SMTP üzerinden e-posta gönder (varsayılan: yerel test sunucusu)"""
+
+    name = 'email'
+
+    def __init__(self, recipients, host='localhost', port=1025,
+                 sender='porima-stok@localhost', min_interval=60, summary_threshold=1):
+        super().__init__(min_interval, summary_threshold)
+        self.recipients = recipients
+        self.host = host
+        self.port = port
+        self.sender = sender
+
+    def send(self, title, message, items):
+        import smtplib
+        from email.message import EmailMessage
+
+        mail = EmailMessage()
+        mail['Subject'] = title
+        mail['From'] = self.sender
+        mail['To'] = ', '.join(self.recipients)
+        mail.set_content(message)
+
+        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+            smtp.send_message(mail)
+
+
+class NotificationDispatcher:
+    """
+    Kuyruk + worker thread ile bildirim dağıtıcısı
+
+    Args:
+        sinks: Bildirim hedefleri
+        batch_window: Bir bildirimden sonra aynı gruba toplanacak süre (saniye)
+        max_queue: Kuyruk kapasitesi; dolunca yeni bildirimler düşürülür
+    """
+
+    def __init__(self, sinks=None, batch_window=1.0, max_queue=1000):
+        self.sinks = list(sinks or [])
+        self.batch_window = batch_window
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def submit(self, title, message, item=None):
+        """Bildirimi kuyruğa bırak - asla beklemez"""
+        self._ensure_started()
+        try:
+            self.queue.put_nowait({
+                'title': title,
+                'message': message,
+                'items': [item] if item is not None else [],
+            })
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=5):
+        """Bekleyen bildirimleri hız sınırını yok sayarak gönder ve worker'ı durdur"""
+        if self._thread is None:
+            return
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='notify', daemon=True)
+                self._thread.start()
+
+    def _next_timeout(self):
+        """Hız sınırı nedeniyle bekleyen en yakın gönderime kalan süre"""
+        deadlines = [sink.next_allowed for sink in self.sinks if sink.pending]
+        if not deadlines:
+            return None
+        return max(0, min(deadlines) - time.monotonic())
+
+    def _run(self):
+        stopping = False
+
+        while not stopping:
+            try:
+                first = self.queue.get(timeout=self._next_timeout())
+            except queue.Empty:
+                first = None
+
+            batch = []
+            if first is _STOP:
+                stopping = True
+            elif first is not None:
+                # Aynı patlamadaki bildirimleri topla
+                batch.append(first)
+                deadline = time.monotonic() + self.batch_window
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        notification = self.queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if notification is _STOP:
+                        stopping = True
+                        break
+                    batch.append(notification)
+
+            now = time.monotonic()
+            for sink in self.sinks:
+                sink.pending.extend(batch)
+                sink.flush(now, force=stopping)
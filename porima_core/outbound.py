@@ -0,0 +1,195 @@
+"""
+İstemci başına sınırlı giden kuyruklar
+======================================
+
+Socket.IO olayları istemciye doğrudan değil, istemcinin kuyruğu üzerinden
+gönderilir. Her istemcinin aynı anda en fazla ``max_inflight`` onaylanmamış
+(ack) çerçevesi olur; onay gelmeden yenileri kuyrukta bekler.
+
+Kuyruk ``max_pending`` çerçeveye ulaşınca bekleyenler birleştirilir:
+değişiklikler varyant başına son kayda indirilir, art arda gelen tam
+güncellemelerden yalnızca sonuncusu kalır. Böylece yavaş bir istemci için
+tutulan bellek sınırlı kalır. ``stall_timeout`` saniye boyunca hiçbir
+çerçevesini onaylamayan istemciye ``resync`` gönderilip bağlantısı kesilir;
+istemci yeniden bağlanınca verileri baştan yükler.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+# Birleştirilmiş alerts çerçevesinde tutulan en fazla uyarı
+MAX_COALESCED_ALERTS = 50
+
+
+def _change_key(entry):
+    """Aynı varyantın stok ve fiyat değişiklikleri ayrı tutulur"""
+    kind = 'stock' if entry.get('type') in ('in', 'out') else 'price'
+    return (entry.get('variant_id') or entry.get('offset'), kind)
+
+
+def _merge_changes(merged, entries):
+    for entry in entries or ():
+        key = _change_key(entry)
+        merged.pop(key, None)  # Son kayıt sona taşınır
+        merged[key] = entry
+
+
+def coalesce(frames):
+    """
+    Bekleyen çerçeveleri en güncel duruma indir
+
+    - stock_update: yalnızca sonuncusu kalır; ondan önceki değişiklikler
+      (durumu zaten içerdiği için) onun ``changes`` listesine katılır
+    - stock_changes: sonraki değişiklikler varyant başına son kayıtla tek
+      çerçevede
+    - alerts: tek çerçevede, en yeni ``MAX_COALESCED_ALERTS`` uyarı
+    - diğer olaylar: olay başına son çerçeve
+
+    Returns:
+        list: [(olay, gövde), ...]
+    """
+    update = None
+    absorbed = {}  # Son stock_update'e katılan değişiklikler (öncekilerinkiler dahil)
+    changes = {}
+    alerts = []
+    others = {}
+
+    for event, payload in frames:
+        if event == 'stock_update':
+            _merge_changes(absorbed, changes.values())
+            _merge_changes(absorbed, payload.get('changes'))
+            update = dict(payload, changes=list(absorbed.values()), coalesced=True)
+            changes = {}
+        elif event == 'stock_changes':
+            _merge_changes(changes, payload.get('changes'))
+        elif event == 'alerts':
+            alerts.extend(payload.get('alerts', ()))
+        else:
+            others.pop(event, None)
+            others[event] = payload
+
+    result = []
+    if update is not None:
+        result.append(('stock_update', update))
+    if changes:
+        result.append(('stock_changes', {'changes': list(changes.values()), 'coalesced': True}))
+    if alerts:
+        result.append(('alerts', {'alerts': alerts[-MAX_COALESCED_ALERTS:], 'coalesced': True}))
+    result.extend(others.items())
+    return result
+
+
+class ClientQueue:
+    """Tek istemcinin bekleyen ve onay bekleyen çerçeveleri"""
+
+    __slots__ = ('sid', 'pending', 'inflight', 'last_progress', 'coalesced', 'closed')
+
+    def __init__(self, sid, now):
+        self.sid = sid
+        self.pending = deque()
+        self.inflight = 0
+        self.last_progress = now  # Son onay (veya boş kuyrukla son gönderim) zamanı
+        self.coalesced = 0
+        self.closed = False
+
+
+class OutboundHub:
+    """
+    Args:
+        send: ``send(sid, olay, gövde, callback)`` - çerçeveyi gönderir, istemci
+            onaylayınca ``callback()`` çağrılmalı
+        drop: ``drop(sid, gövde)`` - istemciye resync bildirip bağlantıyı keser
+        max_pending: İstemci başına bekleyebilecek en fazla çerçeve
+        max_inflight: Onay beklenmeden gönderilebilecek en fazla çerçeve
+        stall_timeout: Onay gelmeyen istemcinin düşürülme süresi (saniye)
+    """
+
+    def __init__(self, send, drop, max_pending=32, max_inflight=4, stall_timeout=30):
+        self.send = send
+        self.drop = drop
+        self.max_pending = max_pending
+        self.max_inflight = max_inflight
+        self.stall_timeout = stall_timeout
+        self.clients = {}
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.clients)
+
+    def add(self, sid):
+        with self._lock:
+            self.clients[sid] = ClientQueue(sid, time.monotonic())
+
+    def remove(self, sid):
+        with self._lock:
+            client = self.clients.pop(sid, None)
+            if client is not None:
+                client.closed = True
+                client.pending.clear()
+
+    def push(self, sid, event, payload, now=None):
+        """Çerçeveyi istemcinin kuyruğuna bırak ve gönderilebilecekleri gönder"""
+        now = now or time.monotonic()
+        with self._lock:
+            client = self.clients.get(sid)
+            if client is None:
+                return
+
+            if client.inflight and now - client.last_progress > self.stall_timeout:
+                # Takılmış istemci: kuyruğu tutmak yerine yeniden eşitlemeye gönder
+                self.clients.pop(sid)
+                client.closed = True
+                client.pending.clear()
+                self.dropped += 1
+                stalled = True
+            else:
+                stalled = False
+                client.pending.append((event, payload))
+                if len(client.pending) >= self.max_pending:
+                    client.pending = deque(coalesce(client.pending))
+                    client.coalesced += 1
+                frames = self._take(client, now)
+
+        if stalled:
+            print(f"⚠️  Yavaş istemci düşürüldü: {sid}")
+            self.drop(sid, {'reason': 'slow_consumer', 'action': 'reload'})
+            return
+        self._send(client, frames)
+
+    def ack(self, client):
+        """İstemci bir çerçeveyi onayladı"""
+        now = time.monotonic()
+        with self._lock:
+            if client.closed:
+                return
+            client.inflight = max(0, client.inflight - 1)
+            client.last_progress = now
+            frames = self._take(client, now)
+        self._send(client, frames)
+
+    def _take(self, client, now):
+        """Onay penceresinin izin verdiği çerçeveleri kuyruktan al (kilit altında)"""
+        if not client.inflight:
+            client.last_progress = now
+        frames = []
+        while client.pending and client.inflight < self.max_inflight:
+            frames.append(client.pending.popleft())
+            client.inflight += 1
+        return frames
+
+    def _send(self, client, frames):
+        for event, payload in frames:
+            self.send(client.sid, event, payload, lambda *args, client=client: self.ack(client))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'clients': len(self.clients),
+                'pending': sum(len(c.pending) for c in self.clients.values()),
+                'inflight': sum(c.inflight for c in self.clients.values()),
+                'coalesced': sum(c.coalesced for c in self.clients.values()),
+                'dropped': self.dropped,
+            }
@@ -0,0 +1,211 @@
+"""
+Ortak stok kontrol hattı
+========================
+
+CLI, GUI ve web arayüzü aynı adımları bu sınıf üzerinden çalıştırır:
+
+    çek (ProductFetcher) -> ayrıştır + sınıflandır + sütunlara çevir
+    (BatchParser) -> karşılaştır (diff_rows) -> yeni anlık görüntüye ekle
+
+Adımlar toplu değil sayfa sayfa akar: her sayfa indiği anda karşılaştırılır
+ve değişiklikleri çağırana verilir, böylece ilk sayfalardaki stoklanma
+uyarıları tarama bitmeden gider. Bellekte aynı anda bir sayfa (havuzla
+birkaç sayfa) ve anlık görüntü kayıtları bulunur.
+
+Koleksiyonlar verilirse yalnızca izlenen koleksiyonlar taranır; birden
+fazla koleksiyonda bulunan ürün bir kez sayılır. Anahtar kelime süzgeci bu
+durumda isteğe bağlı ikinci geçiştir (``keywords=None`` ile kapatılır).
+
+Her ürünün özeti (CRC32) son kaydedilen turla aynıysa önceki satırları
+olduğu gibi yeniden kullanılır ve karşılaştırılmaz; sakin bir turda iş,
+ürün başına bir özet hesabına iner.
+
+Tarama yarıda kesilirse taranan sayfalar uygulanır, kalan varyantlar
+önceki durumlarıyla korunur; böylece gönderilmiş uyarılar sonraki turda
+tekrarlanmaz ve taranmayan varyantlar yeni sanılmaz.
+"""
+
+from collections import deque, namedtuple
+
+from .batch import BatchParser
+from .classify import FILAMENT_KEYWORDS
+from .diff import ANNOTATIONS, Changes, diff_rows
+from .fetcher import ProductFetcher
+from .snapshot import SnapshotStore
+
+
+BASE_URL = "https://porima3d.com"
+
+
+PageResult = namedtuple('PageResult', 'page rows changes')
+
+
+class CheckResult:
+    """Tek kontrolün sonucu"""
+
+    def __init__(self, rows=None, changes=None, product_count=0, filament_count=0, failed=False,
+                 unchanged=False, reused_count=0):
+        self.rows = rows or []
+        self.changes = changes or Changes([], [], [], [])
+        self.product_count = product_count
+        self.filament_count = filament_count
+        self.failed = failed
+        self.unchanged = unchanged
+        self.reused_count = reused_count  # Değişmediği için yeniden kullanılan ürünler
+
+    @property
+    def change_count(self):
+        return sum(len(items) for items in self.changes)
+
+
+class StockPipeline:
+    """
+    Args:
+        data_file: Stok verilerinin kaydedileceği dosya
+        base_url: Mağaza adresi
+        delay: Sayfalar arası bekleme (saniye)
+        run_state: Koşullu istekler için RunState (opsiyonel)
+        keywords: Filament anahtar kelimeleri (None: süzme)
+        workers: Sayfa ayrıştırma süreç havuzu boyutu (0/1: süreç içinde)
+        collections: Taranacak koleksiyonlar (None: tüm mağaza)
+        history: Tarama farklarının ekleneceği SnapshotLog (None: geçmiş tutulmaz)
+    """
+
+    def __init__(self, data_file='stock_data.json', base_url=BASE_URL, delay=0.3, run_state=None,
+                 keywords=FILAMENT_KEYWORDS, workers=0, collections=None, history=None):
+        self.base_url = base_url
+        self.keywords = keywords
+        self.fetcher = ProductFetcher(base_url, delay=delay, run_state=run_state, collections=collections)
+        self.parser = BatchParser(base_url, keywords, workers=workers)
+        self.store = SnapshotStore(data_file, history=history)
+        self.last_result = None
+
+    @property
+    def previous_stock(self):
+        """Son kaydedilen anlık görüntü"""
+        return self.store.snapshot
+
+    def close(self):
+        """Ayrıştırma havuzunu kapat"""
+        self.parser.close()
+
+    def stream(self, skip_unchanged=False):
+        """
+        Taramayı sayfa sayfa çalıştır
+
+        Her sayfa, önceki sayfalar işlenir işlenmez karşılaştırılıp üretilir.
+        Üreteç bittiğinde özet ``last_result``'tadır (satırlar hariç).
+
+        Args:
+            skip_unchanged: Hiçbir sayfa değişmemişse (ve önceki anlık görüntü
+                varsa) ayrıştırma, karşılaştırma ve kaydetme atlanır
+
+        Yields:
+            PageResult: (page, rows, changes)
+        """
+        writer = self.store.writer()
+        try:
+            yield from self._stream(writer, skip_unchanged)
+        finally:
+            # Kaydedilmeden biten (değişmemiş, boş veya yarıda bırakılan) tarama
+            self.store.discard(writer)
+
+    def _stream(self, writer, skip_unchanged):
+        skip_unchanged = skip_unchanged and len(self.store) > 0
+        fetcher = self.fetcher
+        result = self.last_result = CheckResult()
+        pending = deque()  # Sayfa sırasıyla ayrıştırılmakta olanlar
+        deferred = []  # Şimdiye kadar hiç değişmeyen sayfalar; hepsi öyle kalırsa ayrıştırılmaz
+        seen_products = set()  # Koleksiyonlar kesişir; aynı ürün ilk geldiği sayfada işlenir
+        # Havuz sayfaları indirmeden hızlı işleyemiyorsa indirme beklesin
+        max_pending = max(2, 2 * (self.parser.workers or 1))
+        page = 0
+
+        def finish(future):
+            nonlocal page
+            batch = future.result().drop_seen(seen_products)
+            result.product_count += batch.product_count
+            result.filament_count += batch.filament_count
+
+            rows = []
+            fresh = []  # Yalnızca değişen ürünlerin satırları karşılaştırılır
+            for p, start, end in batch.products():
+                product_id = batch.product_ids[p]
+                digest = batch.product_hashes[p]
+                product_rows = self.store.reusable_rows(product_id, digest)
+                if product_rows is None:
+                    product_rows = list(batch.rows(start, end))
+                    reused = False
+                else:
+                    result.reused_count += 1
+                    reused = True
+                    # Önceki sürümlerden kalmış değişiklik alanları yeni turda geçersiz
+                    for row in product_rows:
+                        for key in ANNOTATIONS:
+                            row.pop(key, None)
+                # Tarama sırasında sayfa kayarsa aynı varyant iki kez gelebilir; ilki geçerli
+                product_rows = [row for row in product_rows if writer.add(row)]
+                writer.keep_rows(product_id, digest, product_rows)
+                rows.extend(product_rows)
+                if not reused:
+                    fresh.extend(product_rows)
+
+            if self.store.history is not None:
+                # Geçmişe yalnızca yeni veya herhangi bir alanı (başlık/adres dahil) değişen varyantlar yazılır
+                writer.changed_rows.extend(row for row in fresh if self.store.changed(row))
+            changes = diff_rows(self.store, fresh)
+            self.store.apply(fresh, changes)
+            for total, items in zip(result.changes, changes):
+                total.extend(items)
+            page += 1
+            return PageResult(page, rows, changes)
+
+        try:
+            for url, body in fetcher.pages():
+                if body is None and skip_unchanged and fetcher.unchanged:
+                    deferred.append(url)
+                    continue
+                for cached_url in deferred:
+                    pending.append(self.parser.submit(fetcher.cached_body(cached_url)))
+                deferred = []
+                pending.append(self.parser.submit(body if body is not None else fetcher.cached_body(url)))
+
+                # Hazır olan (veya kuyruk dolduysa en eski) sayfaları sırayla işle
+                while pending and (pending[0].done() or len(pending) >= max_pending):
+                    yield finish(pending.popleft())
+
+            if skip_unchanged and fetcher.unchanged and not fetcher.failed:
+                result.unchanged = True
+                return
+
+            while pending:
+                yield finish(pending.popleft())
+
+        except Exception as e:
+            # Bozuk sayfa: taramanın geri kalanı güvenilmez
+            print(f"❌ Sayfa ayrıştırılamadı: {e}")
+            for future in pending:
+                future.cancel()
+            fetcher.failed = True
+
+        result.failed = fetcher.failed or not result.product_count
+        if not len(writer):
+            # Hiçbir sayfa işlenmedi: önceki anlık görüntü olduğu gibi kalır
+            return
+        if result.failed:
+            writer.add_missing(self.store.snapshot)
+        self.store.commit(writer)
+
+    def run(self, skip_unchanged=False):
+        """
+        Taramayı çalıştır ve tüm satırları topla (ekranda listelemek için)
+
+        Returns:
+            CheckResult
+        """
+        rows = []
+        for page in self.stream(skip_unchanged):
+            rows.extend(page.rows)
+        result = self.last_result
+        result.rows = rows
+        return result
@@ -0,0 +1,300 @@
+"""
+Fiyat geçmişi ve kayan pencere istatistikleri
+=============================================
+
+Her varyant için fiyat ilk görüldüğünde ve her değiştiğinde bir nokta
+kaydedilir (diskte yalnızca eklemeli JSON satırları). 7/30/90 günlük
+pencerelerin min/max/ortalaması monoton kuyruklar ve fiyat x süre
+toplamlarıyla artımlı tutulur; sorgular geçmişi taramadan cevaplanır.
+Ortalama zaman ağırlıklıdır: her fiyat geçerli kaldığı süre kadar sayılır.
+Açılışta dosya, pencereleri ve en düşük fiyatı aynen kuracak noktalara
+sıkıştırılır.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+DAY = 86400
+WINDOWS = {'7d': 7 * DAY, '30d': 30 * DAY, '90d': 90 * DAY}
+
+# Fırsat: son 30 günün ortalamasının en az bu oranda altında olmak
+DEAL_THRESHOLD = 0.05
+
+
+class RollingWindow:
+    """Zaman pencereli min/max/zaman ağırlıklı ortalama (amortize O(1))"""
+
+    def __init__(self, span):
+        self.span = span
+        self.points = deque()
+        self.area = 0.0  # Penceredeki ardışık noktalar arası fiyat x süre toplamı
+        self._min = deque()
+        self._max = deque()
+        self.carry = None  # Pencere başında geçerli olan (pencereden çıkmış) fiyat
+
+    def add(self, ts, price):
+        if self.points:
+            last_ts, last_price = self.points[-1]
+            self.area += last_price * (ts - last_ts)
+        self.points.append((ts, price))
+        while self._min and self._min[-1][1] >= price:
+            self._min.pop()
+        self._min.append((ts, price))
+        while self._max and self._max[-1][1] <= price:
+            self._max.pop()
+        self._max.append((ts, price))
+
+    def evict(self, now):
+        limit = now - self.span
+        while self.points and self.points[0][0] < limit:
+            ts, price = self.points.popleft()
+            if self.points:
+                self.area -= price * (self.points[0][0] - ts)
+            self.carry = price
+        while self._min and self._min[0][0] < limit:
+            self._min.popleft()
+        while self._max and self._max[0][0] < limit:
+            self._max.popleft()
+
+    def summary(self, current, now):
+        """Penceredeki noktalar + pencere başında geçerli fiyat üzerinden özet"""
+        if not self.points:
+            return {'min': current, 'max': current, 'mean': current, 'count': 0}
+
+        low = self._min[0][1]
+        high = self._max[0][1]
+        first_ts = self.points[0][0]
+        last_ts, last_price = self.points[-1]
+        # Son fiyat şimdiye kadar, taşınan fiyat pencere başından ilk noktaya kadar geçerli
+        area = self.area + last_price * max(0.0, now - last_ts)
+        start = first_ts
+        if self.carry is not None:
+            low = min(low, self.carry)
+            high = max(high, self.carry)
+            start = now - self.span
+            area += self.carry * (first_ts - start)
+
+        duration = now - start
+        return {
+            'min': low,
+            'max': high,
+            'mean': round(area / duration, 2) if duration > 0 else last_price,
+            'count': len(self.points),
+        }
+
+
+class VariantPrices:
+    """Tek varyantın fiyat istatistikleri"""
+
+    def __init__(self):
+        self.current = None
+        self.last_change = None
+        self.all_time_low = None
+        self.windows = {name: RollingWindow(span) for name, span in WINDOWS.items()}
+
+    def add(self, ts, price):
+        self.current = price
+        self.last_change = ts
+        if self.all_time_low is None or price < self.all_time_low:
+            self.all_time_low = price
+        for window in self.windows.values():
+            window.add(ts, price)
+            window.evict(ts)
+
+    def summary(self, now):
+        for window in self.windows.values():
+            window.evict(now)
+        return {
+            'current': self.current,
+            'all_time_low': self.all_time_low,
+            'days_since_change': round((now - self.last_change) / DAY, 2),
+            'windows': {name: window.summary(self.current, now) for name, window in self.windows.items()},
+        }
+
+
+class PriceHistory:
+    """
+    Varyant fiyat zaman serileri
+
+    Args:
+        path: Fiyat noktalarının eklendiği JSON satırları dosyası
+    """
+
+    def __init__(self, path='price_history.jsonl'):
+        self.path = path
+        self.variants = {}
+        self.deals = {}  # variant_id -> fırsat bilgisi
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        points = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    point = json.loads(line)
+                    self._add(point['v'], point['t'], point['p'])
+                    points.append(point)
+        except Exception as e:
+            print(f"⚠️  Fiyat geçmişi okunamadı: {e}")
+            return
+
+        now = time.time()
+        for variant_id in list(self.variants):
+            self._update_deal(variant_id, now)
+        self._compact(points, now)
+
+    def _compact(self, points, now):
+        """
+        Dosyayı aynı durumu kuracak noktalara indir
+
+        Varyant başına en uzun pencerenin içindeki noktalar, pencere başında
+        geçerli olan son nokta ve (daha eskiyse) en düşük fiyatın ilk
+        görüldüğü nokta tutulur.
+        """
+        cutoff = now - max(WINDOWS.values())
+        carry = {}
+        for i, point in enumerate(points):
+            if point['t'] < cutoff:
+                carry[point['v']] = i
+
+        keep = set(carry.values())
+        lowest = {}
+        for i, point in enumerate(points):
+            if point['t'] >= cutoff:
+                keep.add(i)
+            elif point['p'] == self.variants[point['v']].all_time_low:
+                lowest.setdefault(point['v'], i)
+        kept_low = {}
+        for i in keep:
+            point = points[i]
+            kept_low[point['v']] = min(point['p'], kept_low.get(point['v'], point['p']))
+        for variant_id, i in lowest.items():
+            if kept_low[variant_id] > points[i]['p']:
+                keep.add(i)
+
+        if len(keep) == len(points):
+            return
+        try:
+            with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+                for i in sorted(keep):
+                    f.write(json.dumps(points[i]) + '\n')
+            os.replace(self.path + '.tmp', self.path)
+        except Exception as e:
+            print(f"⚠️  Fiyat geçmişi sıkıştırılamadı: {e}")
+
+    def _add(self, variant_id, ts, price):
+        variant = self.variants.get(variant_id)
+        if variant is None:
+            variant = self.variants[variant_id] = VariantPrices()
+        variant.add(ts, price)
+
+    def observe(self, rows, now=None):
+        """
+        Güncel satırları işle; sadece yeni veya fiyatı değişen varyantlar kaydedilir
+
+        Returns:
+            list: Fiyat noktası eklenen variant_id'ler
+        """
+        now = now or time.time()
+        changed = []
+
+        with self._lock:
+            for row in rows:
+                variant_id = row['variant_id']
+                price = row.get('price', 0)
+                variant = self.variants.get(variant_id)
+                if variant is not None and abs(variant.current - price) < 0.01:
+                    continue
+                self._add(variant_id, now, price)
+                changed.append((variant_id, price))
+
+            for variant_id, _ in changed:
+                self._update_deal(variant_id, now)
+
+        if changed:
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    for variant_id, price in changed:
+                        f.write(json.dumps({'v': variant_id, 't': now, 'p': price}) + '\n')
+            except Exception as e:
+                print(f"⚠️  Fiyat geçmişi kaydedilemedi: {e}")
+
+        return [variant_id for variant_id, _ in changed]
+
+    def _update_deal(self, variant_id, now):
+        """Varyantın fırsat durumunu yeniden değerlendir"""
+        summary = self.variants[variant_id].summary(now)
+        mean_30d = summary['windows']['30d']['mean']
+        current = summary['current']
+
+        discount = (mean_30d - current) / mean_30d if mean_30d else 0
+        if discount >= DEAL_THRESHOLD or (
+            summary['windows']['90d']['count'] > 1 and current <= summary['all_time_low']
+            and current < summary['windows']['90d']['max']
+        ):
+            self.deals[variant_id] = {
+                'variant_id': variant_id,
+                'price': current,
+                'mean_30d': mean_30d,
+                'all_time_low': summary['all_time_low'],
+                'discount_percent': round(discount * 100, 1),
+            }
+        else:
+            self.deals.pop(variant_id, None)
+
+    def summary(self, variant_id, now=None):
+        """Varyantın önceden hesaplanmış fiyat istatistikleri, yoksa None"""
+        with self._lock:
+            variant = self.variants.get(variant_id)
+            if variant is None:
+                return None
+            return dict(variant.summary(now or time.time()), variant_id=variant_id)
+
+    def history(self, variant_id, window='90d', now=None):
+        """
+        Penceredeki fiyat noktaları [(ts, price), ...]
+
+        Raises:
+            ValueError: Bilinmeyen pencere
+        """
+        if window not in WINDOWS:
+            raise ValueError(f"Bilinmeyen pencere: {window!r} ({', '.join(WINDOWS)})")
+        with self._lock:
+            variant = self.variants.get(variant_id)
+            if variant is None:
+                return []
+            variant.windows[window].evict(now or time.time())
+            return list(variant.windows[window].points)
+
+    def _refresh_deals(self, now):
+        """
+        Kayıtlı fırsatları pencerelerin bugünkü haliyle yeniden değerlendir
+
+        Fiyatı değişmeyen varyantın ortalaması zamanla güncel fiyata yaklaşır;
+        bu yüzden yalnızca mevcut fırsatlar düşebilir, yenileri observe'da doğar.
+        """
+        for variant_id in list(self.deals):
+            self._update_deal(variant_id, now)
+
+    def deal_ids(self, now=None):
+        """Güncel fırsatların variant_id'leri"""
+        with self._lock:
+            self._refresh_deals(now or time.time())
+            return list(self.deals)
+
+    def deal_list(self, limit=100, now=None):
+        """İndirim oranına göre sıralı fırsatlar"""
+        with self._lock:
+            self._refresh_deals(now or time.time())
+            deals = sorted(self.deals.values(), key=lambda d: d['discount_percent'], reverse=True)
+        return deals[:limit]
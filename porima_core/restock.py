@@ -0,0 +1,300 @@
+"""
+Yeniden stoklanma istatistikleri
+================================
+
+``compare_stock`` / ``check_changes`` çıktısındaki stok geçişlerinden,
+varyant ve ürün bazında artımlı olarak şunlar tutulur:
+
+- iki yeniden stoklanma arasındaki süre (ortalama/varyans, Welford)
+- stoksuz kalma süresi (ortalama/varyans)
+- haftanın saatine göre yeniden stoklanma histogramı (7 x 24)
+
+Bunlardan varyant için tahmini bir sonraki stoklanma aralığı üretilir.
+Aralıklar başlangıca göre sıralı bir dizinde tutulur; yakında stoklanması
+beklenen varyantlar tüm varyantlar taranmadan bulunur.
+"""
+
+import bisect
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime
+
+
+HOURS_PER_WEEK = 7 * 24
+
+
+def hour_of_week(ts):
+    """Zaman damgasının haftanın kaçıncı saati olduğu (Pazartesi 00:00 = 0)"""
+    moment = datetime.fromtimestamp(ts)
+    return moment.weekday() * 24 + moment.hour
+
+
+class RunningStats:
+    """Welford ile artımlı ortalama/standart sapma"""
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def to_list(self):
+        return [self.count, self.mean, self.m2]
+
+
+class TransitionStats:
+    """Bir varyantın veya ürün grubunun stok geçiş istatistikleri"""
+
+    def __init__(self, data=None):
+        data = data or {}
+        self.available = data.get('available')
+        self.since = data.get('since')  # Son geçişin zamanı
+        self.last_restock = data.get('last_restock')
+        self.intervals = RunningStats(*data.get('intervals', []))
+        self.out_durations = RunningStats(*data.get('out_durations', []))
+        self.histogram = data.get('histogram') or [0] * HOURS_PER_WEEK
+
+    def restock(self, ts):
+        if self.available is False and self.since is not None:
+            self.out_durations.add(ts - self.since)
+        if self.last_restock is not None:
+            self.intervals.add(ts - self.last_restock)
+        self.last_restock = ts
+        self.histogram[hour_of_week(ts)] += 1
+        self.available = True
+        self.since = ts
+
+    def sold_out(self, ts):
+        self.available = False
+        self.since = ts
+
+    def to_dict(self):
+        return {
+            'available': self.available,
+            'since': self.since,
+            'last_restock': self.last_restock,
+            'intervals': self.intervals.to_list(),
+            'out_durations': self.out_durations.to_list(),
+            'histogram': self.histogram,
+        }
+
+
+class RestockStats:
+    """
+    Varyant ve ürün bazında yeniden stoklanma istatistikleri
+
+    Args:
+        path: İstatistiklerin saklandığı JSON dosyası
+    """
+
+    def __init__(self, path='restock_stats.json'):
+        self.path = path
+        self.variants = {}
+        self.products = {}
+        self.variant_product = {}
+        self.histogram = [0] * HOURS_PER_WEEK  # Tüm mağaza
+        self._product_variants = {}  # product_id -> variant_id kümesi
+        self._windows = {}  # variant_id -> (start, end, variant_id)
+        self._starts = []  # Başlangıca göre sıralı (start, end, variant_id)
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.variants = {k: TransitionStats(v) for k, v in data.get('variants', {}).items()}
+            self.products = {k: TransitionStats(v) for k, v in data.get('products', {}).items()}
+            self.variant_product = data.get('variant_product', {})
+            self.histogram = data.get('histogram') or self.histogram
+        except Exception as e:
+            print(f"⚠️  Stoklanma istatistikleri okunamadı: {e}")
+
+        for variant_id, product_id in self.variant_product.items():
+            self._product_variants.setdefault(product_id, set()).add(variant_id)
+        for variant_id in self.variants:
+            window = self._window(variant_id)
+            if window is not None:
+                self._windows[variant_id] = (window[0], window[1], variant_id)
+        self._starts = sorted(self._windows.values())
+
+    def save(self):
+        try:
+            with self._lock:
+                data = {
+                    'variants': {k: v.to_dict() for k, v in self.variants.items()},
+                    'products': {k: v.to_dict() for k, v in self.products.items()},
+                    'variant_product': self.variant_product,
+                    'histogram': self.histogram,
+                }
+            with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(self.path + '.tmp', self.path)
+        except Exception as e:
+            print(f"⚠️  Stoklanma istatistikleri kaydedilemedi: {e}")
+
+    def _get(self, table, key):
+        stats = table.get(key)
+        if stats is None:
+            stats = table[key] = TransitionStats()
+        return stats
+
+    def record(self, newly_available, newly_out, now=None):
+        """
+        Stok geçişlerini işle
+
+        Args:
+            newly_available / newly_out: variant_id ve product_id içeren değişiklik kayıtları
+        """
+        if not newly_available and not newly_out:
+            return
+
+        now = now or time.time()
+        with self._lock:
+            restocked_products = set()
+            touched = set()
+            for item in newly_available:
+                variant_id = str(item['variant_id'])
+                product_id = str(item.get('product_id', ''))
+                self._link(variant_id, product_id)
+                touched.add(variant_id)
+                self._get(self.variants, variant_id).restock(now)
+                self.histogram[hour_of_week(now)] += 1
+                if product_id and product_id not in restocked_products:
+                    restocked_products.add(product_id)
+                    self._get(self.products, product_id).restock(now)
+
+            for item in newly_out:
+                variant_id = str(item['variant_id'])
+                product_id = str(item.get('product_id', ''))
+                self._link(variant_id, product_id)
+                touched.add(variant_id)
+                self._get(self.variants, variant_id).sold_out(now)
+                if product_id:
+                    self._get(self.products, product_id).sold_out(now)
+
+            # Ürün istatistiği değişince ona dayanan kardeş varyantların aralığı da değişir
+            for product_id in restocked_products:
+                touched.update(self._product_variants.get(product_id, ()))
+            for variant_id in touched:
+                self._reindex(variant_id)
+
+        self.save()
+
+    def _link(self, variant_id, product_id):
+        previous = self.variant_product.get(variant_id)
+        if previous != product_id:
+            if previous is not None:
+                self._product_variants.get(previous, set()).discard(variant_id)
+            self.variant_product[variant_id] = product_id
+            self._product_variants.setdefault(product_id, set()).add(variant_id)
+
+    def _reindex(self, variant_id):
+        """Varyantın sıralı dizindeki aralığını yenile (kilit altında çağrılır)"""
+        entry = self._windows.pop(variant_id, None)
+        if entry is not None:
+            i = bisect.bisect_left(self._starts, entry)
+            if i < len(self._starts) and self._starts[i] == entry:
+                del self._starts[i]
+        window = self._window(variant_id)
+        if window is not None:
+            entry = self._windows[variant_id] = (window[0], window[1], variant_id)
+            bisect.insort(self._starts, entry)
+
+    def _window(self, variant_id):
+        """
+        Stoksuz varyantın ham tahmini (start, end, kaynak, örnek sayısı, histogram)
+
+        Varyantın kendi stoksuz kalma süresi yoksa ürün grubunun
+        istatistiği kullanılır. Kilit altında çağrılır.
+        """
+        stats = self.variants.get(variant_id)
+        if stats is None or stats.available is not False or stats.since is None:
+            return None
+
+        source = 'variant'
+        durations = stats.out_durations
+        if durations.count == 0:
+            product = self.products.get(self.variant_product.get(variant_id, ''))
+            if product is None or product.out_durations.count == 0:
+                return None
+            source = 'product'
+            durations = product.out_durations
+
+        expected = stats.since + durations.mean
+        spread = max(durations.std, durations.mean * 0.1)
+        histogram = stats.histogram if any(stats.histogram) else self.histogram
+        return expected - spread, expected + spread, source, durations.count, histogram
+
+    def estimate_next_restock(self, variant_id, now=None):
+        """
+        Stoksuz varyant için tahmini yeniden stoklanma aralığı
+
+        Returns:
+            dict veya None: {'start', 'end', 'source', 'peak_hour_of_week'};
+            aralık geçmişte kaldıysa (gecikmiş varyant) None
+        """
+        now = now or time.time()
+        with self._lock:
+            window = self._window(str(variant_id))
+        if window is None:
+            return None
+
+        start, end, source, samples, histogram = window
+        if end < now:
+            return None
+        return {
+            'start': max(now, start),
+            'end': end,
+            'source': source,
+            'samples': samples,
+            'peak_hour_of_week': max(range(HOURS_PER_WEEK), key=histogram.__getitem__) if any(histogram) else None,
+        }
+
+    def likely_restocks(self, now=None, horizon=3600):
+        """
+        Tahmini aralığı [now, now + horizon] ile kesişen stoksuz varyantlar
+
+        Yalnızca başlangıcı ufkun içinde kalan dizin başı taranır; süresi
+        geçmiş aralıklar bulundukça dizinden çıkarılır (yeni bir geçiş
+        olmadan tekrar geçerli olamazlar).
+        """
+        now = now or time.time()
+        with self._lock:
+            head = bisect.bisect_right(self._starts, (now + horizon, math.inf))
+            result = [entry[2] for entry in self._starts[:head] if entry[1] >= now]
+            if len(result) < head:
+                expired = [entry for entry in self._starts[:head] if entry[1] < now]
+                self._starts = [entry for entry in self._starts if entry[1] >= now]
+                for entry in expired:
+                    del self._windows[entry[2]]
+        return result
+
+    def busy_factor(self, now=None):
+        """
+        Şu anki saatin geçmişteki yeniden stoklanma yoğunluğu
+
+        Returns:
+            float: Haftalık ortalama saate göre oran (1.0 = ortalama, veri yoksa 1.0)
+        """
+        total = sum(self.histogram)
+        if not total:
+            return 1.0
+        current = self.histogram[hour_of_week(now or time.time())]
+        return current / (total / HOURS_PER_WEEK)
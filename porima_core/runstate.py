@@ -0,0 +1,199 @@
+"""
+Tek seferlik (cron) çalıştırmalar arasında kalıcı durum
+=======================================================
+
+``--once`` her dakika cron ile çalıştırıldığında ucuz ve güvenli olması
+için çalıştırmalar arasında şunlar saklanır:
+
+- sayfa başına HTTP doğrulayıcıları (ETag / Last-Modified), gövde özeti
+  ve ürün sayısı; gövdelerin kendisi ayrı bir önbellek klasöründe
+- filigranlar: son çalıştırma, son başarılı kontrol, son değişiklik
+- bekleme durumu: art arda hata sayısı, uyarlanır aralık, sonraki
+  çalıştırmanın en erken zamanı
+
+Aynı anda başlatılan çalıştırmalar ``RunLock`` ile tekilleştirilir: kilidi
+alamayan çalıştırma, süren kontrol işi zaten yapacağı için hemen çıkar.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+
+class RunLock:
+    """
+    Bloklamayan, süreçler arası dosya kilidi
+
+    Kilit süreç sonlandığında işletim sistemi tarafından bırakılır; yarım
+    kalan bir çalıştırma sonraki çalıştırmaları kilitli bırakmaz.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        """Kilidi almayı dene, başka bir süreç tutuyorsa False döndür"""
+        self._file = open(self.path, 'a+')
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._file.close()
+            self._file = None
+            return False
+
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(str(os.getpid()))
+        self._file.flush()
+        return True
+
+    def release(self):
+        if self._file is None:
+            return
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+class RunState:
+    """
+    Args:
+        path: Durum dosyası (JSON)
+        cache_dir: Sayfa gövdeleri önbelleği (varsayılan: <path>_pages)
+    """
+
+    def __init__(self, path, cache_dir=None):
+        self.path = path
+        self.cache_dir = cache_dir or os.path.splitext(path)[0] + '_pages'
+        self.validators = {}
+        self.watermarks = {'last_run': None, 'last_success': None, 'last_change': None, 'pages': 0}
+        self.backoff = {'failures': 0, 'interval': None, 'next_run': 0}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.validators = data.get('validators', {})
+            self.watermarks.update(data.get('watermarks', {}))
+            self.backoff.update(data.get('backoff', {}))
+        except Exception as e:
+            print(f"⚠️  Çalıştırma durumu okunamadı: {e}")
+
+    def save(self):
+        try:
+            data = {
+                'validators': self.validators,
+                'watermarks': self.watermarks,
+                'backoff': self.backoff,
+            }
+            with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(self.path + '.tmp', self.path)
+        except Exception as e:
+            print(f"⚠️  Çalıştırma durumu kaydedilemedi: {e}")
+
+    # --- HTTP doğrulayıcıları ve sayfa önbelleği ---
+
+    def _cache_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+    def request_headers(self, url):
+        """
+        Koşullu istek başlıkları
+
+        Önbellekte gövdesi olmayan sayfa için doğrulayıcı gönderilmez;
+        304 cevabı ancak gövde elimizdeyse işe yarar.
+        """
+        entry = self.validators.get(url)
+        if not entry or not os.path.exists(self._cache_path(url)):
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def page_count(self, url):
+        """Önceki çalıştırmada sayfadaki ürün sayısı (boş sayfa 0, dolu ama sayılmamışsa None)"""
+        entry = self.validators.get(url)
+        return entry.get('count') if entry else None
+
+    def is_unchanged(self, url, body):
+        """Doğrulayıcı vermeyen sunucular için: gövde özeti öncekiyle aynı mı"""
+        entry = self.validators.get(url)
+        return bool(entry) and entry.get('digest') == hashlib.sha1(body).hexdigest()
+
+    def remember(self, url, headers, body, count):
+        """Değişen sayfanın doğrulayıcılarını ve gövdesini sakla"""
+        self.validators[url] = {
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'digest': hashlib.sha1(body).hexdigest(),
+            'count': count,
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._cache_path(url), 'wb') as f:
+                f.write(body)
+        except OSError as e:
+            # Gövde yoksa sonraki çalıştırma koşulsuz istek atar
+            print(f"⚠️  Sayfa önbelleğe yazılamadı: {e}")
+
+    def cached_body(self, url):
+        with open(self._cache_path(url), 'rb') as f:
+            return f.read()
+
+    # --- Filigranlar ve bekleme ---
+
+    def due(self, now=None):
+        """Sonraki çalıştırma zamanı geldi mi"""
+        return (now or time.time()) >= self.backoff['next_run']
+
+    def record_failure(self, now=None, base=60, max_backoff=3600):
+        """Başarısız kontrol: sonraki çalıştırmayı üssel olarak ertele"""
+        now = now or time.time()
+        self.backoff['failures'] += 1
+        delay = min(max_backoff, base * (2 ** (self.backoff['failures'] - 1)))
+        self.backoff['next_run'] = now + delay
+        self.watermarks['last_run'] = now
+        return delay
+
+    def record_success(self, changes, pages, now=None, interval=None):
+        """
+        Başarılı kontrol
+
+        Args:
+            changes: Bulunan stok değişikliği sayısı
+            pages: Taranan sayfa sayısı
+            now: Çalıştırmanın başladığı zaman
+            interval: Uyarlanır modda sonraki kontrole kadar süre (None: cron belirler)
+        """
+        now = now or time.time()
+        self.watermarks['last_run'] = now
+        self.watermarks['last_success'] = now
+        self.watermarks['pages'] = pages
+        if changes:
+            self.watermarks['last_change'] = now
+        self.backoff['failures'] = 0
+        self.backoff['interval'] = interval
+        self.backoff['next_run'] = now + interval if interval else 0
@@ -0,0 +1,110 @@
+"""
+Otomatik takip zamanlayıcısı
+============================
+
+Web arayüzünün kontrol döngüsü: tek bir arka plan görevi aralık dolunca
+veya uyandırılınca kontrol turunu çalıştırır. Kontroller hiçbir zaman üst
+üste binmez; döngü sürerken gelen başlatma/yenileme istekleri aynı döngüyü
+uyandırır.
+"""
+
+import time
+
+
+class MonitorScheduler:
+    """
+    Uyandırılabilir otomatik takip zamanlayıcısı
+
+    Ayrı bir OS thread'i yerine Socket.IO'nun arka plan görevini (gevent
+    altında greenlet) kullanır. Bekleme bir olay nesnesi üzerinde yapılır;
+    durdurma, aralık değişikliği ve manuel yenileme bekleyen döngüyü
+    anında uyandırır. Bir AdaptiveInterval verilirse aralık her kontrolden
+    sonra değişiklik yoğunluğuna göre yeniden hesaplanır.
+
+    Args:
+        socketio: Arka plan görevi, olay nesnesi ve durum yayını için SocketIO
+        check: Bir kontrol turunu çalıştırıp değişiklik sayısını döndüren fonksiyon
+        interval: Kontroller arası süre (saniye)
+    """
+
+    def __init__(self, socketio, check, interval=300):
+        self.socketio = socketio
+        self.check = check
+        self.interval = interval
+        self.cadence = None
+        self.active = False
+        self._wakeup = None
+        self._generation = 0
+        self._refresh_requested = False
+        self._last_run = time.monotonic()
+
+    def start(self, interval=None, cadence=None):
+        """Takibi başlat (zaten aktifse sadece aralığı güncelle)"""
+        self.cadence = cadence
+        if cadence is not None:
+            self.interval = cadence.current
+        elif interval:
+            self.interval = interval
+
+        if self.active:
+            self._wake()
+            return
+
+        self.active = True
+        self._generation += 1
+        self._last_run = time.monotonic()
+        self._wakeup = self.socketio.server.eio.create_event()
+        self.socketio.start_background_task(self._run, self._generation, self._wakeup)
+
+    def stop(self):
+        """Takibi hemen durdur"""
+        self.active = False
+        self._generation += 1
+        self._wake()
+
+    def reschedule(self, interval, cadence=None):
+        """Yeni aralığı bekleyen döngüye hemen uygula"""
+        self.cadence = cadence
+        self.interval = cadence.current if cadence is not None else interval
+        self._wake()
+
+    def refresh_now(self):
+        """Bir sonraki kontrolü beklemeden hemen çalıştır"""
+        self._refresh_requested = True
+        self._wake()
+
+    def mark_checked(self):
+        """Döngü dışında yapılan kontrolden sonra sayacı sıfırla"""
+        self._last_run = time.monotonic()
+        self._wake()
+
+    def status(self):
+        return {'active': self.active, 'interval': self.interval, 'adaptive': self.cadence is not None}
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _run(self, generation, wakeup):
+        """Takip döngüsü - uyandırıldığında durumu yeniden değerlendirir"""
+        while self.active and generation == self._generation:
+            remaining = self._last_run + self.interval - time.monotonic()
+
+            if remaining > 0 and not self._refresh_requested:
+                wakeup.wait(timeout=remaining)
+                wakeup.clear()
+                continue
+
+            self._refresh_requested = False
+            self._last_run = time.monotonic()
+
+            try:
+                change_count = self.check()
+
+                # Uyarlanır modda bir sonraki aralık değişiklik yoğunluğuna göre
+                if self.cadence is not None:
+                    self.interval = self.cadence.update(change_count)
+                    self.socketio.emit('monitoring_status', self.status())
+
+            except Exception as e:
+                print(f"Monitor error: {e}")
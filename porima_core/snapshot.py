@@ -0,0 +1,637 @@
+"""
+Sabit genişlikli, bellek eşlemeli (mmap) stok anlık görüntüsü
+=============================================================
+
+Dosya düzeni (little-endian):
+
+    başlık    : magic, sürüm, varyant sayısı, ürün sayısı, kayıt zamanı
+    varyantlar: variant_id'ye göre sıralı sabit genişlikli kayıtlar
+                (variant_id, ürün indeksi, varyant adı ofseti/uzunluğu,
+                available, fiyat)
+    ürünler   : (product_id, başlık ofseti/uzunluğu, url ofseti/uzunluğu)
+    metinler  : UTF-8 metin tablosu
+
+Açılışta dosya ayrıştırılmaz, yalnızca eşlenir; varyant araması sıralı
+kayıtlar üzerinde ikili arama ile yapılır ve sadece dokunulan sayfalar
+diskten okunur. Toplu aramalar için variant_id -> kayıt indeksi sözlüğü
+ilk ihtiyaçta bir kez kurulur.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections.abc import Mapping
+
+
+MAGIC = b'PSNP'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHxxIId')
+RECORD = struct.Struct('<QIIIB3xd')
+PRODUCT = struct.Struct('<QIIII')
+
+# Kayıt içindeki alanların ofsetleri (tam kaydı açmadan okumak için)
+_VARIANT_ID = struct.Struct('<Q')
+_STATE = struct.Struct('<B3xd')
+_STATE_OFFSET = 20
+
+# Sütun düzeninde okunabilen alanlar
+SNAPSHOT_COLUMNS = ('variant_id', 'product_id', 'product', 'variant', 'available', 'price', 'url')
+
+
+def snapshot_path(data_file):
+    """JSON veri dosyası adından anlık görüntü dosyası adını türet"""
+    return os.path.splitext(data_file)[0] + '.snap'
+
+
+def _rows_from_legacy(data):
+    """Eski JSON formatlarını (düz veya ürün bazlı) satır listesine çevir"""
+    rows = []
+    for key, value in data.items():
+        if 'variants' in value:
+            # porima_stock_monitor.py formatı: {product_id: {title, url, variants}}
+            for variant in value['variants']:
+                price = variant.get('price', 0)
+                rows.append({
+                    'product_id': key,
+                    'variant_id': variant.get('id'),
+                    'product': value.get('title', ''),
+                    'variant': variant.get('title', ''),
+                    'available': variant.get('available', False),
+                    'price': float(price) if price else 0,
+                    'url': value.get('url', ''),
+                })
+        else:
+            rows.append(value)
+    return rows
+
+
+class SnapshotWriter:
+    """
+    Satırları sırayla alıp tek seferde anlık görüntü dosyasına yazar
+
+    Bellekte yalnızca sabit genişlikli kayıtlar ve metin tablosu tutulur;
+    tarama sayfa sayfa ilerlerken satır sözlüklerinin saklanması gerekmez.
+    Aynı varyant ikinci kez gelirse ilk kayıt korunur.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.strings = bytearray()
+        self.products = []
+        self.records = []
+        self._string_index = {}
+        self._product_index = {}
+        self._seen = set()
+        self.product_rows = {}  # product_id -> (özet, satırlar), taramada normalleştirilenler
+        self.changed_rows = []  # Önceki anlık görüntüye göre yeni veya herhangi bir alanı değişen satırlar
+        self.partial = False  # Önceki anlık görüntüden taşınan varyantlar var
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def variant_ids(self):
+        """Şimdiye kadar eklenen variant_id'ler"""
+        return self._seen
+
+    def _intern(self, text):
+        data = (text or '').encode('utf-8')
+        offset = self._string_index.get(data)
+        if offset is None:
+            offset = self._string_index[data] = len(self.strings)
+            self.strings.extend(data)
+        return offset, len(data)
+
+    def add(self, row):
+        """Satırı ekle; geçersiz veya daha önce eklenmişse False"""
+        try:
+            variant_id = int(row['variant_id'])
+            product_id = int(row['product_id'])
+        except (KeyError, TypeError, ValueError):
+            return False
+        if variant_id in self._seen:
+            return False
+        self._seen.add(variant_id)
+
+        index = self._product_index.get(product_id)
+        if index is None:
+            index = self._product_index[product_id] = len(self.products)
+            title_off, title_len = self._intern(row.get('product', ''))
+            url_off, url_len = self._intern(row.get('url', ''))
+            self.products.append((product_id, title_off, title_len, url_off, url_len))
+
+        variant_off, variant_len = self._intern(row.get('variant', ''))
+        self.records.append((
+            variant_id,
+            index,
+            variant_off,
+            variant_len,
+            1 if row.get('available') else 0,
+            float(row.get('price') or 0),
+        ))
+        return True
+
+    def keep_rows(self, product_id, digest, rows):
+        """Ürünün satırlarını özetiyle sonraki turda yeniden kullanılmak üzere sakla"""
+        self.product_rows[product_id] = (digest, rows)
+
+    def add_missing(self, snapshot):
+        """Önceki anlık görüntüde olup henüz eklenmemiş varyantları aynen taşı"""
+        self.partial = True
+        for row in snapshot.rows():
+            self.add(row)
+
+    def commit(self):
+        """Kayıtları sırala ve dosyayı atomik olarak değiştir"""
+        self.records.sort()
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self.records), len(self.products), time.time()))
+            for record in self.records:
+                f.write(RECORD.pack(*record))
+            for product in self.products:
+                f.write(PRODUCT.pack(*product))
+            f.write(self.strings)
+        os.replace(tmp_path, self.path)
+
+
+def write_snapshot(path, rows):
+    """Satırları sabit genişlikli anlık görüntü dosyasına yaz"""
+    writer = SnapshotWriter(path)
+    for row in rows:
+        writer.add(row)
+    writer.commit()
+
+
+class MappedSnapshot(Mapping):
+    """
+    Bellek eşlemeli anlık görüntü
+
+    Mapping arayüzü web/GUI'deki eski ``{"pid_vid": satır}`` sözlüğüyle
+    uyumludur; karşılaştırma için ise metin çözmeden çalışan ``state``
+    kullanılmalıdır.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.saved_at = None
+        self._file = None
+        self._mm = None
+        self._count = 0
+        self._product_count = 0
+        self._positions = None
+
+        if path and os.path.exists(path) and os.path.getsize(path) >= HEADER.size:
+            self._file = open(path, 'rb')
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, count, product_count, saved_at = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC or version != VERSION:
+                self.close()
+                raise ValueError(f"Geçersiz anlık görüntü dosyası: {path}")
+            self._count = count
+            self._product_count = product_count
+            self.saved_at = saved_at
+
+        self._products_start = HEADER.size + self._count * RECORD.size
+        self._strings_start = self._products_start + self._product_count * PRODUCT.size
+
+    def close(self):
+        """Eşlemeyi kapat (Windows'ta dosyanın değiştirilebilmesi için gerekli)"""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._count = 0
+        self._product_count = 0
+        self._positions = None
+
+    def _variant_id_at(self, i):
+        return _VARIANT_ID.unpack_from(self._mm, HEADER.size + i * RECORD.size)[0]
+
+    def _lower_bound(self, variant_id):
+        """variant_id'si verilenden küçük olmayan ilk kaydın indeksi"""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._variant_id_at(mid) < variant_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def positions(self):
+        """variant_id -> kayıt indeksi sözlüğü (ilk çağrıda bir kez kurulur)"""
+        positions = self._positions
+        if positions is None:
+            if not self._count:
+                return {}
+            positions = self._positions = {
+                fields[0]: i for i, fields in enumerate(RECORD.iter_unpack(self._mm[HEADER.size:self._products_start]))
+            }
+        return positions
+
+    def find(self, variant_id):
+        """Varyantın kayıt indeksini bul (sözlük kurulduysa ondan, yoksa ikili arama), yoksa -1"""
+        try:
+            variant_id = int(variant_id)
+        except (TypeError, ValueError):
+            return -1
+
+        if self._positions is not None:
+            return self._positions.get(variant_id, -1)
+        lo = self._lower_bound(variant_id)
+        if lo < self._count and self._variant_id_at(lo) == variant_id:
+            return lo
+        return -1
+
+    def state(self, variant_id):
+        """Varyantın (available, price) durumu - metin çözmeden, yoksa None"""
+        i = self.find(variant_id)
+        if i < 0:
+            return None
+        available, price = _STATE.unpack_from(self._mm, HEADER.size + i * RECORD.size + _STATE_OFFSET)
+        return bool(available), price
+
+    def _string(self, offset, length):
+        start = self._strings_start + offset
+        return self._mm[start:start + length].decode('utf-8')
+
+    def row_at(self, i):
+        """i. kaydı web/GUI satır sözlüğü olarak çöz"""
+        variant_id, product_idx, v_off, v_len, available, price = RECORD.unpack_from(
+            self._mm, HEADER.size + i * RECORD.size
+        )
+        product_id, t_off, t_len, u_off, u_len = PRODUCT.unpack_from(
+            self._mm, self._products_start + product_idx * PRODUCT.size
+        )
+        return {
+            'product_id': str(product_id),
+            'variant_id': str(variant_id),
+            'product': self._string(t_off, t_len),
+            'variant': self._string(v_off, v_len),
+            'available': bool(available),
+            'price': price,
+            'url': self._string(u_off, u_len),
+        }
+
+    def lookup(self, variant_ids):
+        """
+        Varyantların kayıt indeksleri (toplu arama)
+
+        Returns:
+            tuple: (bulunan kayıt indeksleri, bulunamayan variant_id'ler)
+        """
+        positions = self.positions()
+        found, missing = [], []
+        for variant_id in variant_ids:
+            try:
+                i = positions.get(int(variant_id))
+            except (TypeError, ValueError):
+                i = None
+            if i is None:
+                missing.append(variant_id)
+            else:
+                found.append(i)
+        return found, missing
+
+    def columns(self, indices, fields=SNAPSHOT_COLUMNS):
+        """
+        Kayıtları sütun düzeninde oku: {alan: [değer, ...]}
+
+        Metinler yalnızca istenen alanlar için çözülür; ürün tablosuna
+        yalnızca ürün alanları istenirse bakılır.
+        """
+        fields = [name for name in SNAPSHOT_COLUMNS if name in fields]
+        result = {name: [] for name in fields}
+        product_fields = {'product_id', 'product', 'url'}.intersection(fields)
+
+        for i in indices:
+            variant_id, product_idx, v_off, v_len, available, price = RECORD.unpack_from(
+                self._mm, HEADER.size + i * RECORD.size
+            )
+            values = {'variant_id': str(variant_id), 'available': bool(available), 'price': price}
+            if 'variant' in result:
+                values['variant'] = self._string(v_off, v_len)
+            if product_fields:
+                product_id, t_off, t_len, u_off, u_len = PRODUCT.unpack_from(
+                    self._mm, self._products_start + product_idx * PRODUCT.size
+                )
+                values['product_id'] = str(product_id)
+                if 'product' in result:
+                    values['product'] = self._string(t_off, t_len)
+                if 'url' in result:
+                    values['url'] = self._string(u_off, u_len)
+            for name in fields:
+                result[name].append(values[name])
+        return result
+
+    def states(self):
+        """Tüm kayıtların (variant_id, product_id, available) değerleri - metin çözmeden"""
+        if not self._count:
+            return
+        product_ids = [
+            fields[0] for fields in PRODUCT.iter_unpack(self._mm[self._products_start:self._strings_start])
+        ]
+        for variant_id, product_idx, _, _, available, _ in RECORD.iter_unpack(
+            self._mm[HEADER.size:self._products_start]
+        ):
+            yield variant_id, product_ids[product_idx], available
+
+    def rows_between(self, low, high=None):
+        """variant_id'si [low, high) aralığındaki satırlar (high None: sona kadar)"""
+        start = self._lower_bound(low)
+        end = self._count if high is None else self._lower_bound(high)
+        for i in range(start, end):
+            yield self.row_at(i)
+
+    def rows(self):
+        """Tüm satırları sırayla çöz"""
+        for i in range(self._count):
+            yield self.row_at(i)
+
+    # Mapping arayüzü ("pid_vid" veya sadece variant_id anahtarı)
+    def __getitem__(self, key):
+        variant_id = str(key).rpartition('_')[2]
+        i = self.find(variant_id)
+        if i < 0:
+            raise KeyError(key)
+        return self.row_at(i)
+
+    def __contains__(self, key):
+        return self.find(str(key).rpartition('_')[2]) >= 0
+
+    def __iter__(self):
+        for row in self.rows():
+            yield f"{row['product_id']}_{row['variant_id']}"
+
+    def __len__(self):
+        return self._count
+
+
+def load_snapshot(data_file):
+    """
+    Anlık görüntüyü eşleyerek aç
+
+    İkili dosya yoksa eski JSON dosyası bir kereliğine dönüştürülür.
+    """
+    path = snapshot_path(data_file)
+
+    if not os.path.exists(path) and os.path.exists(data_file):
+        try:
+            with open(data_file, 'r', encoding='utf-8') as f:
+                write_snapshot(path, _rows_from_legacy(json.load(f)))
+        except Exception as e:
+            print(f"⚠️  Eski veri dosyası dönüştürülemedi: {e}")
+
+    try:
+        return MappedSnapshot(path)
+    except Exception as e:
+        print(f"⚠️  Anlık görüntü okunamadı: {e}")
+        return MappedSnapshot()
+
+
+def replace_snapshot(snapshot, data_file, rows):
+    """Eski eşlemeyi kapatıp yeni satırları yaz ve yeniden eşle"""
+    path = snapshot_path(data_file)
+    snapshot.close()
+    write_snapshot(path, rows)
+    return MappedSnapshot(path)
+
+
+class SnapshotStore:
+    """
+    Bir veri dosyasının güncel anlık görüntüsü
+
+    Args:
+        data_file: Veri dosyası adı (anlık görüntü ``.snap`` uzantısıyla yanında tutulur)
+        history: Kaydedilen her taramanın farkının ekleneceği SnapshotLog (opsiyonel)
+    """
+
+    def __init__(self, data_file, history=None):
+        self.data_file = data_file
+        self.history = history
+        self.snapshot = load_snapshot(data_file)
+        self._facets = None
+        self._counters = None
+        self._sync = None
+        # Son kaydedilen turun ürün satırları: product_id -> (özet, satırlar)
+        self._product_rows = {}
+        self._sync_pending = []  # Kaydedilince eşitleme özetlerine işlenecek satırlar
+        self._writer = None  # Sürmekte olan taramanın yazıcısı
+        # Anlık görüntünün değiştirilmesi, dizinlerin kurulup güncellenmesi ve eşitleme
+        # okumaları arasında (tarama boyunca değil)
+        self._lock = threading.RLock()
+        self._stale = set()  # Tarama sürerken (önceki sayfaları kaçırarak) kurulan dizinler
+
+    def state(self, variant_id):
+        return self.snapshot.state(variant_id)
+
+    def changed(self, row):
+        """Satır yeni mi ya da kaydedilen alanlarından (metinler dahil) biri değişmiş mi"""
+        i = self.snapshot.find(row['variant_id'])
+        if i < 0:
+            return True
+        stored = self.snapshot.row_at(i)
+        return (
+            stored['available'] != bool(row.get('available'))
+            or stored['price'] != float(row.get('price') or 0)
+            or stored['product'] != (row.get('product') or '')
+            or stored['variant'] != (row.get('variant') or '')
+            or stored['url'] != (row.get('url') or '')
+            or stored['product_id'] != str(row.get('product_id'))
+        )
+
+    @property
+    def facets(self):
+        """Özellik dizini (ilk erişimde anlık görüntüden bir kez kurulur)"""
+        with self._lock:
+            if self._facets is None:
+                from .facets import FacetIndex
+                self._facets = FacetIndex.from_rows(self.snapshot.rows())
+                self._built('facets')
+            return self._facets
+
+    def reusable_rows(self, product_id, digest):
+        """Ürün son kayıttan beri değişmediyse önceki satırları, değiştiyse None"""
+        cached = self._product_rows.get(product_id)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+        return None
+
+    def _built(self, name):
+        """Tarama sürerken kurulan dizin uygulanmış sayfaları kaçırır: commit'te yeniden kurulur"""
+        if self._writer is not None:
+            self._stale.add(name)
+
+    @property
+    def counters(self):
+        """Stok sayaçları (ilk erişimde kayıtlardan bir kez kurulur)"""
+        with self._lock:
+            if self._counters is None:
+                from .stats import StockCounters
+                self._counters = StockCounters.from_records(self.snapshot.states())
+                self._built('counters')
+            return self._counters
+
+    @property
+    def sync(self):
+        """
+        Eşitleme kovaları ve özet ağacı (ilk erişimde bir kez kurulur)
+
+        Sayfa sayfa değil commit'te güncellenir; her zaman kaydedilmiş anlık
+        görüntüyü yansıtır.
+        """
+        with self._lock:
+            if self._sync is None:
+                from .sync import SyncIndex
+                self._sync = SyncIndex.from_rows(self.snapshot.rows())
+                self._built('sync')
+            return self._sync
+
+    def sync_diff(self, epoch=None, root=None, buckets=None):
+        """
+        İstemcinin özetleriyle farklı kovalar ve satırları (tarama kilidi gerekmez)
+
+        Returns:
+            tuple: (farklı kova indeksleri, tam eşitleme mi, satırlar, eşitleme durumu)
+        """
+        with self._lock:
+            sync = self.sync
+            changed, full = sync.diff(epoch, root, buckets)
+            rows = [row for bucket in changed for row in self.snapshot.rows_between(*sync.bucket_range(bucket))]
+            return changed, full, rows, sync.summary()
+
+    def stats(self, materials=True):
+        """
+        Stokta/stoksuz/toplam varyant ve ürün sayıları
+
+        Args:
+            materials: Malzeme dökümünü ekle (özellik dizinini kurar)
+        """
+        stats = self.counters.summary()
+        if materials:
+            stats['materials'] = {
+                option['value']: {
+                    'in_stock': option['in_stock'],
+                    'out_stock': option['total'] - option['in_stock'],
+                    'total': option['total'],
+                }
+                for option in self.facets.summary()['material']
+            }
+        return stats
+
+    def apply(self, rows, changes):
+        """Sayfanın karşılaştırma sonucunu kurulmuş dizinlere, sayaçlara ve özetlere işle"""
+        # Başka thread'de ilk erişimle kurulan dizin bu sayfayı kaçırmasın
+        with self._lock:
+            if self._facets is not None:
+                self._facets.apply(rows, changes)
+            if self._counters is not None:
+                self._counters.apply(rows, changes)
+            if self._sync is not None:
+                self._sync_pending.extend(rows)
+
+    def __len__(self):
+        return len(self.snapshot)
+
+    def save(self, rows):
+        """Satırları yaz ve yeni dosyayı eşle"""
+        try:
+            self.snapshot = replace_snapshot(self.snapshot, self.data_file, rows)
+            self._reset_indexes()
+            self._product_rows = {}
+        except Exception as e:
+            print(f"⚠️  Veri dosyası kaydedilemedi: {e}")
+
+    def writer(self):
+        """Sayfa sayfa doldurulacak yeni anlık görüntü (commit veya discard ile kapanır)"""
+        self._writer = SnapshotWriter(snapshot_path(self.data_file))
+        self._stale = set()
+        return self._writer
+
+    def discard(self, writer):
+        """Kaydedilmeyen taramayı kapat; sayfaları uygulanmış dizinler yeniden kurulur"""
+        if self._writer is not writer:
+            return
+        self._writer = None
+        self._stale = set()
+        if len(writer):
+            self._reset_indexes()
+
+    def _reset_indexes(self):
+        self._facets = None
+        self._counters = None
+        self._sync = None
+        self._sync_pending = []
+
+    def _settle_indexes(self, writer, committed):
+        """
+        Dizinleri yeni eşlenen anlık görüntüyle uyumlu hale getir
+
+        Kayıt başarısızsa dizinler eşlenen (önceki) dosyanın ilerisindedir ve
+        ilk erişimde yeniden kurulur; tarama sırasında kurulanlar yeni dosyadan
+        hemen yeniden kurulur, diğerlerinden taramada görülmeyenler düşülür.
+        """
+        stale, self._stale = self._stale, set()
+        self._writer = None
+        if not committed:
+            self._reset_indexes()
+            return
+        for name in ('facets', 'counters'):
+            index = getattr(self, '_' + name)
+            if index is None:
+                continue
+            if name in stale:
+                setattr(self, '_' + name, None)
+                getattr(self, name)
+            else:
+                index.retain(writer.variant_ids)
+
+        sync, pending, self._sync_pending = self._sync, self._sync_pending, []
+        if sync is None:
+            return
+        if 'sync' in stale:
+            # Aynı kova sınırlarıyla (epoch değişmeden) yeni dosyadan kur
+            self._sync = type(sync)(sync.boundaries)
+            self._sync.apply(self.snapshot.rows())
+        else:
+            sync.apply(pending)
+            sync.retain(writer.variant_ids)
+
+    def commit(self, writer):
+        """Doldurulan anlık görüntüyü yaz, yeniden eşle ve farkı geçmişe ekle"""
+        history = self.history
+        removed = None
+        if history is not None and len(history):
+            seen = writer.variant_ids
+            removed = [v for v, _, _ in self.snapshot.states() if v not in seen]
+
+        with self._lock:
+            self.snapshot.close()
+            committed = False
+            try:
+                writer.commit()
+                committed = True
+                # Yarım taramada taranmayan ürünlerin önceki satırları geçerli kalır
+                if writer.partial:
+                    self._product_rows.update(writer.product_rows)
+                else:
+                    self._product_rows = writer.product_rows
+            except Exception as e:
+                print(f"⚠️  Veri dosyası kaydedilemedi: {e}")
+            self.snapshot = MappedSnapshot(writer.path)
+            self._settle_indexes(writer, committed)
+
+        if committed and history is not None:
+            if removed is None:
+                # Geçmiş boş: ilk kayıt tam durumdur
+                history.keyframe(self.snapshot.rows(), ts=self.snapshot.saved_at)
+            else:
+                history.append(writer.changed_rows, removed, ts=self.snapshot.saved_at)
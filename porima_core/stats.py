@@ -0,0 +1,122 @@
+"""
+Artımlı stok sayaçları
+======================
+
+Stokta/stoksuz/toplam varyant sayıları ve ürün başına dökümler anlık
+görüntünün kayıtlarından bir kez (metin çözmeden) kurulur, sonra her
+sayfanın karşılaştırma sonucuyla güncellenir:
+
+    newly_available / newly_out -> varyantın ve ürününün sayıları kayar
+    yeni varyant                -> toplamlara eklenir
+    taramada yok                -> (commit'te) düşülür
+
+İstatistik sorguları katalog büyüklüğünden bağımsız sürede yanıtlanır.
+"""
+
+import threading
+
+
+class StockCounters:
+    """Varyant ve ürün bazında stok sayaçları"""
+
+    def __init__(self):
+        self.variants = {}  # variant_id -> [product_id, available]
+        self.products = {}  # product_id -> [stokta, toplam]
+        self.in_stock = 0
+        self.products_in_stock = 0  # En az bir varyantı stokta olan ürünler
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.variants)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Args:
+            records: (variant_id, product_id, available) demetleri
+        """
+        counters = cls()
+        for variant_id, product_id, available in records:
+            counters._add(variant_id, product_id, 1 if available else 0)
+        return counters
+
+    # --- Güncelleme ---
+
+    def _shift(self, product_id, in_stock, total):
+        counts = self.products.get(product_id)
+        if counts is None:
+            counts = self.products[product_id] = [0, 0]
+        had_stock = counts[0] > 0
+        counts[0] += in_stock
+        counts[1] += total
+        self.in_stock += in_stock
+        if had_stock != (counts[0] > 0):
+            self.products_in_stock += 1 if counts[0] > 0 else -1
+        if not counts[1]:
+            del self.products[product_id]
+
+    def _add(self, variant_id, product_id, available):
+        if variant_id in self.variants:
+            return
+        self.variants[variant_id] = [product_id, available]
+        self._shift(product_id, available, 1)
+
+    def _set_available(self, variant_id, available):
+        entry = self.variants.get(variant_id)
+        if entry is None or entry[1] == available:
+            return
+        entry[1] = available
+        self._shift(entry[0], 1 if available else -1, 0)
+
+    def apply(self, rows, changes):
+        """Bir sayfanın karşılaştırma sonucunu uygula"""
+        with self._lock:
+            for available, items in ((1, changes.newly_available), (0, changes.newly_out)):
+                for item in items:
+                    try:
+                        self._set_available(int(item['variant_id']), available)
+                    except (KeyError, TypeError, ValueError):
+                        continue
+
+            variants = self.variants
+            for row in rows:
+                try:
+                    variant_id = int(row['variant_id'])
+                    if variant_id not in variants:
+                        self._add(variant_id, int(row['product_id']), 1 if row.get('available') else 0)
+                except (KeyError, TypeError, ValueError):
+                    continue
+
+    def retain(self, variant_ids):
+        """Kümede olmayan varyantları sayaçlardan düş (tarama bitince)"""
+        with self._lock:
+            removed = [v for v in self.variants if v not in variant_ids]
+            for variant_id in removed:
+                product_id, available = self.variants.pop(variant_id)
+                self._shift(product_id, -available, -1)
+
+    # --- Sorgular ---
+
+    def product(self, product_id):
+        """Ürünün varyant sayıları (yoksa None)"""
+        try:
+            counts = self.products.get(int(product_id))
+        except (TypeError, ValueError):
+            return None
+        if counts is None:
+            return None
+        return {'in_stock': counts[0], 'out_stock': counts[1] - counts[0], 'total': counts[1]}
+
+    def summary(self):
+        with self._lock:
+            total = len(self.variants)
+            return {
+                'in_stock': self.in_stock,
+                'out_stock': total - self.in_stock,
+                'total': total,
+                'products': {
+                    'total': len(self.products),
+                    'in_stock': self.products_in_stock,
+                    'out_stock': len(self.products) - self.products_in_stock,
+                },
+            }
@@ -0,0 +1,249 @@
+"""
+İstemci abonelikleri ve oda yönlendirme
+=======================================
+
+İstemciler bağlanınca neyi izlediklerini bildirir: varyantlar, ürünler,
+malzemeler (ürün serisi) ve olay tipleri. Aynı aboneliğe sahip istemciler
+aynı odadadır; abonelik bildirmeyenler ``all`` odasındadır.
+
+Her oda için kapsadığı varyantlar önceden hesaplanır ve tek bir
+``variant_id -> odalar`` haritasında tutulur. Bir değişiklik yalnızca
+haritadaki odalara (ve varyant süzgeci olmayan odalara) gönderilir;
+giden mesaj sayısı toplam katalog hareketiyle değil, odaların izlediği
+varyantlarla büyür.
+"""
+
+import hashlib
+import json
+import threading
+
+from .alerts import EVENTS
+from .attributes import normalize_material, row_attributes
+
+
+ALL_ROOM = 'all'
+
+
+class Subscription:
+    """
+    Args:
+        variants: İzlenen variant_id'ler
+        products: İzlenen product_id'ler (ürünün tüm varyantları)
+        materials: İzlenen malzemeler (ör. 'petg', 'silk pla')
+        events: İzlenen olay tipleri (boş: hepsi)
+
+    Varyant, ürün ve malzeme verilmezse tüm katalog izlenir.
+    """
+
+    __slots__ = ('variants', 'products', 'materials', 'events', 'room')
+
+    def __init__(self, variants=(), products=(), materials=(), events=()):
+        self.variants = frozenset(str(v) for v in variants if v)
+        self.products = frozenset(str(p) for p in products if p)
+        self.materials = frozenset(normalize_material(m) for m in materials if m)
+        self.events = frozenset(e for e in events if e in EVENTS)
+
+        if self.events == frozenset(EVENTS):
+            self.events = frozenset()
+        if self.is_empty:
+            self.room = ALL_ROOM
+        else:
+            key = json.dumps([sorted(self.variants), sorted(self.products), sorted(self.materials),
+                              sorted(self.events)])
+            self.room = 'sub:' + hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+    @property
+    def watches_all_variants(self):
+        return not (self.variants or self.products or self.materials)
+
+    @property
+    def is_empty(self):
+        return self.watches_all_variants and not self.events
+
+    @classmethod
+    def from_dict(cls, data):
+        """İstemci verisinden (liste veya virgülle ayrılmış metin) abonelik oluştur"""
+        data = data or {}
+
+        def values(name):
+            value = data.get(name) or ()
+            if isinstance(value, str):
+                value = value.split(',')
+            return [str(v).strip() for v in value if str(v).strip()]
+
+        return cls(values('variants'), values('products'), values('materials'), values('events'))
+
+    def to_dict(self):
+        return {
+            'variants': sorted(self.variants),
+            'products': sorted(self.products),
+            'materials': sorted(self.materials),
+            'events': sorted(self.events),
+        }
+
+    def wants_event(self, event_type):
+        return not self.events or event_type in self.events
+
+    def matches(self, row):
+        """Satır (veya değişiklik kaydı) bu aboneliğin kapsamında mı"""
+        if self.watches_all_variants:
+            return True
+        if str(row.get('variant_id', '')) in self.variants:
+            return True
+        if str(row.get('product_id', '')) in self.products:
+            return True
+        return bool(self.materials) and row_attributes(row).material in self.materials
+
+
+class SubscriptionRouter:
+    """
+    Oda üyelikleri ve önceden hesaplanmış ``variant_id -> odalar`` haritası
+
+    Katalog ``update_catalog`` ile verilir; oda eklenince yalnızca o odanın
+    varyantları haritaya işlenir, katalog değişince harita yeniden kurulur.
+    """
+
+    def __init__(self):
+        self.rooms = {}  # oda -> Subscription
+        self.members = {}  # oda -> {sid}
+        self.client_rooms = {}  # sid -> oda
+        self.room_variants = {}  # oda -> kapsadığı variant_id'ler
+        self.variant_rooms = {}  # variant_id -> {oda}
+        self.open_rooms = set()  # Varyant süzgeci olmayan odalar
+        self._by_product = {}
+        self._by_material = {}
+        self._catalog = {}  # variant_id -> katalog sırası
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.client_rooms)
+
+    def members_of(self, room):
+        """Odadaki istemciler (anlık kopya)"""
+        with self._lock:
+            return tuple(self.members.get(room, ()))
+
+    def subscription(self, sid):
+        room = self.client_rooms.get(sid)
+        return self.rooms.get(room) if room else None
+
+    # --- Üyelik ---
+
+    def subscribe(self, sid, subscription):
+        """
+        İstemciyi aboneliğin odasına al
+
+        Returns:
+            tuple: (ayrıldığı oda veya None, katıldığı oda)
+        """
+        with self._lock:
+            old = self._leave(sid)
+            room = subscription.room
+            if room not in self.rooms:
+                self.rooms[room] = subscription
+                self.members[room] = set()
+                self._map_room(room, subscription)
+            self.members[room].add(sid)
+            self.client_rooms[sid] = room
+        return old, room
+
+    def unsubscribe(self, sid):
+        """İstemciyi odasından çıkar; ayrıldığı odayı döndür"""
+        with self._lock:
+            return self._leave(sid)
+
+    def _leave(self, sid):
+        room = self.client_rooms.pop(sid, None)
+        if room is None:
+            return None
+        members = self.members[room]
+        members.discard(sid)
+        if not members:
+            # Boşalan oda haritadan çıkar
+            del self.members[room]
+            del self.rooms[room]
+            self.open_rooms.discard(room)
+            for variant_id in self.room_variants.pop(room, ()):
+                rooms = self.variant_rooms.get(variant_id)
+                if rooms is not None:
+                    rooms.discard(room)
+                    if not rooms:
+                        del self.variant_rooms[variant_id]
+        return room
+
+    # --- Harita ---
+
+    def update_catalog(self, rows):
+        """Katalog değiştiyse ürün/malzeme dizinlerini ve haritayı yeniden kur"""
+        catalog = {row['variant_id']: i for i, row in enumerate(rows)}
+        if catalog == self._catalog:
+            return
+
+        by_product = {}
+        by_material = {}
+        for row in rows:
+            by_product.setdefault(row['product_id'], []).append(row['variant_id'])
+            material = row_attributes(row).material
+            if material:
+                by_material.setdefault(material, []).append(row['variant_id'])
+
+        with self._lock:
+            self._catalog = catalog
+            self._by_product = by_product
+            self._by_material = by_material
+            self.variant_rooms = {}
+            self.room_variants = {}
+            self.open_rooms = set()
+            for room, subscription in self.rooms.items():
+                self._map_room(room, subscription)
+
+    def _map_room(self, room, subscription):
+        if subscription.watches_all_variants:
+            self.open_rooms.add(room)
+            return
+
+        variants = set(subscription.variants)
+        for product_id in subscription.products:
+            variants.update(self._by_product.get(product_id, ()))
+        for material in subscription.materials:
+            variants.update(self._by_material.get(material, ()))
+
+        self.room_variants[room] = variants
+        for variant_id in variants:
+            self.variant_rooms.setdefault(variant_id, set()).add(room)
+
+    # --- Yönlendirme ---
+
+    def route(self, entries):
+        """
+        Değişiklik kayıtlarını odalara dağıt
+
+        Args:
+            entries: ``variant_id`` ve ``type`` içeren kayıtlar
+
+        Returns:
+            dict: {oda: [kayıt, ...]} (yalnızca payı olan odalar)
+        """
+        routed = {}
+        with self._lock:
+            for entry in entries:
+                variant_id = str(entry.get('variant_id', ''))
+                rooms = self.variant_rooms.get(variant_id)
+                if rooms is None and variant_id not in self._catalog:
+                    # Haritada olmayan (yeni veya test) kayıt: abonelikler doğrudan denenir
+                    rooms = [room for room, sub in self.rooms.items()
+                             if room not in self.open_rooms and sub.matches(entry)]
+                for room in self.open_rooms.union(rooms or ()):
+                    if self.rooms[room].wants_event(entry.get('type')):
+                        routed.setdefault(room, []).append(entry)
+        return routed
+
+    def rows_for(self, room, rows_by_id):
+        """Odanın izlediği katalog satırları (variant_id -> satır sözlüğünden)"""
+        with self._lock:
+            variants = self.room_variants.get(room)
+            if variants is None:
+                return list(rows_by_id.values())
+            order = self._catalog
+            variants = sorted(variants, key=lambda v: order.get(v, len(order)))
+        return [rows_by_id[v] for v in variants if v in rows_by_id]
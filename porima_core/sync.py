@@ -0,0 +1,163 @@
+"""
+Kova özetleriyle anlık görüntü eşitleme
+=======================================
+
+Katalog variant_id aralıklarına (kovalara) bölünür. Her varyant satırının
+içerik özeti (BLAKE2b, 8 bayt) kovasının özetine toplanır; kova özeti
+varyantların toplamı olduğu için sıradan bağımsızdır ve değişen varyant
+çıkarılıp yenisi eklenerek artımlı güncellenir. Kova özetlerinin üzerine
+ikili bir özet ağacı kurulur; kök eşitse iki taraf aynıdır.
+
+Eşitlemede istemci son aldığı kök ve kova özetlerini gönderir, sunucu
+yalnızca özeti farklı kovaların satırlarını döndürür. Uzun bir kopukluktan
+sonra aktarılan veri kataloğun tamamıyla değil, değişen kovalarla orantılıdır.
+
+Kova sınırları dizin kurulurken variant_id'lerin yüzdeliklerinden seçilir
+ve ``epoch`` ile tanınır; epoch'u farklı istemci tam eşitlemeye düşer.
+"""
+
+import bisect
+import hashlib
+import threading
+import zlib
+from array import array
+
+
+BUCKETS = 256
+
+_MASK = (1 << 64) - 1
+
+
+def row_hash(row):
+    """Satırın karşılaştırılan alanlarının 64 bit özeti"""
+    text = '\x1f'.join((
+        str(row.get('product_id', '')), row.get('product', ''), row.get('variant', ''),
+        '1' if row.get('available') else '0', f"{float(row.get('price') or 0):.2f}", row.get('url', ''),
+    ))
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _node(left, right):
+    return hashlib.blake2b(left + right, digest_size=8).digest()
+
+
+class SyncIndex:
+    """
+    Varyant aralığı kovaları ve özet ağacı
+
+    Args:
+        boundaries: Kovaları ayıran artan variant_id'ler (kova sayısı - 1 adet)
+    """
+
+    def __init__(self, boundaries=()):
+        self.boundaries = array('Q', boundaries)
+        self.hashes = [0] * (len(self.boundaries) + 1)
+        self.variants = {}  # variant_id -> satır özeti
+        self.epoch = f"{zlib.crc32(self.boundaries.tobytes()):08x}"
+        self._root = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.variants)
+
+    @classmethod
+    def from_rows(cls, rows, buckets=BUCKETS):
+        """Satırlardan sınırları seç ve dizini kur"""
+        rows = list(rows)
+        ids = sorted({int(row['variant_id']) for row in rows})
+        step = max(1, len(ids) // buckets)
+        boundaries = sorted(set(ids[step::step][:buckets - 1]))
+        index = cls(boundaries)
+        index.apply(rows)
+        return index
+
+    def bucket_of(self, variant_id):
+        return bisect.bisect_right(self.boundaries, int(variant_id))
+
+    def bucket_range(self, bucket):
+        """Kovanın [alt, üst) variant_id aralığı (üst None: sınırsız)"""
+        low = self.boundaries[bucket - 1] if bucket > 0 else 0
+        high = self.boundaries[bucket] if bucket < len(self.boundaries) else None
+        return low, high
+
+    # --- Güncelleme ---
+
+    def _set(self, variant_id, value):
+        old = self.variants.get(variant_id)
+        if old == value:
+            return
+        bucket = self.bucket_of(variant_id)
+        total = self.hashes[bucket]
+        if old is not None:
+            total -= old
+        if value is None:
+            del self.variants[variant_id]
+        else:
+            total += value
+            self.variants[variant_id] = value
+        self.hashes[bucket] = total & _MASK
+        self._root = None
+
+    def apply(self, rows):
+        """Yeni veya değişmiş olabilecek satırları işle"""
+        with self._lock:
+            for row in rows:
+                try:
+                    variant_id = int(row['variant_id'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                self._set(variant_id, row_hash(row))
+
+    def retain(self, variant_ids):
+        """Kümede olmayan varyantları çıkar (tarama bitince)"""
+        with self._lock:
+            for variant_id in [v for v in self.variants if v not in variant_ids]:
+                self._set(variant_id, None)
+
+    # --- Sorgular ---
+
+    def bucket_hashes(self):
+        return [f"{h:016x}" for h in self.hashes]
+
+    def root(self):
+        """Kova özetleri üzerindeki ikili ağacın kökü"""
+        with self._lock:
+            if self._root is None:
+                level = [h.to_bytes(8, 'little') for h in self.hashes]
+                while len(level) > 1:
+                    if len(level) % 2:
+                        level.append(level[-1])
+                    level = [_node(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+                self._root = level[0].hex()
+            return self._root
+
+    def summary(self):
+        """İstemcinin saklayacağı eşitleme durumu"""
+        return {
+            'epoch': self.epoch,
+            'root': self.root(),
+            'boundaries': list(self.boundaries),
+            'buckets': self.bucket_hashes(),
+        }
+
+    def diff(self, epoch=None, root=None, buckets=None):
+        """
+        İstemcinin özetleriyle farklı kovalar
+
+        Kova özetleri kova sayısı uzunluğunda bir metin listesi değilse
+        (eski, bozuk veya eksik durum) tam eşitlemeye düşülür.
+
+        Returns:
+            tuple: (farklı kova indeksleri, tam eşitleme gerekiyor mu)
+        """
+        if (
+            epoch != self.epoch
+            or not isinstance(buckets, list)
+            or len(buckets) != len(self.hashes)
+            or not all(isinstance(h, str) for h in buckets)
+        ):
+            return list(range(len(self.hashes))), True
+        if root and root == self.root():
+            return [], False
+        current = self.bucket_hashes()
+        return [i for i, h in enumerate(current) if buckets[i] != h], False
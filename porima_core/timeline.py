@@ -0,0 +1,324 @@
+"""
+Anahtar kare + fark anlık görüntü günlüğü
+=========================================
+
+Her kaydedilen taramadan sonra yalnızca değişenler (stok/fiyatı değişen
+veya yeni varyantlar ve kaldırılan variant_id'ler) sıkıştırılmış bir fark
+çerçevesi olarak günlüğe eklenir. Belirli aralıklarla tam durum bir
+anahtar kareye yazılır:
+
+    deltas-<ilk sıra>.log    fark çerçeveleri (yalnızca eklemeli segmentler)
+    keyframe-<sıra>.bin      o sıradaki farka kadar uygulanmış tam durum
+
+Her çerçeve ``(zaman, sıra, uzunluk)`` başlığı ve zlib ile sıkıştırılmış
+JSON gövdesinden oluşur. Açılışta yalnızca başlıklar okunarak
+zaman -> (dosya, ofset) dizini kurulur.
+
+Bir andaki durum, o andan önceki son anahtar kare yüklenip ardından gelen
+farklar uygulanarak bulunur. Son anahtar kareden sonra ``max_deltas`` fark
+birikince yeni anahtar kare arka planda günlüğün kendisinden kurulur
+(sıkıştırma); eski segmentler ve anahtar kareler saklama süresi dolunca
+silinir. Disk kullanımı katalog büyüklüğü x tur sayısıyla değil,
+değişiklik miktarıyla büyür.
+"""
+
+import bisect
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+
+FRAME = struct.Struct('<dqI')  # zaman, sıra, gövde uzunluğu
+
+DAY = 86400
+
+# Satır alanları (variant_id anahtar, gerisi bu sırayla liste)
+FIELDS = ('product_id', 'product', 'variant', 'available', 'price', 'url')
+
+Entry = namedtuple('Entry', 'ts seq path offset')
+
+
+def _pack(row):
+    return [str(row.get('product_id', '')), row.get('product', ''), row.get('variant', ''),
+            bool(row.get('available')), float(row.get('price') or 0), row.get('url', '')]
+
+
+def _unpack(variant_id, values):
+    row = dict(zip(FIELDS, values))
+    row['variant_id'] = variant_id
+    return row
+
+
+def _encode(ts, seq, data):
+    body = zlib.compress(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+    return FRAME.pack(ts, seq, len(body)) + body
+
+
+class SnapshotLog:
+    """
+    Args:
+        directory: Günlük klasörü
+        max_deltas: Bir durumu kurmak için uygulanacak en fazla fark (anahtar
+            kare aralığı)
+        segment_size: Bir segment dosyasındaki en fazla fark
+        retention_days: Bu kadar günden eski geçmiş sıkıştırmada silinir
+            (None: hiç silinmez)
+    """
+
+    def __init__(self, directory, max_deltas=288, segment_size=288, retention_days=90):
+        self.directory = directory
+        self.max_deltas = max_deltas
+        self.segment_size = segment_size
+        self.retention_days = retention_days
+        self.deltas = []  # Entry, sıraya göre
+        self.keyframes = []  # Entry, sıraya göre
+        self.next_seq = 0
+        self.compactions = 0
+        self._segment = None  # Açık segment yolu
+        self._segment_count = 0
+        self._compacting = False
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+
+    def __len__(self):
+        return len(self.keyframes)
+
+    # --- Dizin ---
+
+    def _scan(self, path):
+        """Dosyadaki çerçeve başlıklarını oku; yarım kalmış son çerçeveyi kes"""
+        entries = []
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            offset = 0
+            while offset + FRAME.size <= size:
+                f.seek(offset)
+                ts, seq, length = FRAME.unpack(f.read(FRAME.size))
+                if offset + FRAME.size + length > size:
+                    break
+                entries.append(Entry(ts, seq, path, offset))
+                offset += FRAME.size + length
+        if offset < size:
+            # Kayıt sırasında kesilmiş çerçeve: sonraki eklemeler bozulmasın
+            with open(path, 'r+b') as f:
+                f.truncate(offset)
+        return entries
+
+    def _recover(self):
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            try:
+                if name.startswith('deltas-') and name.endswith('.log'):
+                    entries = self._scan(path)
+                    self.deltas.extend(entries)
+                    self._segment = path
+                    self._segment_count = len(entries)
+                elif name.startswith('keyframe-') and name.endswith('.bin'):
+                    self.keyframes.extend(self._scan(path)[:1])
+            except (OSError, struct.error) as e:
+                print(f"⚠️  Geçmiş dosyası okunamadı ({name}): {e}")
+
+        self.deltas.sort(key=lambda e: e.seq)
+        self.keyframes.sort(key=lambda e: e.seq)
+        last = max([e.seq for e in self.deltas] + [e.seq for e in self.keyframes], default=-1)
+        self.next_seq = last + 1
+
+    @staticmethod
+    def _read(entry):
+        with open(entry.path, 'rb') as f:
+            f.seek(entry.offset)
+            _, _, length = FRAME.unpack(f.read(FRAME.size))
+            return json.loads(zlib.decompress(f.read(length)))
+
+    # --- Yazma ---
+
+    def keyframe(self, rows, ts=None):
+        """Tam durumu anahtar kare olarak yaz (günlük boşken ilk kayıt)"""
+        state = {str(row['variant_id']): _pack(row) for row in rows}
+        with self._lock:
+            seq = self.next_seq - 1
+        self._write_keyframe(ts or time.time(), seq, state)
+
+    def _write_keyframe(self, ts, seq, state):
+        path = os.path.join(self.directory, f"keyframe-{seq + 1:012d}.bin")
+        try:
+            with open(path + '.tmp', 'wb') as f:
+                f.write(_encode(ts, seq, state))
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            print(f"⚠️  Anahtar kare yazılamadı: {e}")
+            return
+        with self._lock:
+            self.keyframes = [e for e in self.keyframes if e.path != path]
+            self.keyframes.append(Entry(ts, seq, path, 0))
+            self.keyframes.sort(key=lambda e: e.seq)
+
+    def append(self, upserts, removed, ts=None):
+        """
+        Bir turun farkını ekle
+
+        Args:
+            upserts: Yeni veya değişen satırlar
+            removed: Kaldırılan variant_id'ler
+        """
+        ts = ts or time.time()
+        data = {
+            'upsert': {str(row['variant_id']): _pack(row) for row in upserts},
+            'remove': [str(v) for v in removed],
+        }
+        with self._lock:
+            if self._segment is None or self._segment_count >= self.segment_size:
+                self._segment = os.path.join(self.directory, f"deltas-{self.next_seq:012d}.log")
+                self._segment_count = 0
+            seq = self.next_seq
+            try:
+                with open(self._segment, 'ab') as f:
+                    offset = f.tell()
+                    f.write(_encode(ts, seq, data))
+            except OSError as e:
+                print(f"⚠️  Geçmiş farkı yazılamadı: {e}")
+                return
+            self.next_seq += 1
+            self._segment_count += 1
+            self.deltas.append(Entry(ts, seq, self._segment, offset))
+            behind = self._deltas_after(self.keyframes[-1].seq if self.keyframes else -1)
+            start = behind >= self.max_deltas and not self._compacting
+            if start:
+                self._compacting = True
+
+        if start:
+            threading.Thread(target=self._compact_in_background, daemon=True).start()
+
+    def _deltas_after(self, seq):
+        return len(self.deltas) - bisect.bisect_right([e.seq for e in self.deltas], seq)
+
+    # --- Okuma ---
+
+    def _state_at(self, ts=None, seq=None):
+        """
+        Zamandaki (veya sıradaki) durum
+
+        Returns:
+            tuple: (durum {variant_id: değerler}, son uygulanan Entry, uygulanan fark
+            sayısı) veya günlük o zamandan önce başlamıyorsa None
+        """
+        with self._lock:
+            keyframes = list(self.keyframes)
+            deltas = list(self.deltas)
+
+        def reached(entry):
+            return entry.seq <= seq if seq is not None else entry.ts <= ts
+
+        base = None
+        for entry in reversed(keyframes):
+            if reached(entry):
+                base = entry
+                break
+        if base is None:
+            return None
+
+        state = self._read(base)
+        last = base
+        applied = 0
+        start = bisect.bisect_right([e.seq for e in deltas], base.seq)
+        for entry in deltas[start:]:
+            if not reached(entry):
+                break
+            delta = self._read(entry)
+            for variant_id in delta['remove']:
+                state.pop(variant_id, None)
+            state.update(delta['upsert'])
+            last = entry
+            applied += 1
+        return state, last, applied
+
+    def rows_at(self, ts):
+        """
+        Verilen zamandaki (epoch saniye) stok satırları
+
+        Returns:
+            list: Satır sözlükleri (variant_id sırasıyla) veya o zamandan
+            önce kayıt yoksa None
+        """
+        found = self._state_at(ts=ts)
+        if found is None:
+            return None
+        state = found[0]
+        return [_unpack(v, state[v]) for v in sorted(state, key=lambda v: (len(v), v))]
+
+    def bounds(self):
+        """Geçmişin kapsadığı (ilk, son) zaman, boşsa None"""
+        with self._lock:
+            if not self.keyframes:
+                return None
+            last = max(self.deltas[-1].ts if self.deltas else 0, self.keyframes[-1].ts)
+            return self.keyframes[0].ts, last
+
+    def stats(self):
+        with self._lock:
+            files = {e.path for e in self.deltas} | {e.path for e in self.keyframes}
+        size = 0
+        for path in files:
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return {
+            'keyframes': len(self.keyframes),
+            'deltas': len(self.deltas),
+            'bytes': size,
+            'compactions': self.compactions,
+        }
+
+    # --- Sıkıştırma ---
+
+    def _compact_in_background(self):
+        try:
+            self.compact()
+        except Exception as e:
+            print(f"⚠️  Geçmiş sıkıştırılamadı: {e}")
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def compact(self):
+        """Son farka kadar yeni anahtar kare yaz ve saklama süresi dolan geçmişi sil"""
+        with self._lock:
+            last_seq = self.deltas[-1].seq if self.deltas else None
+        if last_seq is not None:
+            found = self._state_at(seq=last_seq)
+            if found is not None and found[2]:
+                state, last, _ = found
+                self._write_keyframe(last.ts, last.seq, state)
+        self.compactions += 1
+        if self.retention_days:
+            self._prune(time.time() - self.retention_days * DAY)
+
+    def _prune(self, cutoff):
+        """Kesim zamanındaki durumu kurabilmek için gereken en eski anahtar kareden öncesini sil"""
+        with self._lock:
+            older = [e for e in self.keyframes if e.ts <= cutoff]
+            if not older:
+                return
+            base = older[-1]
+            drop_keyframes = [e for e in self.keyframes if e.seq < base.seq]
+            # Segment, tüm farkları anahtar kareye dahilse silinir
+            last_in_segment = {}
+            for entry in self.deltas:
+                last_in_segment[entry.path] = entry.seq
+            drop_segments = {path for path, seq in last_in_segment.items()
+                             if seq <= base.seq and path != self._segment}
+            self.keyframes = [e for e in self.keyframes if e.seq >= base.seq]
+            self.deltas = [e for e in self.deltas if e.path not in drop_segments]
+
+        for path in drop_segments | {e.path for e in drop_keyframes}:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,224 @@
+"""
+Değişiklik olayları için giden webhook yayıncısı
+================================================
+
+``check_changes`` / ``compare_stock`` çıktısındaki değişiklikler kuyruğa
+bırakılır ve ayrı bir worker tarafından toplu JSON olarak gönderilir:
+
+- Tek worker olduğundan tek bir keep-alive bağlantısı tekrar kullanılır
+- Gövde ``X-Porima-Signature: sha256=<hex>`` başlığıyla HMAC imzalanır
+- Başarısız gönderimler diskteki spool klasörüne yazılır ve artan
+  bekleme süreleriyle yeniden denenir; yeniden başlatmadan sonra spool
+  boş değilse worker hemen başlar
+
+Tarama döngüsü hiçbir zaman alıcıyı beklemez.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+
+_STOP = object()
+
+
+class WebhookPublisher:
+    """
+    Args:
+        url: Olayların POST edileceği adres
+        secret: HMAC imza anahtarı (None ise imzalanmaz)
+        spool_dir: Gönderilemeyen paketlerin tutulduğu klasör
+        batch_size: Tek istekte gönderilecek en fazla olay
+        batch_window: İlk olaydan sonra paketin toplanacağı süre (saniye)
+    """
+
+    def __init__(self, url, secret=None, spool_dir='webhook_spool', batch_size=200,
+                 batch_window=0.5, max_queue=10000, timeout=10,
+                 base_backoff=5, max_backoff=600):
+        self.url = url
+        self.secret = secret.encode('utf-8') if isinstance(secret, str) else secret
+        self.spool_dir = spool_dir
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.timeout = timeout
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.sent = 0
+        self.failed = 0
+        self._session = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closing = threading.Event()
+
+        # Önceki çalıştırmadan kalan paketler yeni olay beklemeden denensin
+        if self._spooled():
+            self._ensure_started()
+
+    def publish(self, events):
+        """Değişiklik olaylarını kuyruğa bırak - asla beklemez"""
+        if not events:
+            return
+        self._ensure_started()
+        for event in events:
+            try:
+                self.queue.put_nowait(event)
+            except queue.Full:
+                # Kuyruk taştıysa olayı kaybetmek yerine doğrudan spool'a yaz
+                self._spool(self._encode([event]), attempt=0)
+
+    def close(self, timeout=10):
+        """Kuyruktaki olayları ve vakti gelen spool paketlerini gönderip worker'ı durdur"""
+        if self._thread is None:
+            return
+        self._closing.set()
+        try:
+            self.queue.put_nowait(_STOP)
+        except queue.Full:
+            # Worker kuyruğu boşaltınca _closing bayrağıyla kendisi durur
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._closing.clear()
+                self._thread = threading.Thread(target=self._run, name='webhook', daemon=True)
+                self._thread.start()
+
+    def _get_session(self):
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            self._session.mount('http://', adapter)
+            self._session.mount('https://', adapter)
+        return self._session
+
+    def _encode(self, events):
+        payload = {
+            'source': 'porima-stock-monitor',
+            'sent_at': datetime.now().isoformat(),
+            'events': events,
+        }
+        return json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+
+    def sign(self, body):
+        """Gövdenin HMAC-SHA256 imzası"""
+        return 'sha256=' + hmac.new(self.secret, body, hashlib.sha256).hexdigest()
+
+    def _post(self, body):
+        headers = {'Content-Type': 'application/json'}
+        if self.secret:
+            headers['X-Porima-Signature'] = self.sign(body)
+        try:
+            response = self._get_session().post(self.url, data=body, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            print(f"⚠️  Webhook gönderilemedi: {e}")
+            return False
+
+    def _spool(self, body, attempt):
+        """Paketi spool klasörüne yaz; dosya adı deneme sayısını taşır"""
+        try:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            name = f"{time.time_ns()}-{attempt}.json"
+            path = os.path.join(self.spool_dir, name)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(body)
+            os.replace(path + '.tmp', path)
+        except Exception as e:
+            print(f"⚠️  Webhook spool yazılamadı: {e}")
+
+    def _backoff(self, attempt):
+        return min(self.max_backoff, self.base_backoff * (2 ** attempt))
+
+    def _spooled(self):
+        try:
+            return any(n.endswith('.json') for n in os.listdir(self.spool_dir))
+        except OSError:
+            return False
+
+    def retry_spool(self, limit=20):
+        """Vakti gelen spool dosyalarını yeniden gönder"""
+        try:
+            names = sorted(n for n in os.listdir(self.spool_dir) if n.endswith('.json'))
+        except FileNotFoundError:
+            return
+
+        now = time.time()
+        for name in names[:limit]:
+            path = os.path.join(self.spool_dir, name)
+            try:
+                attempt = int(name[:-5].rsplit('-', 1)[1])
+                if os.path.getmtime(path) + self._backoff(attempt) > now:
+                    continue
+                with open(path, 'rb') as f:
+                    body = f.read()
+            except (OSError, ValueError, IndexError):
+                continue
+
+            if self._post(body):
+                self.sent += 1
+                os.remove(path)
+            else:
+                # Alıcı hâlâ erişilemiyor; deneme sayısını artırıp sonraya bırak
+                os.remove(path)
+                self._spool(body, attempt + 1)
+                return
+
+    def _run(self):
+        stopping = False
+        next_retry = 0
+
+        while not stopping:
+            if time.monotonic() >= next_retry:
+                self.retry_spool()
+                next_retry = time.monotonic() + self.base_backoff
+
+            try:
+                first = self.queue.get(timeout=self.base_backoff)
+            except queue.Empty:
+                first = None
+
+            events = []
+            if first is _STOP:
+                stopping = True
+            elif first is not None:
+                events.append(first)
+                deadline = time.monotonic() + self.batch_window
+                while len(events) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        event = self.queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if event is _STOP:
+                        stopping = True
+                        break
+                    events.append(event)
+
+            if events:
+                body = self._encode(events)
+                if self._post(body):
+                    self.sent += 1
+                else:
+                    self.failed += 1
+                    self._spool(body, attempt=0)
+
+            if self._closing.is_set() and self.queue.empty():
+                stopping = True
+
+        # Kapanırken vakti gelen paketler bir kez daha denenir (--once)
+        self.retry_spool()
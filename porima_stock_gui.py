@@ -10,162 +10,29 @@ Gereksinimler:
 import customtkinter as ctk
 from tkinter import messagebox
 import threading
-import requests
-import json
 import time
 from datetime import datetime
 import os
 import sys
 
+from porima_core.cadence import AdaptiveInterval
+from porima_core.classify import FILAMENT_COLLECTIONS
+from porima_core.notify import DesktopSink, NotificationDispatcher
+from porima_core.pipeline import StockPipeline
+from porima_core.restock import RestockStats
+
 # Windows için encoding düzeltmesi
 if sys.platform == 'win32':
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
-# Bildirim için
-try:
-    from plyer import notification
-    NOTIFICATIONS_ENABLED = True
-except ImportError:
-    NOTIFICATIONS_ENABLED = False
-
-# Ses için
-try:
-    import winsound
-    SOUND_ENABLED = True
-except ImportError:
-    SOUND_ENABLED = False
-
 
 # CustomTkinter tema ayarları
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
 
-class StockMonitorAPI:
-    """Porima3D Stok API İşlemleri"""
-    
-    BASE_URL = "https://porima3d.com"
-    
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'application/json',
-        })
-        self.previous_stock = {}
-        self.data_file = "stock_data.json"
-        self.load_previous_stock()
-    
-    def load_previous_stock(self):
-        """Önceki stok verilerini yükle"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    self.previous_stock = json.load(f)
-            except:
-                self.previous_stock = {}
-    
-    def save_stock_data(self, data):
-        """Stok verilerini kaydet"""
-        try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except:
-            pass
-    
-    def fetch_products(self):
-        """Tüm ürünleri çek"""
-        all_products = []
-        page = 1
-        
-        while True:
-            try:
-                url = f"{self.BASE_URL}/products.json?limit=250&page={page}"
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                
-                data = response.json()
-                products = data.get('products', [])
-                
-                if not products:
-                    break
-                    
-                all_products.extend(products)
-                page += 1
-                time.sleep(0.3)
-                
-            except Exception as e:
-                print(f"Hata: {e}")
-                break
-                
-        return all_products
-    
-    def filter_filaments(self, products):
-        """Filamentleri filtrele"""
-        keywords = ['filament', 'pla', 'abs', 'petg', 'tpu', 'asa', 'flex', 'nylon', 'pa', 'silk', 'rainbow']
-        
-        filaments = []
-        for product in products:
-            title = product.get('title', '').lower()
-            product_type = product.get('product_type', '').lower()
-            
-            if any(kw in title or kw in product_type for kw in keywords):
-                filaments.append(product)
-                
-        return filaments
-    
-    def get_stock_data(self, products):
-        """Stok verilerini hazırla"""
-        stock_data = []
-        
-        for product in products:
-            product_id = str(product.get('id'))
-            title = product.get('title', '')
-            handle = product.get('handle', '')
-            url = f"{self.BASE_URL}/products/{handle}"
-            
-            for variant in product.get('variants', []):
-                variant_title = variant.get('title', 'Varsayılan')
-                available = variant.get('available', False)
-                price = variant.get('price', '0')
-                variant_id = str(variant.get('id'))
-                
-                stock_data.append({
-                    'product_id': product_id,
-                    'variant_id': variant_id,
-                    'product': title,
-                    'variant': variant_title,
-                    'available': available,
-                    'price': float(price) if price else 0,
-                    'url': url,
-                })
-        
-        return stock_data
-    
-    def check_changes(self, current_data):
-        """Stok değişikliklerini kontrol et"""
-        newly_available = []
-        newly_out = []
-        
-        current_map = {f"{d['product_id']}_{d['variant_id']}": d for d in current_data}
-        
-        for key, current in current_map.items():
-            if key in self.previous_stock:
-                prev = self.previous_stock[key]
-                if current['available'] and not prev.get('available', False):
-                    newly_available.append(current)
-                elif not current['available'] and prev.get('available', True):
-                    newly_out.append(current)
-        
-        # Önceki stoku güncelle
-        self.previous_stock = current_map
-        self.save_stock_data(current_map)
-        
-        return newly_available, newly_out
-
-
 class ProductCard(ctk.CTkFrame):
     """Ürün kartı widget'ı"""
     
@@ -296,8 +163,8 @@ class PorimaStockMonitorApp(ctk.CTk):
         self.geometry("1400x800")
         self.minsize(1100, 650)
         
-        # API
-        self.api = StockMonitorAPI()
+        # API - yalnızca filament koleksiyonları taranır
+        self.api = StockPipeline('stock_data.json', delay=0.3, keywords=None, collections=FILAMENT_COLLECTIONS)
         
         # Veriler
         self.all_products = []
@@ -305,7 +172,22 @@ class PorimaStockMonitorApp(ctk.CTk):
         self.change_log = []  # Değişiklik geçmişi
         self.is_monitoring = False
         self.monitor_thread = None
+        # Tarama sürerken yeni tarama başlatılmaz (aynı hat/anlık görüntü tek thread'den sürülür)
+        self.fetching = False
         self.check_interval = 300  # 5 dakika
+        self.cadence = None  # Uyarlanır aralık (AdaptiveInterval)
+        # Stok geçişlerinden yeniden stoklanma istatistikleri (CLI ile aynı dosya)
+        self.restock_stats = RestockStats('stock_data_restock.json')
+        
+        # Bildirimler arka planda gönderilir; Tk ana thread'i beklemez.
+        # Switch durumları worker thread'inden okunabilsin diye düz alanlarda tutulur.
+        self.sound_on = False
+        self.desktop_on = False
+        self.desktop_sink = DesktopSink(
+            toast_enabled=lambda: self.desktop_on,
+            sound_enabled=lambda: self.sound_on
+        )
+        self.notifier = NotificationDispatcher([self.desktop_sink])
         
         # UI oluştur
         self.create_ui()
@@ -419,7 +301,7 @@ class PorimaStockMonitorApp(ctk.CTk):
         self.interval_var = ctk.StringVar(value="5 dakika")
         interval_menu = ctk.CTkOptionMenu(
             interval_frame,
-            values=["1 dakika", "2 dakika", "5 dakika", "10 dakika", "30 dakika"],
+            values=["1 dakika", "2 dakika", "5 dakika", "10 dakika", "30 dakika", "Uyarlanır"],
             variable=self.interval_var,
             command=self.on_interval_change,
             width=200
@@ -463,21 +345,25 @@ class PorimaStockMonitorApp(ctk.CTk):
         self.notif_sound = ctk.CTkSwitch(
             sidebar,
             text="Sesli Uyarı",
-            font=ctk.CTkFont(size=13)
+            font=ctk.CTkFont(size=13),
+            command=self.on_notification_settings_change
         )
         self.notif_sound.pack(fill="x", padx=20, pady=3)
-        if SOUND_ENABLED:
+        if self.desktop_sink.sound_supported:
             self.notif_sound.select()
         
         self.notif_desktop = ctk.CTkSwitch(
             sidebar,
             text="Masaüstü Bildirimi",
-            font=ctk.CTkFont(size=13)
+            font=ctk.CTkFont(size=13),
+            command=self.on_notification_settings_change
         )
         self.notif_desktop.pack(fill="x", padx=20, pady=3)
-        if NOTIFICATIONS_ENABLED:
+        if self.desktop_sink.toast_supported:
             self.notif_desktop.select()
         
+        self.on_notification_settings_change()
+        
         # Alt bilgi
         footer = ctk.CTkLabel(
             sidebar,
@@ -521,6 +407,25 @@ class PorimaStockMonitorApp(ctk.CTk):
         )
         filter_menu.pack(side="left")
         
+        # Özellik filtreleri (seçenekler ve sayıları özellik dizininden)
+        self.facet_vars = {}
+        self.facet_menus = {}
+        self.facet_choices = {}
+        for facet, label in (('material', "Malzeme"), ('color', "Renk"), ('diameter', "Çap")):
+            all_label = f"{label}: Tümü"
+            self.facet_vars[facet] = ctk.StringVar(value=all_label)
+            self.facet_choices[facet] = {all_label: None}
+            menu = ctk.CTkOptionMenu(
+                filter_frame,
+                values=[all_label],
+                variable=self.facet_vars[facet],
+                command=self.on_filter_change,
+                width=130,
+                font=ctk.CTkFont(size=13)
+            )
+            menu.pack(side="left", padx=(10, 0))
+            self.facet_menus[facet] = (menu, all_label)
+        
         # Son güncelleme
         self.last_update_label = ctk.CTkLabel(
             topbar,
@@ -639,7 +544,10 @@ class PorimaStockMonitorApp(ctk.CTk):
         self.refresh_data()
     
     def refresh_data(self):
-        """Verileri yenile"""
+        """Verileri yenile (tarama sürüyorsa bu tur atlanır)"""
+        if self.fetching:
+            return
+        self.fetching = True
         self.status_label.configure(text="⏳ Veriler alınıyor...")
         self.refresh_btn.configure(state="disabled")
         
@@ -650,34 +558,59 @@ class PorimaStockMonitorApp(ctk.CTk):
     def _fetch_data_thread(self):
         """Veri çekme thread'i"""
         try:
-            products = self.api.fetch_products()
-            filaments = self.api.filter_filaments(products)
-            stock_data = self.api.get_stock_data(filaments)
+            # Çek, sınıflandır, karşılaştır ve kaydet (ortak hat); her sayfanın
+            # değişiklikleri tarama sürerken gösterilir
+            rows = []
+            change_count = 0
+            newly_available, newly_out = [], []
+            # Özellik dizini ve sayaçlar bir kez (arka planda) kurulur, sonra her sayfayla güncellenir
+            self.api.store.facets
+            self.api.store.counters
+            for page in self.api.stream():
+                rows.extend(page.rows)
+                if page.changes.newly_available or page.changes.newly_out:
+                    change_count += len(page.changes.newly_available) + len(page.changes.newly_out)
+                    newly_available.extend(page.changes.newly_available)
+                    newly_out.extend(page.changes.newly_out)
+                    self.after(0, lambda changes=page.changes: self._apply_changes(changes))
+            
+            if self.api.last_result.failed:
+                self.after(0, lambda: self._show_error("Ürünler alınamadı"))
+                return
             
-            # Değişiklikleri kontrol et
-            newly_available, newly_out = self.api.check_changes(stock_data)
+            self.restock_stats.record(newly_available, newly_out)
             
             # UI güncelle (ana thread'de)
-            self.after(0, lambda: self._update_ui(stock_data, newly_available, newly_out))
+            self.after(0, lambda: self._update_ui(rows, change_count))
             
         except Exception as e:
             self.after(0, lambda: self._show_error(str(e)))
     
-    def _update_ui(self, stock_data, newly_available, newly_out=None):
+    def _apply_changes(self, changes):
+        """Bir sayfanın değişikliklerini kaydet ve göster"""
+        for item in changes.newly_available:
+            self.add_change_log(item, 'in')
+            self.send_notification(item)
+        
+        for item in changes.newly_out:
+            self.add_change_log(item, 'out')
+    
+    def _update_ui(self, stock_data, change_count=0):
         """UI'ı güncelle"""
-        if newly_out is None:
-            newly_out = []
-            
+        # Ana thread'de çalışır: bu metot bitmeden yeni tarama başlayamaz
+        self.fetching = False
         self.all_products = stock_data
+        self.update_facet_menus()
         self.apply_filters()
         
-        # İstatistikleri güncelle
-        in_stock = sum(1 for p in stock_data if p['available'])
-        out_stock = len(stock_data) - in_stock
+        # İstatistikler anlık görüntünün sayaçlarından okunur
+        stats = self.api.store.stats(materials=False)
         
-        self.in_stock_label.configure(text=f"✅ Stokta: {in_stock}")
-        self.out_stock_label.configure(text=f"❌ Stoksuz: {out_stock}")
-        self.total_label.configure(text=f"📦 Toplam: {len(stock_data)}")
+        self.in_stock_label.configure(text=f"✅ Stokta: {stats['in_stock']}")
+        self.out_stock_label.configure(text=f"❌ Stoksuz: {stats['out_stock']}")
+        self.total_label.configure(
+            text=f"📦 Toplam: {stats['total']} ({stats['products']['total']} ürün)"
+        )
         
         # Son güncelleme
         current_time = datetime.now().strftime('%H:%M:%S')
@@ -685,23 +618,41 @@ class PorimaStockMonitorApp(ctk.CTk):
         self.status_label.configure(text="🟢 Veriler güncellendi")
         self.refresh_btn.configure(state="normal")
         
-        # Değişiklikleri kaydet ve göster
-        for item in newly_available:
-            self.add_change_log(item, 'in')
-            self.send_notification(item)
-        
-        for item in newly_out:
-            self.add_change_log(item, 'out')
+        # Uyarlanır modda bir sonraki aralığı değişiklik yoğunluğuna göre ayarla
+        if self.cadence is not None:
+            self.check_interval = self.cadence.update(change_count)
     
     def _show_error(self, message):
         """Hata göster"""
+        self.fetching = False
         self.status_label.configure(text=f"🔴 Hata: {message}")
         self.refresh_btn.configure(state="normal")
     
+    def update_facet_menus(self):
+        """Özellik filtrelerinin seçeneklerini dizindeki sayılarla yenile"""
+        summary = self.api.store.facets.summary()
+        for facet, (menu, all_label) in self.facet_menus.items():
+            choices = {all_label: None}
+            for option in summary[facet]:
+                suffix = "mm" if facet == 'diameter' else ""
+                choices[f"{option['value']}{suffix} ({option['in_stock']}/{option['total']})"] = option['value']
+            
+            # Seçili değer korunur (sayısı değişmiş olsa da)
+            selected = self.facet_choices[facet].get(self.facet_vars[facet].get())
+            self.facet_choices[facet] = choices
+            menu.configure(values=list(choices))
+            current = next((label for label, value in choices.items() if value == selected), all_label)
+            self.facet_vars[facet].set(current)
+    
     def apply_filters(self):
         """Filtreleri uygula"""
         search_term = self.search_entry.get().lower()
         filter_type = self.filter_var.get()
+        selected = {
+            facet: self.facet_choices[facet].get(var.get())
+            for facet, var in self.facet_vars.items()
+        }
+        facets = self.api.store.facets if any(selected.values()) else None
         
         filtered = []
         for p in self.all_products:
@@ -716,6 +667,10 @@ class PorimaStockMonitorApp(ctk.CTk):
             if filter_type == "Stoksuz" and p['available']:
                 continue
             
+            # Özellik filtreleri (varyant başına dizin araması)
+            if facets is not None and not facets.matches(p['variant_id'], **selected):
+                continue
+            
             filtered.append(p)
         
         self.filtered_products = filtered
@@ -758,7 +713,15 @@ class PorimaStockMonitorApp(ctk.CTk):
             "10 dakika": 600,
             "30 dakika": 1800
         }
-        self.check_interval = intervals.get(value, 300)
+        
+        # Uyarlanır: değişiklik olunca 1 dakikaya kadar daralır, sakinken 30 dakikaya kadar açılır
+        if value == "Uyarlanır":
+            self.cadence = AdaptiveInterval(base=300, min_interval=60, max_interval=1800,
+                                            restock_stats=self.restock_stats)
+            self.check_interval = self.cadence.current
+        else:
+            self.cadence = None
+            self.check_interval = intervals.get(value, 300)
     
     def toggle_monitoring(self):
         """Otomatik takibi aç/kapat"""
@@ -848,28 +811,15 @@ class PorimaStockMonitorApp(ctk.CTk):
         self.change_log = []
         self.render_change_log()
     
+    def on_notification_settings_change(self):
+        """Bildirim switch'leri değiştiğinde"""
+        self.sound_on = bool(self.notif_sound.get())
+        self.desktop_on = bool(self.notif_desktop.get())
+    
     def send_notification(self, item):
-        """Bildirim gönder"""
+        """Bildirimi kuyruğa bırak (gönderim arka planda yapılır)"""
         message = f"{item['product']} - {item['variant']} stoğa girdi!"
-        
-        # Masaüstü bildirimi
-        if self.notif_desktop.get() and NOTIFICATIONS_ENABLED:
-            try:
-                notification.notify(
-                    title="🎉 Stokta!",
-                    message=message[:256],
-                    app_name="Porima Stok Takip",
-                    timeout=10
-                )
-            except:
-                pass
-        
-        # Sesli uyarı
-        if self.notif_sound.get() and SOUND_ENABLED:
-            try:
-                winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
-            except:
-                pass
+        self.notifier.submit("🎉 Stokta!", message, item)
 
 
 def main():
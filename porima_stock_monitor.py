@@ -8,258 +8,163 @@ Kullanım:
     python porima_stock_monitor.py
 
 Gereksinimler:
-    pip install requests beautifulsoup4 plyer
+    pip install requests plyer
 """
 
-import requests
-from bs4 import BeautifulSoup
-import json
 import time
 from datetime import datetime
 import os
 import sys
 import io
 
+# Her çalıştırmada gerekenler; isteğe bağlı özelliklerin modülleri
+# (uyarlanır aralık, geçmiş günlüğü, webhook) kullanıldıkları yerde yüklenir
+from porima_core.alerts import AlertEngine, AlertRule, format_alert
+from porima_core.classify import FILAMENT_COLLECTIONS, FILAMENT_KEYWORDS
+from porima_core.notify import ConsoleSink, DesktopSink, EmailSink, NotificationDispatcher, WebhookSink
+from porima_core.pipeline import StockPipeline
+from porima_core.restock import RestockStats
+from porima_core.runstate import RunLock, RunState
+
 # Windows konsol encoding düzeltmesi
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
-# Opsiyonel: Masaüstü bildirimi için
-try:
-    from plyer import notification
-    NOTIFICATIONS_ENABLED = True
-except ImportError:
-    NOTIFICATIONS_ENABLED = False
-    print("⚠️  Masaüstü bildirimleri için 'plyer' yükleyin: pip install plyer")
 
-# Opsiyonel: Sesli uyarı için
-try:
-    import winsound
-    SOUND_ENABLED = True
-except ImportError:
-    SOUND_ENABLED = False
+def history_dir(data_file):
+    """Geçmiş günlüğünün klasörü"""
+    return os.path.splitext(data_file)[0] + '_history'
+
+
+def print_history(log, when):
+    """Geçmişteki bir andaki stok durumunu yazdır"""
+    rows = log.rows_at(when.timestamp())
+    if rows is None:
+        bounds = log.bounds()
+        since = datetime.fromtimestamp(bounds[0]).strftime('%Y-%m-%d %H:%M') if bounds else None
+        print(f"⚠️  {when:%Y-%m-%d %H:%M} için kayıt yok" + (f" (geçmiş {since} tarihinden başlıyor)." if since else "."))
+        return
+    
+    in_stock = [row for row in rows if row['available']]
+    print("\n" + "="*60)
+    print(f"🕰️  {when:%Y-%m-%d %H:%M} ANINDA STOKTAKİ FİLAMENTLER")
+    print("="*60)
+    for row in in_stock:
+        print(f"   - {row['product']} - {row['variant']} {row['price']:.2f} TL")
+    print(f"\n📌 {len(rows)} varyantın {len(in_stock)} tanesi stoktaydı.")
+    print("="*60)
 
 
 class PorimaStockMonitor:
     """Porima3D Filament Stok Takip Sınıfı"""
     
     BASE_URL = "https://porima3d.com"
-    FILAMENT_COLLECTIONS = [
-        "/collections/3d-yazici-filament-cesitleri",
-    ]
+    # Varsayılan olarak yalnızca bu koleksiyonlar taranır
+    FILAMENT_COLLECTIONS = list(FILAMENT_COLLECTIONS)
     
     # Shopify JSON endpoint'i
     PRODUCTS_JSON = "/products.json"
     
-    def __init__(self, check_interval=300, data_file="stock_data.json"):
+    def __init__(self, check_interval=300, data_file="stock_data.json", notifier=None, webhook=None,
+                 adaptive=False, min_interval=60, max_interval=1800, state_file=None, workers=0,
+                 collections=None, keyword_filter=False, rules_file=None, history=False):
         """
         Args:
             check_interval: Kontrol aralığı (saniye), varsayılan 5 dakika
             data_file: Stok verilerinin kaydedileceği dosya
+            notifier: Bildirim dağıtıcısı (varsayılan: konsol + masaüstü)
+            webhook: Değişiklik olaylarını gönderen WebhookPublisher (opsiyonel)
+            adaptive: Aralığı değişiklik yoğunluğuna göre uyarla
+            min_interval / max_interval: Uyarlanır modda aralık sınırları (saniye)
+            state_file: Çalıştırmalar arası durum dosyası (varsayılan: <data_file>_state.json)
+            workers: Sayfa ayrıştırma süreç havuzu boyutu (büyük kataloglar için, 0: kapalı)
+            collections: Taranacak koleksiyonlar (varsayılan: FILAMENT_COLLECTIONS,
+                boş liste: tüm mağaza anahtar kelimeyle süzülür)
+            keyword_filter: Koleksiyon taramasında anahtar kelime süzgecini de uygula
+            rules_file: Uyarı kuralları dosyası (varsayılan: <data_file>_rules.json)
+            history: Her taramanın farkını geçmiş günlüğüne yaz (<data_file>_history/)
         """
         self.check_interval = check_interval
         self.data_file = data_file
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7',
-        })
-        self.previous_stock = self.load_stock_data()
         self.watched_products = []  # Takip edilen belirli ürünler
         
-    def load_stock_data(self):
-        """Önceki stok verilerini yükle"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"⚠️  Veri dosyası okunamadı: {e}")
-        return {}
-    
-    def save_stock_data(self, data):
-        """Stok verilerini kaydet"""
-        try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"⚠️  Veri dosyası kaydedilemedi: {e}")
-    
-    def get_all_products_json(self):
-        """Shopify JSON API'den tüm ürünleri çek"""
-        all_products = []
-        page = 1
+        self.notifier = notifier or NotificationDispatcher([ConsoleSink(), DesktopSink()])
+        self.webhook = webhook
+        self.restock_stats = RestockStats(os.path.splitext(data_file)[0] + '_restock.json')
+        # Kural varsa bildirimler kurallardan, yoksa her stoğa girişte gönderilir
+        self.alerts = AlertEngine(rules_file or os.path.splitext(data_file)[0] + '_rules.json')
+        self.last_change_count = 0
         
-        while True:
-            try:
-                url = f"{self.BASE_URL}/products.json?limit=250&page={page}"
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                
-                data = response.json()
-                products = data.get('products', [])
-                
-                if not products:
-                    break
-                    
-                all_products.extend(products)
-                page += 1
-                
-                # Rate limiting için bekle
-                time.sleep(0.5)
-                
-            except requests.exceptions.RequestException as e:
-                print(f"❌ Ürünler alınamadı (sayfa {page}): {e}")
-                break
-            except json.JSONDecodeError as e:
-                print(f"❌ JSON parse hatası: {e}")
-                break
-                
-        return all_products
-    
-    def filter_filaments(self, products):
-        """Sadece filament ürünlerini filtrele"""
-        filament_keywords = [
-            'filament', 'pla', 'abs', 'petg', 'tpu', 'asa', 
-            'flex', 'nylon', 'pa', 'silk', 'rainbow'
-        ]
+        # Koşullu istekler, filigranlar ve bekleme durumu
+        self.run_state = RunState(state_file or os.path.splitext(data_file)[0] + '_state.json')
+        if collections is None:
+            collections = self.FILAMENT_COLLECTIONS
+        keywords = FILAMENT_KEYWORDS if keyword_filter or not collections else None
+        self.history = None
+        if history:
+            from porima_core.timeline import SnapshotLog
+            self.history = SnapshotLog(history_dir(data_file))
+        self.pipeline = StockPipeline(data_file, base_url=self.BASE_URL, delay=0.5, run_state=self.run_state,
+                                      keywords=keywords, workers=workers, collections=collections,
+                                      history=self.history)
         
-        filaments = []
-        for product in products:
-            product_type = product.get('product_type', '').lower()
-            title = product.get('title', '').lower()
-            tags = ' '.join(product.get('tags', [])).lower()
-            
-            # Filament olup olmadığını kontrol et
-            is_filament = any(kw in title or kw in product_type or kw in tags 
-                            for kw in filament_keywords)
-            
-            if is_filament:
-                filaments.append(product)
-                
-        return filaments
+        self.cadence = None
+        if adaptive:
+            # Önceki çalıştırmanın uyarlanmış aralığından devam et
+            from porima_core.cadence import AdaptiveInterval
+            base = self.run_state.backoff.get('interval') or check_interval
+            self.cadence = AdaptiveInterval(base, min_interval, max_interval,
+                                            restock_stats=self.restock_stats)
+        
+    @property
+    def previous_stock(self):
+        """Son kaydedilen anlık görüntü"""
+        return self.pipeline.previous_stock
     
-    def get_stock_status(self, products):
+    def group_by_product(self, rows):
         """
-        Ürünlerin stok durumunu analiz et
+        Varyant satırlarını ürün bazında grupla (raporlar için)
         
         Returns:
-            dict: {product_id: {title, variants: [{variant_id, title, available, price}]}}
+            dict: {product_id: {title, url, variants: [{id, title, available, price}]}}
         """
         stock_status = {}
-        
-        for product in products:
-            product_id = str(product.get('id'))
-            product_title = product.get('title', 'Bilinmeyen Ürün')
-            handle = product.get('handle', '')
-            product_url = f"{self.BASE_URL}/products/{handle}"
-            
-            variants = []
-            for variant in product.get('variants', []):
-                variant_info = {
-                    'id': str(variant.get('id')),
-                    'title': variant.get('title', 'Varsayılan'),
-                    'available': variant.get('available', False),
-                    'price': variant.get('price', '0'),
-                    'sku': variant.get('sku', ''),
+        for row in rows:
+            product = stock_status.get(row['product_id'])
+            if product is None:
+                product = stock_status[row['product_id']] = {
+                    'title': row['product'],
+                    'url': row['url'],
+                    'variants': [],
                 }
-                variants.append(variant_info)
-            
-            stock_status[product_id] = {
-                'title': product_title,
-                'url': product_url,
-                'handle': handle,
-                'variants': variants,
-                'last_checked': datetime.now().isoformat(),
-            }
-            
+            product['variants'].append({
+                'id': row['variant_id'],
+                'title': row['variant'],
+                'available': row['available'],
+                'price': row['price'],
+            })
         return stock_status
     
-    def compare_stock(self, current_stock):
-        """
-        Önceki ve şimdiki stok durumunu karşılaştır
-        
-        Returns:
-            tuple: (newly_available, newly_out_of_stock)
-        """
-        newly_available = []
-        newly_out_of_stock = []
-        
-        for product_id, current_data in current_stock.items():
-            if product_id not in self.previous_stock:
-                # Yeni ürün - ilk kez görüldü
-                continue
-                
-            previous_data = self.previous_stock[product_id]
-            current_variants = {v['id']: v for v in current_data['variants']}
-            previous_variants = {v['id']: v for v in previous_data['variants']}
-            
-            for variant_id, current_variant in current_variants.items():
-                if variant_id not in previous_variants:
-                    continue
-                    
-                previous_variant = previous_variants[variant_id]
-                
-                # Stok durumu değişti mi?
-                if current_variant['available'] and not previous_variant['available']:
-                    # Stoksuzdan stoğa geçti
-                    newly_available.append({
-                        'product': current_data['title'],
-                        'variant': current_variant['title'],
-                        'url': current_data['url'],
-                        'price': current_variant['price'],
-                    })
-                elif not current_variant['available'] and previous_variant['available']:
-                    # Stoktan çıktı
-                    newly_out_of_stock.append({
-                        'product': current_data['title'],
-                        'variant': current_variant['title'],
-                        'url': current_data['url'],
-                    })
-                    
-        return newly_available, newly_out_of_stock
+    def notify(self, title, message, item=None):
+        """Bildirimi kuyruğa bırak (gönderim arka planda yapılır, döngü beklemez)"""
+        self.notifier.submit(title, message, item)
     
-    def notify(self, title, message):
-        """Masaüstü bildirimi gönder"""
-        print(f"\n🔔 {title}")
-        print(f"   {message}")
-        
-        if NOTIFICATIONS_ENABLED:
-            try:
-                notification.notify(
-                    title=title,
-                    message=message[:256],  # Maksimum karakter sınırı
-                    app_name="Porima Stok Takip",
-                    timeout=10,
-                )
-            except Exception as e:
-                print(f"⚠️  Bildirim gönderilemedi: {e}")
-        
-        if SOUND_ENABLED:
-            try:
-                # Windows sistem sesi çal
-                winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
-            except:
-                pass
-    
-    def print_status_report(self, stock_status):
-        """Mevcut stok durumunu ekrana yazdır"""
-        out_of_stock_count = 0
-        in_stock_count = 0
-        
-        for product_id, data in stock_status.items():
-            for variant in data['variants']:
-                if variant['available']:
-                    in_stock_count += 1
-                else:
-                    out_of_stock_count += 1
+    def print_status_report(self):
+        """Mevcut stok durumunu ekrana yazdır (anlık görüntünün sayaçlarından)"""
+        stats = self.pipeline.store.stats()
+        products = stats['products']
         
         print(f"\n📊 Stok Özeti:")
-        print(f"   ✅ Stokta: {in_stock_count} varyant")
-        print(f"   ❌ Stoksuz: {out_of_stock_count} varyant")
-        print(f"   📦 Toplam: {len(stock_status)} ürün")
+        print(f"   ✅ Stokta: {stats['in_stock']} varyant")
+        print(f"   ❌ Stoksuz: {stats['out_stock']} varyant")
+        print(f"   📦 Toplam: {products['total']} ürün ({products['out_stock']} tanesi tamamen stoksuz)")
+        if stats['materials']:
+            breakdown = ", ".join(
+                f"{material} {counts['in_stock']}/{counts['total']}"
+                for material, counts in stats['materials'].items()
+            )
+            print(f"   🧵 Malzemeler (stokta/toplam): {breakdown}")
     
     def list_out_of_stock(self, stock_status):
         """Stokta olmayan ürünleri listele"""
@@ -308,47 +213,101 @@ class PorimaStockMonitor:
         self.watched_products.append(product_name.lower())
         print(f"👁️  '{product_name}' takip listesine eklendi.")
     
-    def check_once(self):
-        """Tek seferlik stok kontrolü yap"""
+    def check_once(self, skip_unchanged=True):
+        """
+        Tek seferlik stok kontrolü yap
+        
+        Args:
+            skip_unchanged: Hiçbir sayfa değişmemişse ayrıştırma, karşılaştırma
+                ve kaydetme adımlarını atla (None döner)
+        
+        Returns:
+            MappedSnapshot: Yeni anlık görüntü (başarısızsa None)
+        """
         print(f"\n⏳ [{datetime.now().strftime('%H:%M:%S')}] Stok kontrol ediliyor...")
+        started = time.time()
         
-        # Tüm ürünleri çek
-        all_products = self.get_all_products_json()
+        # Çek, sınıflandır, karşılaştır ve kaydet (ortak hat); her sayfanın
+        # değişiklikleri tarama sürerken bildirilir
+        self.last_change_count = 0
+        for page in self.pipeline.stream(skip_unchanged=skip_unchanged):
+            self.report_changes(page.changes)
+        result = self.pipeline.last_result
         
-        if not all_products:
+        if result.unchanged:
+            print(f"   💤 {self.pipeline.fetcher.page_count} sayfanın hiçbiri değişmemiş, karşılaştırma atlandı.")
+            self._record_run(started, 0)
+            return None
+        
+        if result.failed:
             print("❌ Ürünler alınamadı!")
+            if self.last_change_count:
+                print(f"   ℹ️  Taranan sayfalardaki {self.last_change_count} değişiklik kaydedildi.")
+            delay = self.run_state.record_failure(started)
+            self.run_state.save()
+            print(f"   ⏸️  Tek seferlik çalıştırmalar {delay} saniye bekletilecek.")
             return None
             
-        print(f"   📦 {len(all_products)} ürün bulundu.")
+        print(f"   📦 {result.product_count} ürün bulundu.")
+        print(f"   🧵 {result.filament_count} filament ürünü tespit edildi.")
+        if result.reused_count:
+            print(f"   ♻️  {result.reused_count} ürün önceki turdan beri değişmemiş, karşılaştırma atlandı.")
         
-        # Filamentleri filtrele
-        filaments = self.filter_filaments(all_products)
-        print(f"   🧵 {len(filaments)} filament ürünü tespit edildi.")
+        # Doğrulayıcılar ancak anlık görüntü yazıldıktan sonra kalıcı olur
+        self._record_run(started, self.last_change_count)
         
-        # Stok durumunu al
-        current_stock = self.get_stock_status(filaments)
+        # Durum raporu sayaçlardan okunur; tarama satırları bellekte tutulmaz
+        self.print_status_report()
         
-        # Karşılaştır
-        newly_available, newly_out_of_stock = self.compare_stock(current_stock)
+        return self.previous_stock
+    
+    def report_changes(self, changes):
+        """Bir sayfanın stok değişikliklerini bildir ve kaydet"""
+        newly_available = changes.newly_available
+        newly_out_of_stock = changes.newly_out
         
         # Bildirimleri gönder
-        for item in newly_available:
-            self.notify(
-                "🎉 Stokta!",
-                f"{item['product']} - {item['variant']} stoğa girdi! {item['price']} TL"
+        if len(self.alerts):
+            # Fiyat değişiklikleri de kurallara takılabilir
+            for match in self.alerts.match(changes):
+                title, message = format_alert(match)
+                self.notify(title, message, match.item)
+        else:
+            for item in newly_available:
+                self.notify(
+                    "🎉 Stokta!",
+                    f"{item['product']} - {item['variant']} stoğa girdi! {item['price']:.2f} TL",
+                    item
+                )
+        
+        # Webhook gönderimi arka planda yapılır, taramayı bekletmez (web arayüzüyle aynı olaylar)
+        if self.webhook is not None:
+            events = (
+                [dict(item, type='in') for item in newly_available] +
+                [dict(item, type='out') for item in newly_out_of_stock] +
+                [dict(item, type='price_up') for item in changes.price_increased] +
+                [dict(item, type='price_down') for item in changes.price_decreased]
             )
+            if events:
+                self.webhook.publish(events)
+        
+        if not newly_available and not newly_out_of_stock:
+            return
             
         for item in newly_out_of_stock:
             print(f"⚠️  Stoktan çıktı: {item['product']} - {item['variant']}")
         
-        # Verileri kaydet
-        self.previous_stock = current_stock
-        self.save_stock_data(current_stock)
-        
-        # Durum raporu
-        self.print_status_report(current_stock)
-        
-        return current_stock
+        # Yeniden stoklanma istatistikleri
+        self.restock_stats.record(newly_available, newly_out_of_stock)
+        self.last_change_count += len(newly_available) + len(newly_out_of_stock)
+    
+    def _record_run(self, started, changes):
+        """Başarılı kontrolün filigranlarını ve uyarlanır aralığını kaydet"""
+        interval = self.cadence.update(changes) if self.cadence is not None else None
+        self.run_state.record_success(changes, self.pipeline.fetcher.page_count, now=started, interval=interval)
+        self.run_state.save()
+        if interval is not None:
+            self.check_interval = interval
     
     def run(self):
         """Sürekli stok takibi başlat"""
@@ -356,6 +315,8 @@ class PorimaStockMonitor:
         print("🚀 PORİMA3D FİLAMENT STOK TAKİP PROGRAMI")
         print("="*60)
         print(f"📡 Kontrol aralığı: {self.check_interval} saniye ({self.check_interval/60:.1f} dakika)")
+        if self.cadence is not None:
+            print(f"📈 Uyarlanır aralık: {self.cadence.min_interval}-{self.cadence.max_interval} saniye")
         print(f"💾 Veri dosyası: {self.data_file}")
         print("⌨️  Durdurmak için Ctrl+C basın")
         print("="*60)
@@ -367,12 +328,17 @@ class PorimaStockMonitor:
                 if stock:
                     # İlk çalıştırmada stoksuz ürünleri göster
                     if not self.previous_stock or len(self.previous_stock) == 0:
-                        self.list_out_of_stock(stock)
+                        self.list_out_of_stock(self.group_by_product(stock.rows()))
                 
+                # Uyarlanır modda aralık her kontrolden sonra _record_run içinde güncellenir
                 print(f"\n⏰ Sonraki kontrol: {self.check_interval} saniye sonra...")
                 time.sleep(self.check_interval)
                 
         except KeyboardInterrupt:
+            self.pipeline.close()
+            self.notifier.close()
+            if self.webhook is not None:
+                self.webhook.close()
             print("\n\n👋 Program durduruldu.")
             print("💾 Stok verileri kaydedildi.")
 
@@ -388,40 +354,178 @@ def main():
 Kullanım Örnekleri:
   python porima_stock_monitor.py                    # Varsayılan ayarlarla başlat (5 dk aralık)
   python porima_stock_monitor.py -i 60              # 1 dakika aralıkla kontrol et
+  python porima_stock_monitor.py --adaptive         # Değişiklik yoğunluğuna göre 1-30 dk arası
   python porima_stock_monitor.py --once             # Tek seferlik kontrol yap
+  * * * * * python porima_stock_monitor.py --once   # Cron: değişmeyen sayfalarda hemen çıkar
+  python porima_stock_monitor.py --workers 4        # Büyük kataloglarda sayfaları 4 süreçte ayrıştır
+  python porima_stock_monitor.py --all-products     # Koleksiyonlar yerine tüm mağazayı tara
+  python porima_stock_monitor.py --add-rule "event=in, material=petg, color=siyah, diameter=1.75, max_price=700"
+  python porima_stock_monitor.py --add-rule "event=price_down, material=silk pla, min_change_percent=10"
+  python porima_stock_monitor.py --list-rules       # Uyarı kurallarını listele
   python porima_stock_monitor.py --list-out         # Stoksuz ürünleri listele
   python porima_stock_monitor.py --list-in          # Stoktaki ürünleri listele
+  python porima_stock_monitor.py --history          # Taramaların farklarını geçmiş günlüğüne yaz
+  python porima_stock_monitor.py --at "2026-10-13 14:00"  # Geçmişteki bir andaki stoklar
         """
     )
     
     parser.add_argument('-i', '--interval', type=int, default=300,
                         help='Kontrol aralığı (saniye), varsayılan: 300 (5 dakika)')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Aralığı değişiklik yoğunluğuna göre uyarla (-i başlangıç aralığıdır)')
+    parser.add_argument('--min-interval', type=int, default=60,
+                        help='Uyarlanır modda en kısa aralık (saniye), varsayılan: 60')
+    parser.add_argument('--max-interval', type=int, default=1800,
+                        help='Uyarlanır modda en uzun aralık (saniye), varsayılan: 1800')
     parser.add_argument('--once', action='store_true',
                         help='Tek seferlik kontrol yap ve çık')
+    parser.add_argument('--force', action='store_true',
+                        help='Tek seferlik kontrolde bekleme süresini yok say')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Sayfaları paralel ayrıştıracak süreç sayısı (büyük mağazalar için), varsayılan: 0')
+    parser.add_argument('--collection', action='append', default=[],
+                        help='Taranacak koleksiyon handle\'ı (birden fazla verilebilir), '
+                             'varsayılan: filament koleksiyonları')
+    parser.add_argument('--all-products', action='store_true',
+                        help='Tüm mağazayı tara ve filamentleri anahtar kelimeyle süz')
+    parser.add_argument('--keyword-filter', action='store_true',
+                        help='Koleksiyon taramasında anahtar kelime süzgecini de uygula')
+    parser.add_argument('--rules-file', type=str, default=None,
+                        help='Uyarı kuralları dosyası, varsayılan: <data-file>_rules.json')
+    parser.add_argument('--add-rule', action='append', default=[],
+                        help='Uyarı kuralı ekle ("event=in, material=petg, color=siyah, max_price=700")')
+    parser.add_argument('--remove-rule', type=int, action='append', default=[],
+                        help='Uyarı kuralını id ile sil')
+    parser.add_argument('--list-rules', action='store_true',
+                        help='Uyarı kurallarını listele')
+    parser.add_argument('--history', action='store_true',
+                        help='Her taramanın farkını geçmiş günlüğüne yaz (<data-file>_history/)')
+    parser.add_argument('--at', type=str, default=None,
+                        help='Geçmiş günlüğünden verilen andaki stokları listele ("2026-10-13 14:00")')
+    parser.add_argument('--state-file', type=str, default=None,
+                        help='Çalıştırmalar arası durum dosyası, varsayılan: <data-file>_state.json')
     parser.add_argument('--list-out', action='store_true',
                         help='Stokta olmayan ürünleri listele')
     parser.add_argument('--list-in', action='store_true',
                         help='Stokta olan ürünleri listele')
     parser.add_argument('--data-file', type=str, default='stock_data.json',
                         help='Stok verilerinin kaydedileceği dosya')
+    parser.add_argument('--notify-webhook', type=str, default=None,
+                        help='Bildirimlerin POST edileceği URL')
+    parser.add_argument('--email-to', action='append', default=[],
+                        help='Bildirim e-postası alıcısı (birden fazla verilebilir)')
+    parser.add_argument('--smtp', type=str, default='localhost:1025',
+                        help='E-posta için SMTP sunucusu, varsayılan: localhost:1025')
+    parser.add_argument('--webhook-url', type=str, default=os.environ.get('PORIMA_WEBHOOK_URL'),
+                        help='Stok değişikliklerinin toplu JSON olarak gönderileceği URL')
+    parser.add_argument('--webhook-secret', type=str, default=os.environ.get('PORIMA_WEBHOOK_SECRET'),
+                        help='Webhook HMAC imza anahtarı')
     
     args = parser.parse_args()
     
+    # Kural yönetimi: kontrol yapmadan çıkar
+    if args.add_rule or args.remove_rule or args.list_rules:
+        alerts = AlertEngine(args.rules_file or os.path.splitext(args.data_file)[0] + '_rules.json')
+        for spec in args.add_rule:
+            try:
+                rule = AlertRule.parse(spec)
+            except ValueError as e:
+                parser.error(str(e))
+            print(f"➕ Kural {alerts.add(rule)} eklendi: {rule.name}")
+        for rule_id in args.remove_rule:
+            if alerts.remove(rule_id):
+                print(f"➖ Kural {rule_id} silindi.")
+            else:
+                print(f"⚠️  Kural {rule_id} bulunamadı.")
+        if args.list_rules:
+            for rule in alerts.rules.values():
+                print(f"   {rule.id:>4}  {rule.name}")
+            print(f"📌 Toplam {len(alerts)} kural.")
+        return
+    
+    # Geçmiş sorgusu: kontrol yapmadan çıkar
+    if args.at:
+        try:
+            when = datetime.fromisoformat(args.at)
+        except ValueError:
+            parser.error(f"Geçersiz zaman: {args.at!r} (ör. 2026-10-13 14:00)")
+        if not os.path.isdir(history_dir(args.data_file)):
+            print("⚠️  Geçmiş günlüğü yok; kontrolleri --history ile çalıştırın.")
+            return
+        from porima_core.timeline import SnapshotLog
+        print_history(SnapshotLog(history_dir(args.data_file)), when)
+        return
+    
+    one_shot = args.once or args.list_out or args.list_in
+    state_file = args.state_file or os.path.splitext(args.data_file)[0] + '_state.json'
+    
+    # Üst üste binen tek seferlik çalıştırmalar: kilidi alamayan çıkar
+    lock = None
+    if one_shot:
+        lock = RunLock(os.path.splitext(state_file)[0] + '.lock')
+        if not lock.acquire():
+            print("⏭️  Başka bir kontrol sürüyor, bu çalıştırma atlandı.")
+            return
+    
+    # Bildirim hedefleri
+    desktop = DesktopSink()
+    if not desktop.toast_supported:
+        print("⚠️  Masaüstü bildirimleri için 'plyer' yükleyin: pip install plyer")
+    notifier = NotificationDispatcher([ConsoleSink(), desktop])
+    if args.notify_webhook:
+        notifier.add_sink(WebhookSink(args.notify_webhook))
+    if args.email_to:
+        host, _, port = args.smtp.partition(':')
+        notifier.add_sink(EmailSink(args.email_to, host=host, port=int(port or 25)))
+    
+    webhook = None
+    if args.webhook_url:
+        from porima_core.webhook import WebhookPublisher
+        webhook = WebhookPublisher(args.webhook_url, secret=args.webhook_secret)
+    
     # Monitor oluştur
     monitor = PorimaStockMonitor(
         check_interval=args.interval,
-        data_file=args.data_file
+        data_file=args.data_file,
+        notifier=notifier,
+        webhook=webhook,
+        adaptive=args.adaptive,
+        min_interval=args.min_interval,
+        max_interval=args.max_interval,
+        state_file=state_file,
+        workers=args.workers,
+        collections=[] if args.all_products else (args.collection or None),
+        keyword_filter=args.keyword_filter,
+        rules_file=args.rules_file,
+        history=args.history
     )
     
-    if args.once or args.list_out or args.list_in:
+    if one_shot:
         # Tek seferlik işlemler
-        stock = monitor.check_once()
-        
-        if stock:
-            if args.list_out:
-                monitor.list_out_of_stock(stock)
-            if args.list_in:
-                monitor.list_in_stock(stock)
+        try:
+            listing = args.list_out or args.list_in
+            next_run = monitor.run_state.backoff['next_run']
+            if not listing and not args.force and not monitor.run_state.due():
+                wait = int(next_run - time.time())
+                print(f"⏭️  Sonraki kontrole {wait} saniye var, bu çalıştırma atlandı.")
+                return
+            
+            # Listeleme için değişmeyen sayfalar da ayrıştırılır
+            stock = monitor.check_once(skip_unchanged=not listing)
+            
+            if stock and listing:
+                stock_status = monitor.group_by_product(stock.rows())
+                if args.list_out:
+                    monitor.list_out_of_stock(stock_status)
+                if args.list_in:
+                    monitor.list_in_stock(stock_status)
+        finally:
+            # Çıkmadan önce kuyruktaki bildirimleri gönder
+            monitor.pipeline.close()
+            notifier.close()
+            if webhook is not None:
+                webhook.close()
+            lock.release()
     else:
         # Sürekli takip
         monitor.run()
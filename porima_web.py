@@ -10,17 +10,37 @@ Tarayıcıda açın:
     http://localhost:5000
 """
 
-from flask import Flask, render_template, jsonify
+# gevent altında requests ve bekleme çağrılarının worker'ı bloklamaması için
+# (gunicorn'un GeventWebSocketWorker'ı da aynı yamayı uygular)
+try:
+    from gevent import monkey
+    monkey.patch_all()
+except ImportError:
+    pass
+
+from flask import Flask, Response, render_template, jsonify, request
 from flask_socketio import SocketIO, emit
-import requests
-import json
-import time
 from datetime import datetime
 import os
 import threading
 import sys
 import io
 
+from porima_core.alerts import AlertEngine, AlertRule, format_alert
+from porima_core.broadcast import Broadcaster, encode_frame
+from porima_core.cadence import AdaptiveInterval
+from porima_core.changelog import ChangeStream
+from porima_core.classify import FILAMENT_COLLECTIONS, FILAMENT_KEYWORDS
+from porima_core.outbound import OutboundHub
+from porima_core.pipeline import StockPipeline
+from porima_core.prices import PriceHistory
+from porima_core.restock import RestockStats
+from porima_core.scheduler import MonitorScheduler
+from porima_core.snapshot import SNAPSHOT_COLUMNS
+from porima_core.subscriptions import Subscription, SubscriptionRouter
+from porima_core.timeline import SnapshotLog
+from porima_core.webhook import WebhookPublisher
+
 # Windows konsol encoding düzeltmesi
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
@@ -31,159 +51,159 @@ app.config['SECRET_KEY'] = 'porima-stock-monitor-secret'
 socketio = SocketIO(app, cors_allowed_origins="*")
 
 
-class StockMonitorAPI:
-    """Porima3D Stok API İşlemleri"""
-    
-    BASE_URL = "https://porima3d.com"
-    
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-            'Accept-Language': 'tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Cache-Control': 'max-age=0',
-        })
-        self.previous_stock = {}
-        self.data_file = "stock_data.json"
-        self.load_previous_stock()
-    
-    def load_previous_stock(self):
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    self.previous_stock = json.load(f)
-            except:
-                self.previous_stock = {}
-    
-    def save_stock_data(self, data):
-        try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except:
-            pass
-    
-    def fetch_products(self):
-        all_products = []
-        page = 1
-        
-        while True:
-            try:
-                url = f"{self.BASE_URL}/products.json?limit=250&page={page}"
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                
-                data = response.json()
-                products = data.get('products', [])
-                
-                if not products:
-                    break
-                    
-                all_products.extend(products)
-                page += 1
-                time.sleep(0.3)
-                
-            except Exception as e:
-                print(f"Hata: {e}")
-                break
-                
-        return all_products
-    
-    def filter_filaments(self, products):
-        keywords = ['filament', 'pla', 'abs', 'petg', 'tpu', 'asa', 'flex', 'nylon', 'pa', 'silk', 'rainbow']
-        
-        filaments = []
-        for product in products:
-            title = product.get('title', '').lower()
-            product_type = product.get('product_type', '').lower()
-            
-            if any(kw in title or kw in product_type for kw in keywords):
-                filaments.append(product)
-                
-        return filaments
-    
-    def get_stock_data(self, products):
-        stock_data = []
-        
-        for product in products:
-            product_id = str(product.get('id'))
-            title = product.get('title', '')
-            handle = product.get('handle', '')
-            url = f"{self.BASE_URL}/products/{handle}"
-            
-            for variant in product.get('variants', []):
-                variant_title = variant.get('title', 'Varsayılan')
-                available = variant.get('available', False)
-                price = variant.get('price', '0')
-                variant_id = str(variant.get('id'))
-                
-                stock_data.append({
-                    'product_id': product_id,
-                    'variant_id': variant_id,
-                    'product': title,
-                    'variant': variant_title,
-                    'available': available,
-                    'price': float(price) if price else 0,
-                    'url': url,
-                })
-        
-        return stock_data
+# Global değişkenler
+# Çek -> sınıflandır -> karşılaştır -> kaydet (CLI ve GUI ile ortak)
+# Varsayılan olarak yalnızca filament koleksiyonları taranır; PORIMA_COLLECTIONS
+# virgülle ayrılmış handle listesi, boş değer tüm mağazayı tarar
+collections = os.environ.get('PORIMA_COLLECTIONS', ','.join(FILAMENT_COLLECTIONS))
+collections = [c.strip() for c in collections.split(',') if c.strip()]
+# Koleksiyon taramasında anahtar kelime süzgeci isteğe bağlı ikinci geçiştir
+keyword_filter = not collections or bool(os.environ.get('PORIMA_KEYWORD_FILTER'))
+# Anlık görüntü geçmişi: periyodik anahtar kareler + tur başına farklar (boş değer: kapalı).
+# PORIMA_HISTORY_RETENTION_DAYS günden eski kareler sıkıştırmada silinir (0: sınırsız)
+history_dir = os.environ.get('PORIMA_HISTORY_DIR', 'snapshot_history')
+snapshot_log = SnapshotLog(history_dir,
+                           max_deltas=int(os.environ.get('PORIMA_HISTORY_KEYFRAME_EVERY', 288)),
+                           retention_days=int(os.environ.get('PORIMA_HISTORY_RETENTION_DAYS', 90))) \
+    if history_dir else None
+# Sayfalar süreç içinde ayrıştırılır: gevent yamalı (monkey.patch_all) süreçten
+# fork edilen ProcessPoolExecutor'ın kilitleri ve boruları bozulur. Süreç
+# havuzu (workers > 1) yalnızca CLI/GUI içindir.
+pipeline = StockPipeline('stock_data.json', delay=0.3,
+                         keywords=FILAMENT_KEYWORDS if keyword_filter else None,
+                         workers=0,
+                         collections=collections,
+                         history=snapshot_log)
+# Son kaydedilen anlık görüntü açılışta hemen sunulur; ilk tarama istekleri bekletmez
+stock_data = list(pipeline.store.snapshot.rows())
+background_refresh = False
+# Değişiklik geçmişi: bellekte halka tampon + diskte segmentler, artan offset'ler.
+# Diskte en fazla PORIMA_CHANGE_LOG_SEGMENTS segment tutulur, eskiler silinir
+change_stream = ChangeStream(os.environ.get('PORIMA_CHANGE_LOG_DIR', 'change_log'),
+                             max_segments=int(os.environ.get('PORIMA_CHANGE_LOG_SEGMENTS', 50)))
+refresh_lock = threading.Lock()
+scheduler = MonitorScheduler(socketio, check=lambda: scheduled_check())
+# Varyant fiyat geçmişi ve önceden hesaplanmış pencere istatistikleri
+price_history = PriceHistory(os.environ.get('PORIMA_PRICE_HISTORY', 'price_history.jsonl'))
+# Stok geçişlerinden yeniden stoklanma istatistikleri
+restock_stats = RestockStats(os.environ.get('PORIMA_RESTOCK_STATS', 'restock_stats.json'))
+# Kullanıcı uyarı kuralları (malzeme/renk/çap/fiyat), değişiklik başına dizinle eşleştirilir
+alert_engine = AlertEngine(os.environ.get('PORIMA_ALERT_RULES', 'alert_rules.json'))
+# İstemci abonelikleri: oda başına izlenen varyantlar, variant_id -> oda haritası
+router = SubscriptionRouter()
+router.update_catalog(stock_data)
+# İstemci başına sınırlı, onay (ack) ile akan giden kuyruklar; geride kalan
+# istemcinin bekleyen değişiklikleri birleştirilir, takılan istemci düşürülür
+outbound = OutboundHub(
+    send=lambda sid, event, payload, callback: socketio.emit(event, payload, to=sid, callback=callback),
+    drop=lambda sid, payload: drop_client(sid, payload),
+    max_pending=int(os.environ.get('PORIMA_CLIENT_QUEUE', 32)),
+    stall_timeout=int(os.environ.get('PORIMA_CLIENT_STALL_TIMEOUT', 30))
+)
+# Bundan fazla kayıt kaçıran istemci değişiklikleri tekrar oynatmak yerine /api/sync ile eşitlenir
+REPLAY_LIMIT = int(os.environ.get('PORIMA_REPLAY_LIMIT', 2000))
+# /api/variants: bir istekte aranabilecek en fazla varyant ve varsayılan alanlar
+LOOKUP_LIMIT = 5000
+LOOKUP_FIELDS = ('variant_id', 'product_id', 'available', 'price')
+MSGPACK_TYPES = ('application/msgpack', 'application/x-msgpack')
+# Salt okunur panolar için SSE yayıncısı (/api/stream)
+sse_broadcaster = Broadcaster()
+
+# Opsiyonel: Değişiklikleri dış sistemlere webhook ile gönder
+webhook = None
+if os.environ.get('PORIMA_WEBHOOK_URL'):
+    webhook = WebhookPublisher(
+        os.environ['PORIMA_WEBHOOK_URL'],
+        secret=os.environ.get('PORIMA_WEBHOOK_SECRET'),
+        spool_dir=os.environ.get('PORIMA_WEBHOOK_SPOOL', 'webhook_spool')
+    )
+
+
+def make_cadence(data):
+    """İstemci 'adaptive' istediyse uyarlanır aralık oluştur"""
+    if not data.get('adaptive'):
+        return None
+    
+    return AdaptiveInterval(
+        base=data.get('interval', 300),
+        min_interval=data.get('min_interval', 60),
+        max_interval=data.get('max_interval', 1800),
+        restock_stats=restock_stats
+    )
+
+
+def publish_sse(event, payload):
+    """Olayı SSE abonelerine gönder (salt okunur panolar her şeyi alır)"""
+    if len(sse_broadcaster):
+        sse_broadcaster.publish(event, payload, event_id=change_stream.next_offset - 1)
+
+
+def route_event(event, entries, build):
+    """
+    Kayıtları yalnızca ilgili abonelik odalarına gönder
+
+    Args:
+        entries: variant_id ve type içeren kayıtlar
+        build: Kayıt listesinden olay gövdesini üreten fonksiyon
+    """
+    for room, items in router.route(entries).items():
+        payload = build(items)
+        for sid in router.members_of(room):
+            outbound.push(sid, event, payload)
+    
+    publish_sse(event, build(entries))
+
+
+def publish_update(data, changes):
+    """Tam güncellemeyi her odaya izlediği satırlarla gönder"""
+    routed = router.route(changes)
+    rows_by_id = None
+    common = {
+        'deal_ids': price_history.deal_ids(),
+        # İstemci yeniden bağlandığında yalnızca değişen kovaları ister
+        'sync': pipeline.store.sync.summary(),
+        'time': datetime.now().strftime('%H:%M:%S')
+    }
     
-    def check_changes(self, current_data):
-        newly_available = []
-        newly_out = []
-        price_increased = []  # Zam yapılan ürünler
-        price_decreased = []  # İndirim yapılan ürünler
-        
-        current_map = {f"{d['product_id']}_{d['variant_id']}": d for d in current_data}
-        
-        for key, current in current_map.items():
-            if key in self.previous_stock:
-                prev = self.previous_stock[key]
-                
-                # Stok değişiklikleri
-                if current['available'] and not prev.get('available', False):
-                    newly_available.append(current)
-                elif not current['available'] and prev.get('available', True):
-                    newly_out.append(current)
-                
-                # Fiyat değişiklikleri (minimum 0.01 TL fark)
-                prev_price = prev.get('price', 0)
-                curr_price = current.get('price', 0)
-                
-                if curr_price > prev_price + 0.01:  # Zam
-                    current['old_price'] = prev_price
-                    current['price_change'] = curr_price - prev_price
-                    current['price_change_percent'] = ((curr_price - prev_price) / prev_price * 100) if prev_price > 0 else 0
-                    price_increased.append(current)
-                elif curr_price < prev_price - 0.01:  # İndirim
-                    current['old_price'] = prev_price
-                    current['price_change'] = prev_price - curr_price
-                    current['price_change_percent'] = ((prev_price - curr_price) / prev_price * 100) if prev_price > 0 else 0
-                    price_decreased.append(current)
-        
-        self.previous_stock = current_map
-        self.save_stock_data(current_map)
-        
-        return newly_available, newly_out, price_increased, price_decreased
+    for room, subscription in list(router.rooms.items()):
+        if subscription.watches_all_variants:
+            rows = data
+            stats = get_stats()
+        else:
+            if rows_by_id is None:
+                rows_by_id = {row['variant_id']: row for row in data}
+            rows = router.rows_for(room, rows_by_id)
+            stats = get_stats(rows)
+        payload = dict(common, stock_data=rows, changes=routed.get(room, []), stats=stats)
+        for sid in router.members_of(room):
+            outbound.push(sid, 'stock_update', payload)
+    
+    publish_sse('stock_update', dict(common, stock_data=data, changes=changes, stats=get_stats()))
 
 
-# Global değişkenler
-api = StockMonitorAPI()
-stock_data = []
-change_log = []
-is_monitoring = False
-monitor_thread = None
-check_interval = 300
+def drop_client(sid, payload):
+    """Takılan istemciye yeniden eşitleme talimatı gönder ve bağlantısını kes"""
+    router.unsubscribe(sid)
+    socketio.emit('resync', dict(payload, next_offset=change_stream.next_offset), to=sid)
+    socketio.server.disconnect(sid)
 
 
-def add_change_log(item, change_type):
-    """Değişiklik geçmişine ekle"""
-    global change_log
-    
-    entry = {
+def subscribed_rows(rows, subscription):
+    """Satırları aboneliğe göre süz (abonelik yoksa hepsi)"""
+    if subscription.watches_all_variants:
+        return rows
+    return [row for row in rows if subscription.matches(row)]
+
+
+def subscribed_changes(changes, subscription):
+    return [c for c in changes if subscription.wants_event(c.get('type')) and subscription.matches(c)]
+
+
+def change_entry(item, change_type):
+    """Bir değişikliğin istemcilere gönderilen kaydı"""
+    return {
+        'product_id': item.get('product_id', ''),
+        'variant_id': item.get('variant_id', ''),
         'product': item['product'],
         'variant': item['variant'],
         'type': change_type,  # 'in', 'out', 'price_up', 'price_down'
@@ -194,24 +214,19 @@ def add_change_log(item, change_type):
         'price_change': item.get('price_change', 0),
         'price_change_percent': item.get('price_change_percent', 0)
     }
-    
-    change_log.insert(0, entry)
-    
-    if len(change_log) > 50:
-        change_log = change_log[:50]
-    
+
+
+def add_change_log(item, change_type):
+    """Değişiklik geçmişine ekle (kayda offset atanır)"""
+    entry = change_entry(item, change_type)
+    change_stream.append(entry)
     return entry
 
 
-def refresh_stock():
-    """Stok verilerini yenile"""
-    global stock_data, change_log
-    
-    products = api.fetch_products()
-    filaments = api.filter_filaments(products)
-    stock_data = api.get_stock_data(filaments)
-    
-    newly_available, newly_out, price_increased, price_decreased = api.check_changes(stock_data)
+def record_changes(changes):
+    """Bir sayfanın değişikliklerini geçmişe ekle ve dağıt"""
+    newly_available, newly_out, price_increased, price_decreased = changes
+    restock_stats.record(newly_available, newly_out)
     
     new_changes = []
     
@@ -233,42 +248,132 @@ def refresh_stock():
         entry = add_change_log(item, 'price_down')
         new_changes.append(entry)
     
+    if new_changes:
+        # Tarama bitmeden ilgili istemcilere ve webhook'a iletilir
+        route_event('stock_changes', new_changes, lambda items: {'changes': items})
+        if webhook is not None:
+            webhook.publish(new_changes)
+        
+        alerts = [alert_payload(match) for match in alert_engine.match(changes)]
+        if alerts:
+            route_event('alerts', alerts, lambda items: {'alerts': items})
+    
+    return new_changes
+
+
+def alert_payload(match):
+    """Kural eşleşmesinin istemciye giden hali"""
+    title, message = format_alert(match)
+    item = match.item
+    return {
+        'rule_id': match.rule.id,
+        'rule': match.rule.name,
+        'type': match.event,
+        'title': title,
+        'message': message,
+        'variant_id': item.get('variant_id', ''),
+        'product': item['product'],
+        'variant': item['variant'],
+        'price': item.get('price', 0),
+        'url': item.get('url', ''),
+    }
+
+
+def refresh_stock():
+    """Stok verilerini yenile (değişiklikler sayfa sayfa yayınlanır)"""
+    global stock_data
+    
+    rows = []
+    new_changes = []
+    
+    # Döngü ve manuel yenileme aynı anda çalışırsa karşılaştırma bozulmasın
+    with refresh_lock:
+        for page in pipeline.stream():
+            rows.extend(page.rows)
+            price_history.observe(page.rows)
+            new_changes.extend(record_changes(page.changes))
+        
+        if pipeline.last_result.failed:
+            # Taranan sayfalar uygulanır, kalan ürünler son bilinen haliyle kalır
+            print("❌ Ürünler alınamadı, taranmayan ürünler için önceki veriler kullanılıyor")
+            merged = {row['variant_id']: row for row in stock_data}
+            merged.update((row['variant_id'], row) for row in rows)
+            rows = list(merged.values())
+        
+        stock_data = rows
+        router.update_catalog(stock_data)
+    
     return stock_data, new_changes
 
 
-def monitor_loop():
-    """Otomatik takip döngüsü"""
-    global is_monitoring
-    
-    while is_monitoring:
-        time.sleep(check_interval)
-        if is_monitoring:
-            try:
-                data, changes = refresh_stock()
-                
-                # WebSocket ile tüm istemcilere güncelleme gönder
-                socketio.emit('stock_update', {
-                    'stock_data': data,
-                    'changes': changes,
-                    'stats': get_stats(data),
-                    'time': datetime.now().strftime('%H:%M:%S')
-                })
-                
-            except Exception as e:
-                print(f"Monitor error: {e}")
-
-
-def get_stats(data):
-    """İstatistikleri hesapla"""
-    in_stock = sum(1 for p in data if p['available'])
-    out_stock = len(data) - in_stock
+def scheduled_check():
+    """Otomatik takip turu: tara ve yayınla, değişiklik sayısını döndür"""
+    data, changes = refresh_stock()
+    
+    # Her abonelik odasına yalnızca izlediği satırlar, SSE'ye tamamı
+    publish_update(data, changes)
+    return len(changes)
+
+
+def refresh_in_background():
+    """Taramayı istekleri bekletmeden başlat; sonuç stock_update ile yayınlanır"""
+    global background_refresh
+    
+    if background_refresh or refresh_lock.locked():
+        return
+    background_refresh = True
+    
+    def run():
+        global background_refresh
+        try:
+            publish_update(*refresh_stock())
+        except Exception as e:
+            print(f"Refresh error: {e}")
+        finally:
+            background_refresh = False
+    
+    socketio.start_background_task(run)
+
+
+def get_stats(rows=None):
+    """
+    İstatistikler
+
+    Tüm katalog için anlık görüntünün artımlı sayaçlarından (ürün ve malzeme
+    dökümleriyle) okunur; yalnızca süzülmüş abonelik satırları sayılır.
+    """
+    if rows is None:
+        return pipeline.store.stats()
+    in_stock = sum(1 for p in rows if p['available'])
     return {
         'in_stock': in_stock,
-        'out_stock': out_stock,
-        'total': len(data)
+        'out_stock': len(rows) - in_stock,
+        'total': len(rows)
     }
 
 
+def negotiated(payload):
+    """
+    Accept başlığına (veya format=msgpack) göre msgpack ya da JSON yanıt
+
+    msgpack kurulu değilse JSON'u da kabul eden istemciye JSON döner; yalnızca
+    msgpack isteyene (format=msgpack veya JSON'suz Accept) 406 döner.
+    """
+    explicit = request.args.get('format') == 'msgpack'
+    wants = explicit or \
+        request.accept_mimetypes.best_match(('application/json',) + MSGPACK_TYPES) in MSGPACK_TYPES
+    if wants:
+        try:
+            import msgpack
+        except ImportError:
+            msgpack = None
+        if msgpack is not None:
+            return Response(msgpack.packb(payload, use_bin_type=True), mimetype='application/msgpack')
+        if explicit or not request.accept_mimetypes.accept_json:
+            return jsonify({'error': 'msgpack sunucuda kurulu değil'}), 406
+    return jsonify(payload)
+
+
 # Flask Routes
 @app.route('/')
 def index():
@@ -277,15 +382,58 @@ def index():
 
 @app.route('/api/stock')
 def get_stock():
-    global stock_data
+    """
+    Stok verileri; variants/products/materials/events parametreleriyle süzülür
+
+    Açılıştan sonraki ilk istek son kaydedilen anlık görüntüyle hemen yanıtlanır,
+    güncel tarama arka planda başlatılır.
+    """
+    if pipeline.last_result is None:
+        refresh_in_background()
     
-    if not stock_data:
-        stock_data, _ = refresh_stock()
+    subscription = Subscription.from_dict(request.args)
+    rows = subscribed_rows(stock_data, subscription)
     
     return jsonify({
-        'stock_data': stock_data,
-        'stats': get_stats(stock_data),
-        'change_log': change_log,
+        'stock_data': rows,
+        'stats': get_stats(None if subscription.watches_all_variants else rows),
+        'deal_ids': price_history.deal_ids(),
+        'change_log': subscribed_changes(change_stream.latest(50), subscription),
+        'next_offset': change_stream.next_offset,
+        'sync': pipeline.store.sync.summary(),
+        'time': datetime.now().strftime('%H:%M:%S')
+    })
+
+
+@app.route('/api/sync', methods=['POST'])
+def api_sync():
+    """
+    Kova özetleriyle eşitleme
+
+    Gövde: son alınan {"epoch", "root", "buckets": [kova özeti, ...]}; istemcinin
+    yerelde değiştirdiği kovalar boş özetle gönderilir. Yanıtta yalnızca özeti
+    farklı kovaların satırları (abonelik süzgeciyle) ve yeni eşitleme durumu döner.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
+    subscription = Subscription.from_dict(request.args)
+    
+    # Kaydedilmiş anlık görüntüden okunur: süren tarama beklenmez
+    changed, full, rows, summary = pipeline.store.sync_diff(data.get('epoch'), data.get('root'), data.get('buckets'))
+    rows = subscribed_rows(rows, subscription)
+    
+    return jsonify({
+        'in_sync': not changed,
+        'full': full,
+        'changed': [] if full else changed,
+        'stock_data': rows,
+        # Süzülmüş abonelikte kısmi eşitlemenin sayıları istemcide hesaplanır
+        'stats': get_stats() if subscription.watches_all_variants else get_stats(rows) if full else None,
+        'deal_ids': price_history.deal_ids(),
+        'change_log': subscribed_changes(change_stream.latest(50), subscription),
+        'next_offset': change_stream.next_offset,
+        'sync': summary,
         'time': datetime.now().strftime('%H:%M:%S')
     })
 
@@ -294,55 +442,343 @@ def get_stock():
 def api_refresh():
     data, changes = refresh_stock()
     
+    # Manuel kontrol sayacı sıfırlar, bir sonraki otomatik kontrol aralık kadar sonra
+    if scheduler.active:
+        scheduler.mark_checked()
+    
+    subscription = Subscription.from_dict(request.args)
+    rows = subscribed_rows(data, subscription)
+    
     return jsonify({
-        'stock_data': data,
-        'stats': get_stats(data),
-        'changes': changes,
-        'change_log': change_log,
+        'stock_data': rows,
+        'stats': get_stats(None if subscription.watches_all_variants else rows),
+        'deal_ids': price_history.deal_ids(),
+        'changes': subscribed_changes(changes, subscription),
+        'change_log': subscribed_changes(change_stream.latest(50), subscription),
+        'next_offset': change_stream.next_offset,
+        'sync': pipeline.store.sync.summary(),
         'time': datetime.now().strftime('%H:%M:%S')
     })
 
 
+@app.route('/api/variants', methods=['GET', 'POST'])
+def get_variants():
+    """
+    Toplu varyant araması
+
+    Parametreler: ids (virgülle ayrılmış variant_id'ler; POST'ta {"ids": [...]}
+    gövdesi de olur) ve fields (varsayılan variant_id,product_id,available,price;
+    ayrıca product, variant, url; variant_id her zaman döner). Satırlar sütun düzeninde döner:
+    {"columns": {"variant_id": [...], "available": [...], ...}, "missing": [...]}
+    """
+    ids = []
+    for value in request.args.getlist('ids'):
+        ids.extend(part.strip() for part in value.split(',') if part.strip())
+    if request.method == 'POST':
+        body = request.get_json(silent=True)
+        if body is None:
+            body = {}
+        if not isinstance(body, dict):
+            return jsonify({'error': 'Gövde bir JSON nesnesi olmalı'}), 400
+        body_ids = body.get('ids') or []
+        if not isinstance(body_ids, list) or not all(isinstance(v, (str, int)) for v in body_ids):
+            return jsonify({'error': 'ids bir variant_id listesi olmalı'}), 400
+        ids.extend(str(v) for v in body_ids)
+    if not ids:
+        return jsonify({'error': 'ids parametresi gerekli'}), 400
+    if len(ids) > LOOKUP_LIMIT:
+        return jsonify({'error': f'En fazla {LOOKUP_LIMIT} varyant aranabilir'}), 400
+    
+    fields = request.args.get('fields')
+    fields = ['variant_id'] + [f.strip() for f in fields.split(',')] if fields else LOOKUP_FIELDS
+    unknown = [f for f in fields if f not in SNAPSHOT_COLUMNS]
+    if unknown:
+        return jsonify({'error': f'Bilinmeyen alan: {", ".join(unknown)}'}), 400
+    
+    snapshot = pipeline.store.snapshot
+    found, missing = snapshot.lookup(ids)
+    
+    return negotiated({
+        'count': len(found),
+        'columns': snapshot.columns(found, fields),
+        'missing': missing,
+        'saved_at': snapshot.saved_at
+    })
+
+
+@app.route('/api/variant/<variant_id>/prices')
+def get_variant_prices(variant_id):
+    """Varyantın fiyat istatistikleri (7/30/90 gün, en düşük, son değişim)"""
+    summary = price_history.summary(variant_id)
+    if summary is None:
+        return jsonify({'error': 'Varyant bulunamadı'}), 404
+    
+    if request.args.get('history'):
+        try:
+            summary['history'] = price_history.history(variant_id, request.args.get('window', '90d'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
+    return jsonify(summary)
+
+
+@app.route('/api/variant/<variant_id>/restock')
+def get_variant_restock(variant_id):
+    """Stoksuz varyantın tahmini yeniden stoklanma aralığı"""
+    window = restock_stats.estimate_next_restock(variant_id)
+    if window is None:
+        return jsonify({'variant_id': variant_id, 'estimate': None})
+    
+    return jsonify({
+        'variant_id': variant_id,
+        'estimate': {
+            'start': datetime.fromtimestamp(window['start']).isoformat(timespec='minutes'),
+            'end': datetime.fromtimestamp(window['end']).isoformat(timespec='minutes'),
+            'source': window['source'],
+            'samples': window['samples'],
+            'peak_hour_of_week': window['peak_hour_of_week'],
+        }
+    })
+
+
+@app.route('/api/deals')
+def get_deals():
+    """Son 30 günün ortalamasının altındaki / en düşük fiyattaki varyantlar"""
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    
+    return jsonify({'deals': price_history.deal_list(limit)})
+
+
+@app.route('/api/history')
+def get_history():
+    """
+    Geçmişteki bir andaki stok durumu
+
+    Parametreler: at (ISO zaman veya epoch saniye), in_stock=1 ve
+    variants/products/materials abonelik süzgeçleri
+    """
+    if snapshot_log is None:
+        return jsonify({'error': 'Geçmiş kaydı kapalı'}), 404
+    
+    at = request.args.get('at', '')
+    try:
+        ts = float(at) if at.replace('.', '', 1).isdigit() else datetime.fromisoformat(at).timestamp()
+    except ValueError:
+        return jsonify({'error': f'Geçersiz zaman: {at!r}'}), 400
+    
+    rows = snapshot_log.rows_at(ts)
+    bounds = snapshot_log.bounds()
+    span = {'from': bounds[0], 'to': bounds[1]} if bounds else None
+    if rows is None:
+        return jsonify({'error': 'Bu zaman için kayıt yok', 'history': span}), 404
+    
+    rows = subscribed_rows(rows, Subscription.from_dict(request.args))
+    if request.args.get('in_stock') in ('1', 'true'):
+        rows = [row for row in rows if row['available']]
+    
+    return jsonify({
+        'at': datetime.fromtimestamp(ts).isoformat(timespec='seconds'),
+        'stock_data': rows,
+        'stats': get_stats(rows),
+        'history': span
+    })
+
+
+@app.route('/api/facets')
+def get_facets():
+    """Malzeme/renk/çap/ağırlık seçenekleri ve stokta/toplam varyant sayıları"""
+    in_stock_only = request.args.get('in_stock') in ('1', 'true')
+
+    return jsonify({
+        'facets': pipeline.store.facets.summary(in_stock_only),
+        'variants': len(pipeline.store.facets)
+    })
+
+
+@app.route('/api/alerts/rules', methods=['GET'])
+def get_alert_rules():
+    """Tanımlı uyarı kuralları"""
+    return jsonify({'rules': [rule.to_dict() for rule in alert_engine.rules.values()]})
+
+
+@app.route('/api/alerts/rules', methods=['POST'])
+def add_alert_rule():
+    """
+    Uyarı kuralı ekle
+
+    Gövde: {"event": "in", "material": "petg", "color": "siyah", "diameter": "1.75", "max_price": 700}
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Gövde bir JSON nesnesi olmalı'}), 400
+    data.pop('id', None)
+    try:
+        rule = AlertRule.from_dict(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    alert_engine.add(rule)
+    return jsonify(rule.to_dict()), 201
+
+
+@app.route('/api/alerts/rules/<int:rule_id>', methods=['DELETE'])
+def delete_alert_rule(rule_id):
+    """Uyarı kuralını sil"""
+    if not alert_engine.remove(rule_id):
+        return jsonify({'error': 'Kural bulunamadı'}), 404
+    return jsonify({'deleted': rule_id})
+
+
+@app.route('/api/changes')
+def get_changes():
+    """Verilen offset'ten itibaren değişiklik geçmişini tekrar oynat"""
+    since = request.args.get('since', 0, type=int)
+    limit = min(request.args.get('limit', 500, type=int), 5000)
+    
+    return jsonify({
+        'changes': change_stream.read(since, limit),
+        'next_offset': change_stream.next_offset
+    })
+
+
+@app.route('/api/stream')
+def stream():
+    """
+    Server-Sent Events akışı (stock_update)
+
+    Last-Event-ID başlığı (veya last_event_id parametresi) verilirse
+    kaçırılan değişiklikler önce 'change' olayları olarak gönderilir.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    
+    # Önce abone ol, sonra abonelik anına kadarki kayıtları tekrar oynat;
+    # sonrakiler canlı çerçevelerle gelir, arada kayıt kaçmaz
+    subscriber = sse_broadcaster.subscribe()
+    replay_until = change_stream.next_offset
+    
+    def generate():
+        yield b'retry: 5000\n\n'
+        
+        if last_event_id is not None and last_event_id.lstrip('-').isdigit():
+            from_offset = int(last_event_id) + 1
+            while from_offset < replay_until:
+                changes = change_stream.read(from_offset, min(500, replay_until - from_offset))
+                if not changes:
+                    break
+                for change in changes:
+                    yield encode_frame('change', change, change['offset'])
+                from_offset = changes[-1]['offset'] + 1
+        
+        yield from sse_broadcaster.stream(subscriber)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+
 # WebSocket Events
 @socketio.on('connect')
 def handle_connect():
     print('Client connected')
+    # Abonelik bildirilene kadar istemci her şeyi alır
+    outbound.add(request.sid)
+    router.subscribe(request.sid, Subscription())
     emit('connected', {'status': 'ok'})
 
 
+@socketio.on('disconnect')
+def handle_disconnect():
+    router.unsubscribe(request.sid)
+    outbound.remove(request.sid)
+
+
+@socketio.on('subscribe')
+def handle_subscribe(data):
+    """
+    İstemcinin izlediklerini kaydet
+
+    Veri: {variants: [...], products: [...], materials: [...], events: [...]}
+    (boş alanlar: hepsi). Aynı aboneliğe sahip istemciler SubscriptionRouter'da
+    bir odada gruplanır; gönderim OutboundHub üzerinden istemci başınadır.
+    """
+    subscription = Subscription.from_dict(data)
+    _, room = router.subscribe(request.sid, subscription)
+    
+    emit('subscribed', dict(subscription.to_dict(), room=room))
+
+
+@socketio.on('subscribe_changes')
+def handle_subscribe_changes(data):
+    """
+    Geç bağlanan / yeniden bağlanan istemci için geçmişi tekrar oynat
+
+    Tekrar oynatmadan sonraki kayıtlar canlı akıştan (stock_update)
+    offset'leriyle gelir; istemci tekrarları offset'e göre ayıklar.
+    """
+    try:
+        from_offset = int((data or {}).get('from_offset', 0))
+    except (AttributeError, TypeError, ValueError):
+        # Kullanılamayan offset: tekrar oynatma yapılmaz, istemci özetlerle eşitlenir
+        emit('resync', {'reason': 'invalid_offset', 'action': 'sync'})
+        return
+    subscription = router.subscription(request.sid) or Subscription()
+    
+    # Uzun kopukluk: kaydı tek tek oynatmak yerine istemci kova özetleriyle eşitlenir
+    if change_stream.next_offset - from_offset > REPLAY_LIMIT:
+        emit('resync', {'reason': 'replay_gap', 'action': 'sync'})
+        return
+    
+    while True:
+        changes = change_stream.read(from_offset, 500)
+        if not changes:
+            break
+        from_offset = changes[-1]['offset'] + 1
+        # Yalnızca istemcinin izlediği kayıtlar tekrar oynatılır
+        changes = subscribed_changes(changes, subscription)
+        if changes:
+            emit('change_replay', {'changes': changes, 'next_offset': change_stream.next_offset})
+    
+    emit('change_replay_done', {'next_offset': change_stream.next_offset})
+
+
 @socketio.on('start_monitoring')
 def handle_start_monitoring(data):
-    global is_monitoring, monitor_thread, check_interval
+    scheduler.start(data.get('interval', 300), make_cadence(data))
     
-    check_interval = data.get('interval', 300)
+    emit('monitoring_status', scheduler.status())
+
+
+@socketio.on('set_interval')
+def handle_set_interval(data):
+    scheduler.reschedule(data.get('interval', scheduler.interval), make_cadence(data))
     
-    if not is_monitoring:
-        is_monitoring = True
-        monitor_thread = threading.Thread(target=monitor_loop, daemon=True)
-        monitor_thread.start()
+    emit('monitoring_status', scheduler.status())
+
+
+@socketio.on('refresh_now')
+def handle_refresh_now():
+    if scheduler.active:
+        scheduler.refresh_now()
     
-    emit('monitoring_status', {'active': True, 'interval': check_interval})
+    emit('monitoring_status', scheduler.status())
 
 
 @socketio.on('stop_monitoring')
 def handle_stop_monitoring():
-    global is_monitoring
-    
-    is_monitoring = False
+    scheduler.stop()
     emit('monitoring_status', {'active': False})
 
 
 @socketio.on('clear_log')
 def handle_clear_log():
-    global change_log
-    change_log = []
+    change_stream.clear()
     emit('log_cleared', {'status': 'ok'})
 
 
 @socketio.on('test_change')
 def handle_test_change():
     """Test için sahte stok/fiyat değişikliği oluştur"""
-    global change_log
     import random
     
     test_products = [
@@ -381,13 +817,9 @@ def handle_test_change():
     else:
         message = f"TEST: {product} - {variant} {'stoğa girdi' if change_type == 'in' else 'stoktan çıktı'}!"
     
-    entry = add_change_log(test_item, change_type)
-    
-    # Tüm istemcilere bildir
-    socketio.emit('test_change_result', {
-        'change': entry,
-        'message': message
-    })
+    # Sahte değişiklik kalıcı akışa yazılmaz; yalnızca isteyen istemciye gider
+    entry = change_entry(test_item, change_type)
+    emit('test_change_result', {'change': entry, 'message': message})
     
     print(f"[TEST] {entry['time']} - {message}")
 
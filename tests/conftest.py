@@ -0,0 +1,104 @@
+import json
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from porima_core.fetcher import ProductFetcher  # noqa: E402
+from porima_core.pipeline import BASE_URL, StockPipeline  # noqa: E402
+
+
+MATERIALS = ['PLA', 'PETG', 'ABS', 'TPU']
+COLORS = ['Kırmızı', 'Mavi', 'Siyah', 'Beyaz']
+
+
+def make_catalog(product_count=60, variant_count=4, seed=1):
+    """Küçük sentetik filament kataloğu (/products.json ürünleri)"""
+    rng = random.Random(seed)
+    return [
+        {
+            'id': 1000 + i,
+            'title': f"Porima {rng.choice(MATERIALS)} Filament {i}",
+            'handle': f"urun-{i}",
+            'product_type': 'Filament',
+            'tags': [],
+            'variants': [
+                {
+                    'id': 50000 + i * 100 + j,
+                    'title': f"{rng.choice(COLORS)} / 1kg",
+                    'available': rng.random() < 0.7,
+                    'price': f"{rng.uniform(300, 900):.2f}",
+                }
+                for j in range(variant_count)
+            ],
+        }
+        for i in range(product_count)
+    ]
+
+
+def mutate(products, ratio, seed=2):
+    """Varyantların bir kısmının stok/fiyat durumunu değiştir"""
+    rng = random.Random(seed)
+    for product in products:
+        for variant in product['variants']:
+            if rng.random() < ratio:
+                variant['available'] = not variant['available']
+            if rng.random() < ratio:
+                variant['price'] = f"{float(variant['price']) * rng.choice((0.9, 1.1)):.2f}"
+
+
+class MemorySession:
+    """Katalog sayfalarını bellekten sunan HTTP oturumu"""
+
+    class Response:
+        status_code = 200
+        ok = True
+        headers = {}
+
+        def __init__(self, content):
+            self.content = content
+
+        def raise_for_status(self):
+            pass
+
+    def __init__(self, products, page_size=20):
+        self.pages = [
+            json.dumps({'products': products[i:i + page_size]}).encode('utf-8')
+            for i in range(0, len(products), page_size)
+        ]
+
+    def get(self, url, headers=None, timeout=None):
+        page = int(url.rsplit('page=', 1)[1])
+        body = self.pages[page - 1] if page <= len(self.pages) else b'{"products": []}'
+        return self.Response(body)
+
+
+def crawl(pipeline, catalog, during=None):
+    """
+    Kataloğu bir kez tara
+
+    Args:
+        during: Üçüncü sayfa işlendikten sonra (tarama sürerken) çağrılır
+    """
+    pipeline.fetcher = ProductFetcher(BASE_URL, delay=0, session=MemorySession(catalog))
+    pages = []
+    for page in pipeline.stream():
+        pages.append(page)
+        if len(pages) == 3 and during is not None:
+            during()
+    return pages
+
+
+@pytest.fixture
+def catalog():
+    return make_catalog()
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    pipeline = StockPipeline(str(tmp_path / 'stock_data.json'), delay=0, keywords=None)
+    yield pipeline
+    pipeline.store.snapshot.close()
@@ -0,0 +1,71 @@
+import pytest
+
+from porima_core.alerts import AlertEngine, AlertRule
+from porima_core.diff import Changes
+
+
+def item(variant_id, product, variant, price, **extra):
+    return dict(variant_id=variant_id, product=product, variant=variant, price=price, **extra)
+
+
+def matched(engine, changes):
+    return sorted((match.rule.id, match.event, match.item['variant_id']) for match in engine.match(changes))
+
+
+def test_rules_match_through_their_index_keys():
+    engine = AlertEngine()
+    petg = engine.add(AlertRule.parse('event=in, material=petg, color=siyah, diameter=1.75, max_price=700'))
+    any_color = engine.add(AlertRule(event='in', material='PLA'))
+    discount = engine.add(AlertRule(event='price_down', min_change_percent='10'))
+
+    changes = Changes(
+        [item('1', 'Porima PETG Filament', 'Siyah / 1.75mm / 1kg', 650.0),
+         item('2', 'Porima PETG Filament', 'Siyah / 1.75mm / 1kg', 750.0),
+         item('3', 'Porima PLA Filament', 'Beyaz / 1.75mm / 1kg', 500.0)],
+        [],
+        [],
+        [item('4', 'Porima Silk PLA', 'Altın / 1.75mm / 1kg', 600.0, price_change_percent=12.0),
+         item('5', 'Porima Silk PLA', 'Altın / 1.75mm / 1kg', 600.0, price_change_percent=5.0)],
+    )
+
+    assert matched(engine, changes) == [(petg, 'in', '1'), (any_color, 'in', '3'), (discount, 'price_down', '4')]
+
+
+def test_variant_rule_checks_material_and_color():
+    engine = AlertEngine()
+    rule = engine.add(AlertRule(event='in', variant_id=7, color='siyah'))
+
+    black = item('7', 'Porima PETG Filament', 'Siyah / 1.75mm / 1kg', 650.0)
+    white = item('7', 'Porima PETG Filament', 'Beyaz / 1.75mm / 1kg', 650.0)
+
+    assert matched(engine, Changes([black], [], [], [])) == [(rule, 'in', '7')]
+    assert matched(engine, Changes([white], [], [], [])) == []
+
+
+@pytest.mark.parametrize('fields', [
+    {'event': 'sale'},
+    {'event': ['in']},
+    {'material': 5},
+    {'color': ['siyah']},
+    {'variant_id': {'id': 1}},
+    {'diameter': 'kalın'},
+    {'max_price': [700]},
+    {'min_change_percent': 'çok'},
+    {'name': 3},
+])
+def test_invalid_fields_raise_value_error(fields):
+    with pytest.raises(ValueError):
+        AlertRule.from_dict(fields)
+
+
+def test_rules_are_persisted(tmp_path):
+    path = str(tmp_path / 'rules.json')
+    engine = AlertEngine(path)
+    first = engine.add(AlertRule(event='in', material='petg'))
+    second = engine.add(AlertRule(event='out', variant_id='9'))
+    engine.remove(first)
+
+    reopened = AlertEngine(path)
+
+    assert list(reopened.rules) == [second]
+    assert reopened.add(AlertRule()) == second + 1
@@ -0,0 +1,46 @@
+import json
+
+from porima_core.broadcast import KEEPALIVE, Broadcaster, encode_frame
+
+
+def test_frame_format():
+    frame = encode_frame('change', {'ürün': 'PLA'}, event_id=7).decode('utf-8')
+
+    lines = frame.split('\n')
+    assert lines[:2] == ['id: 7', 'event: change']
+    assert json.loads(lines[2][len('data: '):]) == {'ürün': 'PLA'}
+    assert frame.endswith('\n\n')
+
+
+def test_same_frame_goes_to_every_subscriber():
+    broadcaster = Broadcaster()
+    first, second = broadcaster.subscribe(), broadcaster.subscribe()
+
+    frame = broadcaster.publish('stock_update', {'i': 1})
+
+    assert first.get_nowait() is frame
+    assert second.get_nowait() is frame
+
+
+def test_slow_subscriber_is_dropped_and_stream_ends():
+    broadcaster = Broadcaster(max_pending=2)
+    slow, fast = broadcaster.subscribe(), broadcaster.subscribe()
+
+    for i in range(3):
+        broadcaster.publish('stock_update', {'i': i})
+        fast.get_nowait()
+
+    assert len(broadcaster) == 1
+    frames = list(broadcaster.stream(slow))
+    assert [json.loads(frame.split(b'data: ')[1]) for frame in frames] == [{'i': 1}]
+
+
+def test_stream_sends_keepalive_and_unsubscribes_on_close():
+    broadcaster = Broadcaster()
+    subscriber = broadcaster.subscribe()
+    stream = broadcaster.stream(subscriber, keepalive=0.01)
+
+    assert next(stream) == KEEPALIVE
+    stream.close()
+
+    assert len(broadcaster) == 0
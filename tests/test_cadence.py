@@ -0,0 +1,46 @@
+from porima_core.cadence import AdaptiveInterval
+from porima_core.restock import RestockStats
+
+
+HOUR = 3600
+
+
+def sold_out(tmp_path, out_hours=10):
+    """Her seferinde out_hours saat stoksuz kalan ve şu an yine stoksuz olan varyant"""
+    stats = RestockStats(str(tmp_path / 'restock.json'))
+    item = {'variant_id': '1', 'product_id': '9'}
+    now = 1000.0
+    for _ in range(3):
+        stats.record([], [item], now=now)
+        now += out_hours * HOUR
+        stats.record([item], [], now=now)
+        now += HOUR
+    stats.record([], [item], now=now)
+    return stats, now
+
+
+def test_backs_off_when_quiet_and_tightens_on_changes():
+    cadence = AdaptiveInterval(base=300, min_interval=60, max_interval=1800)
+
+    assert [cadence.update(0, now=1.0) for _ in range(3)] == [450, 675, 1012]
+    assert cadence.update(2, now=1.0) == 253
+    assert cadence.update(10, now=1.0) == 60
+    assert max(cadence.update(0, now=1.0) for _ in range(20)) == 1800
+
+
+def test_expected_restock_tightens_to_minimum(tmp_path):
+    stats, now = sold_out(tmp_path)
+    cadence = AdaptiveInterval(base=1800, min_interval=60, max_interval=1800, restock_stats=stats)
+
+    assert cadence.update(0, now=now + 9.5 * HOUR) == 60
+
+
+def test_overdue_restock_does_not_pin_interval(tmp_path):
+    stats, now = sold_out(tmp_path)
+    cadence = AdaptiveInterval(base=300, min_interval=60, max_interval=1800, restock_stats=stats)
+
+    late = now + 30 * HOUR
+    intervals = [cadence.update(0, now=late + i) for i in range(10)]
+
+    assert intervals[-1] > 60
+    assert stats._starts == []
@@ -0,0 +1,65 @@
+from porima_core.changelog import ChangeStream
+
+
+def test_offsets_continue_after_restart(tmp_path):
+    stream = ChangeStream(str(tmp_path), segment_size=3)
+    for i in range(7):
+        assert stream.append({'i': i}) == i
+
+    reopened = ChangeStream(str(tmp_path), segment_size=3)
+
+    assert reopened.next_offset == 7
+    assert [entry['i'] for entry in reopened.read(0)] == list(range(7))
+    assert [entry['i'] for entry in reopened.latest(2)] == [6, 5]
+
+
+def test_torn_last_line_is_truncated(tmp_path):
+    stream = ChangeStream(str(tmp_path), segment_size=3)
+    for i in range(5):
+        stream.append({'i': i})
+    with open(stream._segment_path(stream._segments[-1]), 'ab') as f:
+        f.write(b'{"i": 5, "off')
+
+    reopened = ChangeStream(str(tmp_path), segment_size=3)
+    assert reopened.next_offset == 5
+    reopened.append({'i': 'x'})
+
+    entries = ChangeStream(str(tmp_path), segment_size=3).read(0)
+    assert [entry['i'] for entry in entries] == [0, 1, 2, 3, 4, 'x']
+    assert [entry['offset'] for entry in entries] == list(range(6))
+
+
+def test_missing_trailing_newline_is_restored(tmp_path):
+    stream = ChangeStream(str(tmp_path))
+    stream.append({'i': 0})
+    path = stream._segment_path(stream._segments[-1])
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data.rstrip(b'\n'))
+
+    reopened = ChangeStream(str(tmp_path))
+    reopened.append({'i': 1})
+
+    assert [entry['i'] for entry in ChangeStream(str(tmp_path)).read(0)] == [0, 1]
+
+
+def test_read_beyond_ring_comes_from_segments(tmp_path):
+    stream = ChangeStream(str(tmp_path), ring_size=2, segment_size=2)
+    for i in range(6):
+        stream.append({'i': i})
+
+    assert [entry['i'] for entry in stream.read(1, limit=3)] == [1, 2, 3]
+    assert [entry['i'] for entry in stream.read(4)] == [4, 5]
+
+
+def test_old_segments_are_pruned(tmp_path):
+    stream = ChangeStream(str(tmp_path), segment_size=2, max_segments=2)
+    for i in range(7):
+        stream.append({'i': i})
+
+    reopened = ChangeStream(str(tmp_path), segment_size=2, max_segments=2)
+
+    assert len(reopened._segments) == 2
+    assert reopened.next_offset == 7
+    assert [entry['i'] for entry in reopened.read(0)] == [4, 5, 6]
@@ -0,0 +1,43 @@
+from porima_core.diff import ANNOTATIONS, diff_rows
+
+
+class Previous:
+    def __init__(self, states):
+        self.states = states
+
+    def state(self, variant_id):
+        return self.states.get(variant_id)
+
+
+def row(variant_id, available, price):
+    return {'variant_id': variant_id, 'product': 'p', 'variant': 'v', 'available': available, 'price': price}
+
+
+def test_stock_and_price_changes():
+    previous = Previous({'1': (False, 100.0), '2': (True, 100.0), '3': (True, 100.0), '4': (True, 100.0)})
+    rows = [row('1', True, 100.0), row('2', False, 100.0), row('3', True, 110.0), row('4', True, 90.0), row('5', True, 1.0)]
+
+    changes = diff_rows(previous, rows)
+
+    assert [r['variant_id'] for r in changes.newly_available] == ['1']
+    assert [r['variant_id'] for r in changes.newly_out] == ['2']
+    assert [r['variant_id'] for r in changes.price_increased] == ['3']
+    assert [r['variant_id'] for r in changes.price_decreased] == ['4']
+
+
+def test_price_changes_are_annotated_copies():
+    rows = [row('1', True, 80.0)]
+
+    changes = diff_rows(Previous({'1': (True, 100.0)}), rows)
+
+    item = changes.price_decreased[0]
+    assert item['old_price'] == 100.0
+    assert item['price_change'] == 20.0
+    assert item['price_change_percent'] == 20.0
+    # Satırlar sonraki turda yeniden kullanılır: değişiklik alanları satıra yazılmaz
+    assert not any(key in rows[0] for key in ANNOTATIONS)
+
+
+def test_small_price_noise_is_ignored():
+    changes = diff_rows(Previous({'1': (True, 100.0)}), [row('1', True, 100.005)])
+    assert not any(changes)
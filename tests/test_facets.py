@@ -0,0 +1,82 @@
+import threading
+
+from porima_core.diff import Changes
+from porima_core.facets import FacetIndex
+
+from conftest import crawl
+
+
+NO_CHANGES = Changes([], [], [], [])
+
+
+def row(variant_id, product, variant, available=True):
+    return {'variant_id': variant_id, 'product': product, 'variant': variant, 'available': available}
+
+
+def options(index, facet):
+    return {option['value']: (option['in_stock'], option['total']) for option in index.summary()[facet]}
+
+
+def test_counts_follow_stock_changes():
+    rows = [row('1', 'Porima PLA Filament', 'Siyah / 1.75mm / 1kg'),
+            row('2', 'Porima PLA Filament', 'Beyaz / 1.75mm / 1kg', available=False)]
+    index = FacetIndex.from_rows(rows)
+
+    index.apply(rows, Changes([rows[1]], [rows[0]], [], []))
+
+    assert options(index, 'color') == {'black': (0, 1), 'white': (1, 1)}
+    assert options(index, 'material') == {'pla': (1, 2)}
+
+
+def test_title_change_reindexes_variant():
+    index = FacetIndex.from_rows([row('1', 'Porima PLA Filament', 'Siyah / 1.75mm / 1kg')])
+
+    index.apply([row('1', 'Porima PETG Filament', 'Kırmızı / 1.75mm / 500g')], NO_CHANGES)
+
+    assert options(index, 'material') == {'petg': (1, 1)}
+    assert options(index, 'color') == {'red': (1, 1)}
+    assert index.matches('1', material='PETG', weight='500 gr')
+
+
+def test_weight_selection_is_normalized():
+    index = FacetIndex.from_rows([row('1', 'Porima PLA Filament', 'Siyah / 1.75mm / 1kg')])
+
+    assert index.matches('1', weight='1000g')
+    assert index.matches('1', weight='1 KG')
+    assert not index.matches('1', weight='500g')
+
+
+def test_retain_and_compact_keep_attributes():
+    rows = [row(str(i), 'Porima PLA Filament', f"{'Siyah' if i % 2 else 'Beyaz'} / 1kg") for i in range(1, 11)]
+    index = FacetIndex.from_rows(rows)
+
+    index.retain({1, 2, 3})
+
+    assert len(index) == 3
+    assert index.attributes('3')['color'] == 'black'
+    assert index.attributes('4') is None
+    assert options(index, 'color') == {'black': (2, 2), 'white': (1, 1)}
+
+
+def test_lazy_build_from_many_threads_is_shared(pipeline, catalog):
+    crawl(pipeline, catalog)
+    built = []
+
+    threads = [threading.Thread(target=lambda: built.append(pipeline.store.facets)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(index) for index in built}) == 1
+
+
+def test_store_index_follows_renamed_products(pipeline, catalog):
+    crawl(pipeline, catalog)
+    pipeline.store.facets
+    catalog[0]['title'] = 'Porima TPU Filament 0'
+    catalog[1]['variants'][0]['title'] = 'Mavi / 500g'
+
+    crawl(pipeline, catalog)
+
+    assert pipeline.store.facets.summary() == FacetIndex.from_rows(pipeline.store.snapshot.rows()).summary()
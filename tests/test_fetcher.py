@@ -0,0 +1,56 @@
+import requests
+
+from porima_core.fetcher import ProductFetcher
+from porima_core.pipeline import BASE_URL, StockPipeline
+
+from conftest import MemorySession, make_catalog
+
+
+class CollectionSession:
+    """Koleksiyon başına ayrı katalog sunan oturum; istenen adresleri kaydeder"""
+
+    def __init__(self, collections, page_size=20, broken=()):
+        self.sessions = {name: MemorySession(products, page_size) for name, products in collections.items()}
+        self.broken = set(broken)
+        self.urls = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.urls.append(url)
+        collection = url.split('/collections/', 1)[1].split('/', 1)[0]
+        if collection in self.broken:
+            raise requests.exceptions.ConnectionError('bağlantı koptu')
+        return self.sessions[collection].get(url, headers, timeout)
+
+
+def test_page_urls_use_collection_handles():
+    fetcher = ProductFetcher(BASE_URL, collections=['pla', '/collections/petg/'])
+
+    assert fetcher.collections == ['pla', 'petg']
+    assert fetcher.page_url(2, 'pla') == f"{BASE_URL}/collections/pla/products.json?limit=250&page=2"
+    assert fetcher.page_url(1) == f"{BASE_URL}/products.json?limit=250&page=1"
+
+
+def test_overlapping_collections_yield_each_product_once(tmp_path):
+    catalog = make_catalog(60)
+    session = CollectionSession({'pla': catalog[:40], 'petg': catalog[20:]})
+    pipeline = StockPipeline(str(tmp_path / 'stock_data.json'), delay=0, keywords=None)
+    pipeline.fetcher = ProductFetcher(BASE_URL, delay=0, session=session, collections=['pla', 'petg'])
+
+    rows = [row for page in pipeline.stream() for row in page.rows]
+
+    assert sorted({row['product_id'] for row in rows}) == sorted(str(p['id']) for p in catalog)
+    assert len(rows) == sum(len(p['variants']) for p in catalog)
+    assert not pipeline.fetcher.failed
+    assert all('/collections/' in url for url in session.urls)
+    pipeline.store.snapshot.close()
+
+
+def test_failed_collection_marks_crawl_failed():
+    catalog = make_catalog(30)
+    session = CollectionSession({'pla': catalog, 'petg': []}, broken=['petg'])
+    fetcher = ProductFetcher(BASE_URL, delay=0, session=session, collections=['pla', 'petg'])
+
+    pages = list(fetcher.pages())
+
+    assert len(pages) == 2
+    assert fetcher.failed
@@ -0,0 +1,89 @@
+import time
+
+from porima_core.notify import NotificationDispatcher, NotificationSink, summarize
+
+
+class RecordingSink(NotificationSink):
+    name = 'recording'
+
+    def __init__(self, min_interval=0, summary_threshold=3):
+        super().__init__(min_interval, summary_threshold)
+        self.sent = []
+
+    def send(self, title, message, items):
+        self.sent.append((title, message, items))
+
+
+class FailingSink(NotificationSink):
+    name = 'failing'
+
+    def send(self, title, message, items):
+        raise OSError('bağlantı yok')
+
+
+def notification(i):
+    return {'title': f"t{i}", 'message': f"m{i}", 'items': [{'i': i}]}
+
+
+def test_burst_is_summarized():
+    sink = RecordingSink(summary_threshold=3)
+    sink.pending = [notification(i) for i in range(5)]
+
+    sink.flush(now=0)
+
+    assert len(sink.sent) == 1
+    title, message, items = sink.sent[0]
+    assert title == summarize([notification(i) for i in range(5)])['title']
+    assert '2 bildirim daha' in message
+    assert [item['i'] for item in items] == list(range(5))
+
+
+def test_rate_limit_holds_until_forced():
+    sink = RecordingSink(min_interval=60)
+    sink.pending = [notification(0)]
+    sink.flush(now=100)
+    sink.pending = [notification(1)]
+
+    sink.flush(now=110)
+    assert len(sink.sent) == 1
+
+    sink.flush(now=110, force=True)
+    assert [sent[0] for sent in sink.sent] == ['t0', 't1']
+
+
+def test_failing_sink_does_not_stop_others():
+    failing, recording = FailingSink(), RecordingSink()
+    dispatcher = NotificationDispatcher([failing, recording], batch_window=0.01)
+
+    dispatcher.submit('başlık', 'mesaj', {'variant_id': '1'})
+    dispatcher.close()
+
+    assert recording.sent == [('başlık', 'mesaj', [{'variant_id': '1'}])]
+
+
+def test_submit_never_blocks_when_queue_is_full():
+    class SlowSink(RecordingSink):
+        def send(self, title, message, items):
+            time.sleep(0.2)
+            super().send(title, message, items)
+
+    dispatcher = NotificationDispatcher([SlowSink()], batch_window=0, max_queue=1)
+    start = time.monotonic()
+    for i in range(20):
+        dispatcher.submit(f"t{i}", 'mesaj')
+
+    assert time.monotonic() - start < 0.1
+    assert dispatcher.dropped > 0
+    dispatcher.close()
+
+
+def test_close_flushes_rate_limited_notifications():
+    sink = RecordingSink(min_interval=3600)
+    dispatcher = NotificationDispatcher([sink], batch_window=0.01)
+
+    dispatcher.submit('ilk', 'mesaj')
+    time.sleep(0.1)
+    dispatcher.submit('ikinci', 'mesaj')
+    dispatcher.close()
+
+    assert [sent[0] for sent in sink.sent] == ['ilk', 'ikinci']
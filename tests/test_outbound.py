@@ -0,0 +1,93 @@
+from porima_core.outbound import MAX_COALESCED_ALERTS, OutboundHub, coalesce
+
+
+class Transport:
+    """Gönderilen çerçeveleri ve onay geri çağrılarını tutan taşıyıcı"""
+
+    def __init__(self):
+        self.sent = []
+        self.callbacks = []
+        self.dropped = []
+
+    def send(self, sid, event, payload, callback):
+        self.sent.append((sid, event, payload))
+        self.callbacks.append(callback)
+
+    def drop(self, sid, payload):
+        self.dropped.append((sid, payload))
+
+
+def hub(**options):
+    transport = Transport()
+    return OutboundHub(transport.send, transport.drop, **options), transport
+
+
+def test_inflight_window_waits_for_acks():
+    outbound, transport = hub(max_inflight=2)
+    outbound.add('a')
+
+    for i in range(5):
+        outbound.push('a', 'stock_changes', {'changes': [{'variant_id': str(i), 'type': 'in'}]})
+    assert len(transport.sent) == 2
+
+    transport.callbacks[0]()
+    assert len(transport.sent) == 3
+    assert outbound.stats()['pending'] == 2
+
+
+def test_full_queue_is_coalesced():
+    frames = [
+        ('stock_changes', {'changes': [{'variant_id': '1', 'type': 'in', 'n': 1}]}),
+        ('alerts', {'alerts': [{'i': i} for i in range(MAX_COALESCED_ALERTS)]}),
+        ('stock_changes', {'changes': [{'variant_id': '1', 'type': 'out', 'n': 2},
+                                       {'variant_id': '1', 'type': 'price_up', 'n': 3}]}),
+        ('alerts', {'alerts': [{'i': 'son'}]}),
+        ('monitoring_status', {'active': False}),
+        ('monitoring_status', {'active': True}),
+    ]
+
+    merged = dict(coalesce(frames))
+
+    assert [change['n'] for change in merged['stock_changes']['changes']] == [2, 3]
+    assert len(merged['alerts']['alerts']) == MAX_COALESCED_ALERTS
+    assert merged['alerts']['alerts'][-1] == {'i': 'son'}
+    assert merged['monitoring_status'] == {'active': True}
+
+
+def test_stock_update_absorbs_earlier_changes():
+    frames = [
+        ('stock_changes', {'changes': [{'variant_id': '1', 'type': 'in'}]}),
+        ('stock_update', {'stock_data': 'eski', 'changes': []}),
+        ('stock_update', {'stock_data': 'yeni', 'changes': [{'variant_id': '2', 'type': 'out'}]}),
+        ('stock_changes', {'changes': [{'variant_id': '3', 'type': 'in'}]}),
+    ]
+
+    merged = coalesce(frames)
+
+    assert [event for event, _ in merged] == ['stock_update', 'stock_changes']
+    assert merged[0][1]['stock_data'] == 'yeni'
+    assert [change['variant_id'] for change in merged[0][1]['changes']] == ['1', '2']
+
+
+def test_pending_stays_bounded_for_slow_client():
+    outbound, transport = hub(max_pending=4, max_inflight=1, stall_timeout=3600)
+    outbound.add('a')
+
+    for i in range(100):
+        outbound.push('a', 'stock_update', {'i': i, 'changes': []})
+
+    assert outbound.stats()['pending'] < 4
+    assert outbound.stats()['coalesced'] > 0
+
+
+def test_stalled_client_is_dropped():
+    outbound, transport = hub(stall_timeout=10)
+    outbound.add('a')
+    outbound.push('a', 'stock_update', {'changes': []}, now=1000.0)
+
+    outbound.push('a', 'stock_update', {'changes': []}, now=1011.0)
+
+    assert transport.dropped == [('a', {'reason': 'slow_consumer', 'action': 'reload'})]
+    assert len(outbound) == 0
+    transport.callbacks[0]()  # Geç gelen onay düşürülen istemciye bir şey göndermez
+    assert len(transport.sent) == 1
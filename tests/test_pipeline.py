@@ -0,0 +1,48 @@
+from porima_core.diff import ANNOTATIONS, diff_rows
+
+from conftest import crawl, mutate
+
+
+class Previous:
+    def __init__(self, snapshot):
+        self.states = {row['variant_id']: (row['available'], row['price']) for row in snapshot.rows()}
+
+    def state(self, variant_id):
+        return self.states.get(variant_id)
+
+
+def test_changes_match_full_diff(pipeline, catalog):
+    crawl(pipeline, catalog)
+    previous = Previous(pipeline.store.snapshot)
+    mutate(catalog, 0.1)
+
+    pages = crawl(pipeline, catalog)
+
+    expected = diff_rows(previous, list(pipeline.store.snapshot.rows()))
+    got = [sum(len(page.changes[i]) for page in pages) for i in range(4)]
+    assert got == [len(items) for items in expected]
+    assert sum(got) > 0
+
+
+def test_unchanged_products_are_reused_without_stale_annotations(pipeline, catalog):
+    crawl(pipeline, catalog)
+    mutate(catalog, 0.2)
+    pages = crawl(pipeline, catalog)
+    assert any(page.changes.price_increased or page.changes.price_decreased for page in pages)
+
+    rows = [row for page in crawl(pipeline, catalog) for row in page.rows]
+
+    assert pipeline.last_result.reused_count == len(catalog)
+    assert pipeline.last_result.change_count == 0
+    assert len(rows) == len(pipeline.store.snapshot)
+    assert not any(key in row for row in rows for key in ANNOTATIONS)
+
+
+def test_changed_product_is_rebuilt(pipeline, catalog):
+    crawl(pipeline, catalog)
+    catalog[0]['variants'][0]['available'] = not catalog[0]['variants'][0]['available']
+
+    pages = crawl(pipeline, catalog)
+
+    assert pipeline.last_result.reused_count == len(catalog) - 1
+    assert sum(len(page.changes.newly_available) + len(page.changes.newly_out) for page in pages) == 1
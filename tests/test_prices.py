@@ -0,0 +1,80 @@
+import json
+import time
+
+import pytest
+
+from porima_core.prices import DAY, PriceHistory, RollingWindow
+
+
+def test_mean_is_weighted_by_duration():
+    window = RollingWindow(30 * DAY)
+    now = 100 * DAY
+    window.add(now - 29 * DAY, 100.0)
+    window.add(now - 300, 50.0)  # Beş dakikadır geçerli
+
+    summary = window.summary(50.0, now)
+
+    assert summary['min'] == 50.0
+    assert summary['max'] == 100.0
+    assert summary['mean'] == pytest.approx(99.99, abs=0.01)
+
+
+def test_carried_price_counts_from_window_start():
+    window = RollingWindow(7 * DAY)
+    window.add(0, 100.0)
+    window.add(10 * DAY, 80.0)
+    window.add(12 * DAY, 60.0)
+    window.evict(14 * DAY)
+
+    summary = window.summary(60.0, 14 * DAY)
+
+    # 7-10. gün 100, 10-12. gün 80, 12-14. gün 60
+    assert summary['mean'] == pytest.approx((100 * 3 + 80 * 2 + 60 * 2) / 7, abs=0.01)
+    assert summary['count'] == 2
+
+
+def test_unknown_history_window(tmp_path):
+    history = PriceHistory(str(tmp_path / 'prices.jsonl'))
+    history.observe([{'variant_id': '1', 'price': 10.0}], now=1000.0)
+
+    assert history.history('1', '7d', now=1000.0) == [(1000.0, 10.0)]
+    with pytest.raises(ValueError):
+        history.history('1', 'x')
+
+
+def test_deal_expires_as_window_moves(tmp_path):
+    history = PriceHistory(str(tmp_path / 'prices.jsonl'))
+    history.observe([{'variant_id': '1', 'price': 100.0}], now=DAY)
+    history.observe([{'variant_id': '1', 'price': 80.0}], now=31 * DAY)
+
+    assert history.deal_list(now=31 * DAY + 60)[0]['discount_percent'] == pytest.approx(20.0, abs=0.1)
+    # 30 günlük ortalama yeni fiyata oturdu; yalnızca en düşük fiyat olarak kalır
+    deal = history.deal_list(now=71 * DAY)[0]
+    assert (deal['mean_30d'], deal['discount_percent']) == (80.0, 0.0)
+    # 90 günlük pencerede de eski fiyat kalmayınca fırsat düşer
+    assert history.deal_ids(now=131 * DAY) == []
+
+
+def test_history_drops_points_outside_window(tmp_path):
+    history = PriceHistory(str(tmp_path / 'prices.jsonl'))
+    history.observe([{'variant_id': '1', 'price': 10.0}], now=DAY)
+    history.observe([{'variant_id': '1', 'price': 12.0}], now=6 * DAY)
+
+    assert history.history('1', '7d', now=11 * DAY) == [(6 * DAY, 12.0)]
+
+
+def test_load_compacts_file_without_changing_state(tmp_path):
+    path = str(tmp_path / 'prices.jsonl')
+    history = PriceHistory(path)
+    now = time.time()
+    prices = [100.0, 40.0, 90.0, 95.0, 85.0, 80.0]
+    for i, price in enumerate(prices):
+        history.observe([{'variant_id': '1', 'price': price}], now=now - (200 - 30 * i) * DAY)
+    expected = history.summary('1', now=now)
+
+    reopened = PriceHistory(path)
+
+    with open(path, encoding='utf-8') as f:
+        assert [json.loads(line)['p'] for line in f] == [40.0, 95.0, 85.0, 80.0]
+    assert reopened.summary('1', now=now) == expected
+    assert PriceHistory(path).summary('1', now=now) == expected
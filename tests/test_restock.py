@@ -0,0 +1,65 @@
+from porima_core.restock import RestockStats
+
+HOUR = 3600
+
+
+def variant(variant_id='1', product_id='9'):
+    return {'variant_id': variant_id, 'product_id': product_id}
+
+
+def cycles(stats, item, out_hours, count=3, start=1000.0):
+    """Varyantı her seferinde out_hours saat stoksuz bırakıp geri getir; son zamanı döndür"""
+    now = start
+    for _ in range(count):
+        stats.record([], [item], now=now)
+        now += out_hours * HOUR
+        stats.record([item], [], now=now)
+        now += HOUR
+    return now
+
+
+def test_window_follows_out_of_stock_durations(tmp_path):
+    stats = RestockStats(str(tmp_path / 'restock.json'))
+    now = cycles(stats, variant(), out_hours=10)
+    stats.record([], [variant()], now=now)
+
+    window = stats.estimate_next_restock('1', now=now)
+
+    assert window['source'] == 'variant'
+    assert window['start'] < now + 10 * HOUR < window['end']
+    assert stats.likely_restocks(now=now + 9 * HOUR, horizon=HOUR) == ['1']
+    assert stats.likely_restocks(now=now, horizon=HOUR) == []
+
+
+def test_overdue_variant_is_not_likely_forever(tmp_path):
+    stats = RestockStats(str(tmp_path / 'restock.json'))
+    now = cycles(stats, variant(), out_hours=10)
+    stats.record([], [variant()], now=now)
+
+    late = now + 30 * HOUR
+
+    assert stats.estimate_next_restock('1', now=late) is None
+    assert stats.likely_restocks(now=late, horizon=HOUR) == []
+
+
+def test_product_statistics_fill_in_for_new_variant(tmp_path):
+    stats = RestockStats(str(tmp_path / 'restock.json'))
+    now = cycles(stats, variant('1'), out_hours=10)
+    stats.record([], [variant('2')], now=now)
+
+    window = stats.estimate_next_restock('2', now=now)
+
+    assert window['source'] == 'product'
+    assert RestockStats(str(tmp_path / 'restock.json')).estimate_next_restock('2', now=now) == window
+
+
+def test_sibling_window_is_reindexed_when_product_restocks(tmp_path):
+    stats = RestockStats(str(tmp_path / 'restock.json'))
+    stats.record([], [variant('2')], now=1000.0)
+    assert stats.likely_restocks(now=1000.0, horizon=100 * HOUR) == []
+
+    cycles(stats, variant('1'), out_hours=10, start=2000.0)
+
+    # '2' ürünün stoksuz kalma süresini kullanır: 1000 + ~10 saat
+    assert stats.likely_restocks(now=1000.0 + 9.5 * HOUR, horizon=HOUR) == ['2']
+    assert RestockStats(str(tmp_path / 'restock.json')).likely_restocks(now=1000.0 + 9.5 * HOUR, horizon=HOUR) == ['2']
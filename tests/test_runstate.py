@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+
+from porima_core.runstate import RunLock, RunState
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_lock_is_exclusive_until_released(tmp_path):
+    path = str(tmp_path / 'run.lock')
+    first, second = RunLock(path), RunLock(path)
+
+    assert first.acquire()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+    second.release()
+
+
+def test_lock_of_exited_process_is_free(tmp_path):
+    path = str(tmp_path / 'run.lock')
+    code = (f"import sys; sys.path.insert(0, {ROOT!r}); from porima_core.runstate import RunLock; "
+            f"assert RunLock({path!r}).acquire()")
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+    lock = RunLock(path)
+    assert lock.acquire()
+    lock.release()
+
+
+def test_failures_back_off_exponentially_and_success_resets(tmp_path):
+    state = RunState(str(tmp_path / 'state.json'))
+
+    assert [state.record_failure(now=1000.0, base=60, max_backoff=200) for _ in range(4)] == [60, 120, 200, 200]
+    assert not state.due(now=1100.0)
+    assert state.due(now=1200.0)
+
+    state.record_success(changes=2, pages=3, now=2000.0, interval=300)
+    state.save()
+    reopened = RunState(str(tmp_path / 'state.json'))
+
+    assert reopened.backoff == {'failures': 0, 'interval': 300, 'next_run': 2300.0}
+    assert reopened.watermarks['last_change'] == 2000.0
+    assert reopened.watermarks['pages'] == 3
+
+
+def test_validators_need_cached_body(tmp_path):
+    state = RunState(str(tmp_path / 'state.json'))
+    url = 'https://porima3d.com/products.json?page=1'
+    state.remember(url, {'ETag': '"abc"'}, b'{"products": []}', count=0)
+
+    assert state.request_headers(url) == {'If-None-Match': '"abc"'}
+    assert state.is_unchanged(url, b'{"products": []}')
+    assert state.page_count(url) == 0
+    assert state.cached_body(url) == b'{"products": []}'
+
+    os.remove(state._cache_path(url))
+    assert state.request_headers(url) == {}
@@ -0,0 +1,116 @@
+import threading
+import time
+
+from porima_core.scheduler import MonitorScheduler
+
+
+class FakeEngineIO:
+    def create_event(self):
+        return threading.Event()
+
+
+class FakeSocketIO:
+    """Arka plan görevlerini thread'lerle çalıştıran SocketIO yerine geçen nesne"""
+
+    def __init__(self):
+        self.server = type('Server', (), {'eio': FakeEngineIO()})()
+        self.tasks = []
+        self.emitted = []
+
+    def start_background_task(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        self.tasks.append(thread)
+        thread.start()
+        return thread
+
+    def emit(self, event, payload):
+        self.emitted.append((event, payload))
+
+
+class Check:
+    """Çağrıları sayan, aynı anda birden fazla çalışmayı yakalayan kontrol"""
+
+    def __init__(self, duration=0.0):
+        self.duration = duration
+        self.calls = 0
+        self.running = 0
+        self.overlapped = False
+        self.called = threading.Event()
+
+    def __call__(self):
+        self.running += 1
+        self.overlapped = self.overlapped or self.running > 1
+        time.sleep(self.duration)
+        self.calls += 1
+        self.running -= 1
+        self.called.set()
+        return 0
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_single_loop_and_no_overlapping_checks():
+    socketio, check = FakeSocketIO(), Check(duration=0.05)
+    scheduler = MonitorScheduler(socketio, check, interval=0.01)
+
+    scheduler.start()
+    scheduler.start()
+    for _ in range(5):
+        scheduler.refresh_now()
+
+    assert wait_until(lambda: check.calls >= 3)
+    scheduler.stop()
+    assert len(socketio.tasks) == 1
+    assert not check.overlapped
+
+
+def test_stop_ends_loop_and_start_restarts():
+    socketio, check = FakeSocketIO(), Check()
+    scheduler = MonitorScheduler(socketio, check, interval=3600)
+
+    scheduler.start()
+    scheduler.stop()
+    assert wait_until(lambda: not socketio.tasks[0].is_alive())
+    assert check.calls == 0
+    assert scheduler.status()['active'] is False
+
+    scheduler.start()
+    scheduler.refresh_now()
+    assert check.called.wait(2)
+    scheduler.stop()
+    assert len(socketio.tasks) == 2
+    assert wait_until(lambda: not socketio.tasks[1].is_alive())
+
+
+def test_reschedule_wakes_waiting_loop():
+    socketio, check = FakeSocketIO(), Check()
+    scheduler = MonitorScheduler(socketio, check, interval=3600)
+    scheduler.start()
+    time.sleep(0.05)
+    assert check.calls == 0
+
+    scheduler.reschedule(0.01)
+
+    assert check.called.wait(2)
+    assert scheduler.status()['interval'] == 0.01
+    scheduler.stop()
+
+
+def test_manual_check_postpones_next_run():
+    socketio, check = FakeSocketIO(), Check()
+    scheduler = MonitorScheduler(socketio, check, interval=0.3)
+    scheduler.start()
+
+    for _ in range(4):
+        time.sleep(0.1)
+        scheduler.mark_checked()
+
+    assert check.calls == 0
+    scheduler.stop()
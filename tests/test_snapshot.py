@@ -0,0 +1,106 @@
+import pytest
+
+from porima_core.facets import FacetIndex
+from porima_core.snapshot import SnapshotWriter
+from porima_core.stats import StockCounters
+from porima_core.sync import SyncIndex
+
+from conftest import crawl, mutate
+
+
+def assert_indexes_match(store):
+    """Artımlı dizinler kaydedilmiş anlık görüntüden kurulanlarla aynı olmalı"""
+    snapshot = store.snapshot
+    assert store.counters.summary() == StockCounters.from_records(snapshot.states()).summary()
+    assert store.facets.summary() == FacetIndex.from_rows(snapshot.rows()).summary()
+    sync = SyncIndex(store.sync.boundaries)
+    sync.apply(snapshot.rows())
+    assert store.sync.hashes == sync.hashes
+
+
+@pytest.fixture
+def failing_commit(monkeypatch):
+    def commit(self):
+        raise OSError('disk dolu')
+    monkeypatch.setattr(SnapshotWriter, 'commit', commit)
+
+
+def build_indexes(store):
+    store.counters
+    store.facets
+    store.sync
+
+
+def test_indexes_follow_commits(pipeline, catalog):
+    crawl(pipeline, catalog)
+    build_indexes(pipeline.store)
+
+    for seed in range(3):
+        mutate(catalog, 0.1, seed=seed)
+        crawl(pipeline, catalog)
+        assert_indexes_match(pipeline.store)
+
+    del catalog[5]
+    crawl(pipeline, catalog)
+    assert_indexes_match(pipeline.store)
+
+
+def test_indexes_built_mid_crawl_are_rebuilt(pipeline, catalog):
+    crawl(pipeline, catalog)
+    mutate(catalog, 0.2)
+
+    crawl(pipeline, catalog, during=lambda: build_indexes(pipeline.store))
+
+    assert_indexes_match(pipeline.store)
+
+
+def test_sync_reflects_committed_snapshot_during_crawl(pipeline, catalog):
+    crawl(pipeline, catalog)
+    root = pipeline.store.sync.root()
+    mutate(catalog, 0.2)
+    roots = []
+
+    crawl(pipeline, catalog, during=lambda: roots.append(pipeline.store.sync.root()))
+
+    assert roots == [root]
+    assert pipeline.store.sync.root() != root
+
+
+def test_failed_commit_drops_indexes(pipeline, catalog, failing_commit):
+    crawl(pipeline, catalog)
+    build_indexes(pipeline.store)
+    mutate(catalog, 0.3)
+
+    crawl(pipeline, catalog)
+
+    assert_indexes_match(pipeline.store)
+
+
+def test_sync_diff_returns_changed_buckets(pipeline, catalog):
+    crawl(pipeline, catalog)
+    summary = pipeline.store.sync.summary()
+    catalog[0]['variants'][0]['available'] = not catalog[0]['variants'][0]['available']
+    crawl(pipeline, catalog)
+
+    changed, full, rows, _ = pipeline.store.sync_diff(summary['epoch'], summary['root'], summary['buckets'])
+
+    variant_id = str(catalog[0]['variants'][0]['id'])
+    assert not full
+    assert changed == [pipeline.store.sync.bucket_of(variant_id)]
+    assert variant_id in {row['variant_id'] for row in rows}
+    assert pipeline.store.sync_diff('baska', None, None)[1]
+
+
+def test_bulk_lookup(pipeline, catalog):
+    crawl(pipeline, catalog)
+    snapshot = pipeline.store.snapshot
+    rows = list(snapshot.rows())
+    wanted = [rows[3]['variant_id'], 'yok', rows[0]['variant_id']]
+
+    found, missing = snapshot.lookup(wanted)
+    columns = snapshot.columns(found, ('variant_id', 'available', 'url'))
+
+    assert missing == ['yok']
+    assert columns['variant_id'] == [rows[3]['variant_id'], rows[0]['variant_id']]
+    assert columns['url'] == [rows[3]['url'], rows[0]['url']]
+    assert all(snapshot.find(row['variant_id']) == i for i, row in enumerate(rows))
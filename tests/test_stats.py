@@ -0,0 +1,45 @@
+from porima_core.diff import Changes
+from porima_core.stats import StockCounters
+
+from conftest import crawl, mutate
+
+
+def test_counts_from_records():
+    counters = StockCounters.from_records([(1, 10, True), (2, 10, False), (3, 20, False)])
+
+    assert counters.summary() == {
+        'in_stock': 1, 'out_stock': 2, 'total': 3,
+        'products': {'total': 2, 'in_stock': 1, 'out_stock': 1},
+    }
+    assert counters.product(10) == {'in_stock': 1, 'out_stock': 1, 'total': 2}
+    assert counters.product('x') is None
+
+
+def test_changes_new_variants_and_retain():
+    counters = StockCounters.from_records([(1, 10, True), (2, 10, False), (3, 20, False)])
+
+    counters.apply(
+        [{'variant_id': '4', 'product_id': '30', 'available': True}],
+        Changes([{'variant_id': '3'}], [{'variant_id': '1'}], [], []),
+    )
+    assert counters.summary()['in_stock'] == 2
+    assert counters.summary()['products'] == {'total': 3, 'in_stock': 2, 'out_stock': 1}
+
+    counters.retain({2, 3})
+
+    assert counters.summary()['total'] == 2
+    assert counters.product(30) is None
+    assert counters.summary()['products'] == {'total': 2, 'in_stock': 1, 'out_stock': 1}
+
+
+def test_store_stats_match_rebuild(pipeline, catalog):
+    crawl(pipeline, catalog)
+    pipeline.store.counters
+    mutate(catalog, 0.3)
+    del catalog[0]
+
+    crawl(pipeline, catalog)
+
+    rebuilt = StockCounters.from_records(pipeline.store.snapshot.states())
+    assert pipeline.store.stats(materials=False) == rebuilt.summary()
+    assert sum(option['total'] for option in pipeline.store.stats()['materials'].values()) <= rebuilt.summary()['total']
@@ -0,0 +1,67 @@
+from porima_core.subscriptions import ALL_ROOM, Subscription, SubscriptionRouter
+
+
+ROWS = [
+    {'variant_id': '1', 'product_id': '10', 'product': 'Porima PLA Filament', 'variant': 'Beyaz / 1kg'},
+    {'variant_id': '2', 'product_id': '10', 'product': 'Porima PLA Filament', 'variant': 'Siyah / 1kg'},
+    {'variant_id': '3', 'product_id': '20', 'product': 'Porima PETG Filament', 'variant': 'Siyah / 1kg'},
+]
+
+
+def change(variant_id, change_type='in', **extra):
+    return dict(variant_id=variant_id, type=change_type, **extra)
+
+
+def test_same_subscription_shares_a_room():
+    first = Subscription.from_dict({'variants': '3,1', 'events': ['in']})
+    second = Subscription.from_dict({'variants': ['1', '3'], 'events': 'in'})
+
+    assert first.room == second.room != ALL_ROOM
+    assert Subscription.from_dict({'events': 'in,out,price_up,price_down'}).room == ALL_ROOM
+
+
+def test_changes_reach_only_rooms_that_watch_them():
+    router = SubscriptionRouter()
+    router.update_catalog(ROWS)
+    _, everything = router.subscribe('a', Subscription())
+    _, product = router.subscribe('b', Subscription(products=['10']))
+    _, petg_out = router.subscribe('c', Subscription(materials=['petg'], events=['out']))
+
+    routed = router.route([change('1'), change('3', 'out'), change('3', 'in')])
+
+    assert [entry['variant_id'] for entry in routed[everything]] == ['1', '3', '3']
+    assert [entry['variant_id'] for entry in routed[product]] == ['1']
+    assert [(entry['variant_id'], entry['type']) for entry in routed[petg_out]] == [('3', 'out')]
+
+
+def test_unknown_variant_is_matched_by_subscription():
+    router = SubscriptionRouter()
+    router.update_catalog(ROWS)
+    _, petg = router.subscribe('a', Subscription(materials=['PETG']))
+
+    routed = router.route([change('99', product='Porima PETG Filament', variant='Mavi / 1kg')])
+
+    assert list(routed) == [petg]
+
+
+def test_empty_room_is_removed_from_map():
+    router = SubscriptionRouter()
+    router.update_catalog(ROWS)
+    _, room = router.subscribe('a', Subscription(variants=['2']))
+
+    assert router.rows_for(room, {row['variant_id']: row for row in ROWS}) == [ROWS[1]]
+    assert router.unsubscribe('a') == room
+    assert room not in router.rooms
+    assert router.variant_rooms == {}
+    assert router.route([change('2')]) == {}
+
+
+def test_catalog_change_remaps_rooms():
+    router = SubscriptionRouter()
+    router.update_catalog(ROWS[:2])
+    _, room = router.subscribe('a', Subscription(products=['20']))
+    assert router.route([change('3')]) == {}
+
+    router.update_catalog(ROWS)
+
+    assert list(router.route([change('3')])) == [room]
@@ -0,0 +1,54 @@
+import pytest
+
+from porima_core.sync import SyncIndex
+
+
+def rows(count=100, price=10.0):
+    return [{'variant_id': str(1000 + i), 'product_id': '1', 'product': 'p', 'variant': f"v{i}",
+             'available': True, 'price': price, 'url': 'u'} for i in range(count)]
+
+
+def test_hashes_are_order_independent_and_incremental():
+    catalog = rows()
+    index = SyncIndex.from_rows(catalog, buckets=8)
+    reversed_index = SyncIndex(index.boundaries)
+    reversed_index.apply(reversed(catalog))
+    assert reversed_index.hashes == index.hashes
+
+    changed = dict(catalog[5], price=12.0)
+    index.apply([changed])
+    rebuilt = SyncIndex(index.boundaries)
+    rebuilt.apply(catalog[:5] + [changed] + catalog[6:])
+
+    assert index.hashes == rebuilt.hashes
+    assert index.root() == rebuilt.root()
+
+
+def test_diff_reports_changed_buckets():
+    catalog = rows()
+    index = SyncIndex.from_rows(catalog, buckets=8)
+    client = index.summary()
+
+    assert index.diff(client['epoch'], client['root'], client['buckets']) == ([], False)
+    index.apply([dict(catalog[0], available=False)])
+    index.retain({int(row['variant_id']) for row in catalog[:-1]})
+
+    assert index.diff(client['epoch'], client['root'], client['buckets']) == (
+        [index.bucket_of(catalog[0]['variant_id']), index.bucket_of(catalog[-1]['variant_id'])], False)
+
+
+@pytest.mark.parametrize('buckets', [None, {}, {'0': 'x'}, 5, 'abc', [1] * 8, [None] * 8, ['0' * 16] * 3])
+def test_malformed_buckets_fall_back_to_full_sync(buckets):
+    index = SyncIndex.from_rows(rows(), buckets=8)
+
+    changed, full = index.diff(index.epoch, None, buckets)
+
+    assert full
+    assert changed == list(range(len(index.hashes)))
+
+
+def test_other_epoch_needs_full_sync():
+    index = SyncIndex.from_rows(rows(), buckets=8)
+    summary = index.summary()
+
+    assert index.diff('eski', summary['root'], summary['buckets'])[1]
@@ -0,0 +1,68 @@
+import os
+
+from porima_core.pipeline import StockPipeline
+from porima_core.timeline import SnapshotLog
+
+from conftest import crawl, mutate
+
+
+def rows_by_id(rows):
+    return {row['variant_id']: row for row in rows}
+
+
+def record(tmp_path, catalog, cycles=12, **options):
+    """Kataloğu her turda değiştirerek tara; her kaydın zamanını ve durumunu döndür"""
+    log = SnapshotLog(str(tmp_path / 'history'), **options)
+    pipeline = StockPipeline(str(tmp_path / 'stock_data.json'), delay=0, keywords=None, history=log)
+    truth = []
+    for i in range(cycles):
+        if i:
+            mutate(catalog, 0.05, seed=i)
+        if i == 3:
+            catalog[1]['title'] += ' Yeni'
+            catalog[2]['handle'] = 'yeni-adres'
+        if i == 5:
+            del catalog[4]
+        crawl(pipeline, catalog)
+        snapshot = pipeline.store.snapshot
+        truth.append((snapshot.saved_at, rows_by_id(snapshot.rows())))
+    pipeline.store.snapshot.close()
+    return log, truth
+
+
+def test_every_state_is_reconstructed(tmp_path, catalog):
+    log, truth = record(tmp_path, catalog, max_deltas=100)
+
+    for ts, rows in truth:
+        assert rows_by_id(log.rows_at(ts)) == rows
+    assert log.rows_at(truth[0][0] - 1) is None
+
+
+def test_keyframes_after_compaction(tmp_path, catalog):
+    log, truth = record(tmp_path, catalog, max_deltas=100)
+    log.compact()
+
+    reopened = SnapshotLog(str(tmp_path / 'history'), max_deltas=100)
+
+    assert len(reopened) == 2
+    assert rows_by_id(reopened.rows_at(truth[-1][0])) == truth[-1][1]
+
+
+def test_partial_frame_is_truncated(tmp_path):
+    directory = str(tmp_path / 'history')
+    log = SnapshotLog(directory)
+    row = {'variant_id': '1', 'product_id': '9', 'product': 'p', 'variant': 'v',
+           'available': True, 'price': 10.0, 'url': 'u'}
+    log.keyframe([row], ts=100.0)
+    log.append([dict(row, price=12.0)], [], ts=200.0)
+    segment = log.deltas[-1].path
+    size = os.path.getsize(segment)
+    with open(segment, 'ab') as f:
+        f.write(b'\x00' * 7)
+
+    reopened = SnapshotLog(directory)
+
+    assert os.path.getsize(segment) == size
+    assert reopened.rows_at(250.0)[0]['price'] == 12.0
+    reopened.append([], ['1'], ts=300.0)
+    assert SnapshotLog(directory).rows_at(300.0) == []
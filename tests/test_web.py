@@ -0,0 +1,89 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+# porima_web içe aktarılırken gevent yamaları uygulanır; pytest ssl'i önceden yüklemiştir
+pytestmark = pytest.mark.filterwarnings('ignore:Monkey-patching ssl')
+
+
+@pytest.fixture(scope='module')
+def web(tmp_path_factory):
+    """porima_web'i çalışma zamanı dosyaları geçici klasöre yazılacak şekilde yükle"""
+    directory = tmp_path_factory.mktemp('web')
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        module = importlib.import_module('porima_web')
+        yield module
+    finally:
+        os.chdir(cwd)
+        sys.modules.pop('porima_web', None)
+
+
+def test_test_change_is_not_written_to_change_stream(web):
+    client = web.socketio.test_client(web.app)
+    other = web.socketio.test_client(web.app)
+    client.get_received()
+    other.get_received()
+    before = web.change_stream.next_offset
+
+    client.emit('test_change')
+
+    received = [message['name'] for message in client.get_received()]
+    assert received == ['test_change_result']
+    assert other.get_received() == []
+    assert web.change_stream.next_offset == before
+    client.disconnect()
+    other.disconnect()
+
+
+def test_sse_replays_missed_changes_then_goes_live(web):
+    first = web.add_change_log({'product': 'PLA', 'variant': 'Beyaz'}, 'in')
+    web.add_change_log({'product': 'PETG', 'variant': 'Siyah'}, 'out')
+
+    response = web.app.test_client().get('/api/stream', headers={'Last-Event-ID': str(first['offset'])})
+    frames = iter(response.response)
+
+    assert next(frames) == b'retry: 5000\n\n'
+    replayed = next(frames)
+    assert replayed.startswith(f"id: {first['offset'] + 1}\nevent: change\n".encode())
+    web.sse_broadcaster.publish('stock_update', {'canlı': True})
+    assert b'event: stock_update' in next(frames)
+    response.close()
+
+
+@pytest.mark.parametrize('body', [{'material': 5}, {'event': 'in', 'color': ['siyah']}, ['in'], {'max_price': {}}])
+def test_invalid_alert_rule_is_rejected(web, body):
+    response = web.app.test_client().post('/api/alerts/rules', json=body)
+
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+@pytest.mark.parametrize('body', [{'buckets': {'0': 'x'}}, {'buckets': 5, 'epoch': []}, ['x'], {'root': {}}])
+def test_malformed_sync_state_gets_full_sync(web, body):
+    response = web.app.test_client().post('/api/sync', json=body)
+
+    assert response.status_code == 200
+    assert response.get_json()['full']
+
+
+@pytest.mark.parametrize('body', [['1'], {'ids': 5}, {'ids': '1,2'}, {'ids': [{}]}])
+def test_malformed_variant_lookup_is_rejected(web, body):
+    response = web.app.test_client().post('/api/variants', json=body)
+
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_msgpack_without_library_is_not_acceptable(web, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'msgpack', None)
+    client = web.app.test_client()
+
+    assert client.get('/api/variants?ids=1&format=msgpack').status_code == 406
+    assert client.get('/api/variants?ids=1', headers={'Accept': 'application/msgpack'}).status_code == 406
+    fallback = client.get('/api/variants?ids=1', headers={'Accept': 'application/msgpack, */*;q=0.5'})
+    assert fallback.status_code == 200
+    assert fallback.is_json
@@ -0,0 +1,79 @@
+import json
+import os
+import time
+
+from porima_core.webhook import WebhookPublisher
+
+
+class RecordingPublisher(WebhookPublisher):
+    """Gövdeleri ağa çıkmadan kaydeden, istenirse başarısız olan yayıncı"""
+
+    def __init__(self, *args, fail=False, **kwargs):
+        self.bodies = []
+        self.fail = fail
+        super().__init__('http://alıcı.invalid/hook', *args, **kwargs)
+
+    def _post(self, body):
+        if self.fail:
+            return False
+        self.bodies.append(json.loads(body))
+        return True
+
+
+def spooled(directory):
+    return sorted(n for n in os.listdir(directory) if n.endswith('.json'))
+
+
+def test_events_are_batched_and_flushed_on_close(tmp_path):
+    publisher = RecordingPublisher(spool_dir=str(tmp_path), batch_window=0.05)
+
+    publisher.publish([{'i': i} for i in range(3)])
+    publisher.close()
+
+    assert [event['i'] for body in publisher.bodies for event in body['events']] == [0, 1, 2]
+    assert spooled(tmp_path) == []
+
+
+def test_signature_matches_body():
+    publisher = WebhookPublisher('http://alıcı.invalid/hook', secret='gizli')
+
+    assert publisher.sign(b'{}') == publisher.sign(b'{}')
+    assert publisher.sign(b'{}') != publisher.sign(b'{ }')
+    assert publisher.sign(b'{}').startswith('sha256=')
+
+
+def test_failed_batch_is_spooled(tmp_path):
+    publisher = RecordingPublisher(spool_dir=str(tmp_path), batch_window=0.01, fail=True)
+
+    publisher.publish([{'i': 0}])
+    publisher.close()
+
+    assert len(spooled(tmp_path)) == 1
+    assert publisher.failed == 1
+
+
+def test_spool_is_retried_after_restart_without_new_events(tmp_path):
+    failing = RecordingPublisher(spool_dir=str(tmp_path), batch_window=0.01, fail=True)
+    failing.publish([{'i': 0}])
+    failing.close()
+    old = time.time() - 3600
+    for name in spooled(tmp_path):
+        os.utime(tmp_path / name, (old, old))
+
+    publisher = RecordingPublisher(spool_dir=str(tmp_path))
+    publisher.close()
+
+    assert [body['events'] for body in publisher.bodies] == [[{'i': 0}]]
+    assert spooled(tmp_path) == []
+
+
+def test_close_does_not_block_on_full_queue(tmp_path):
+    publisher = RecordingPublisher(spool_dir=str(tmp_path), max_queue=1)
+    publisher._thread = type('Idle', (), {'join': lambda self, timeout: None})()
+    publisher.queue.put_nowait({'i': 0})
+
+    start = time.monotonic()
+    publisher.close(timeout=0.1)
+
+    assert time.monotonic() - start < 0.5
+    assert publisher.queue.qsize() == 1